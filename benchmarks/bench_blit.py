@@ -0,0 +1,76 @@
+import os
+import sys
+import timeit
+
+# Blit with the SDL dummy video driver so that the benchmark runs without a display
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+from darkworld.view.view import ImageManager
+
+# Alpha values to blit with - the world view fades out the planes that are further from the player
+ALPHAS = (None, 128)
+
+# How many blits to time for each set of images
+BLITS = 20000
+
+
+def load_images(image_manager: ImageManager):
+    # Load every sprite as it comes off its sheet without converting it
+    images = {}
+    for image_file_name, (file_name, rect) in sorted(ImageManager.sprite_sheets.items()):
+        try:
+            images[image_file_name] = image_manager.get_sheet(file_name).image_at(rect)
+        except Exception as err:
+            print("Skipping {0}: {1}".format(image_file_name, err))
+    return images
+
+
+def blit_images(surface, images, alpha):
+    width, height = surface.get_size()
+    for i in range(BLITS):
+        image = images[i % len(images)]
+        image.set_alpha(alpha)
+        surface.blit(image, ((i * 37) % width, (i * 71) % height))
+
+
+def main():
+
+    pygame.init()
+    display = pygame.display.set_mode((600, 600))
+
+    # Draw onto a surface like the world view does
+    surface = pygame.Surface(display.get_size())
+
+    image_manager = ImageManager()
+    image_manager.initialise()
+
+    images = load_images(image_manager)
+    raw_images = list(images.values())
+    converted_images = [image_manager.convert_image(image_file_name, image)
+                        for image_file_name, image in images.items()]
+
+    per_pixel_count = len([image for image in converted_images if image.get_flags() & pygame.SRCALPHA])
+    print("{0} images, {1} with per-pixel alpha, {2} with surface alpha".format(len(converted_images),
+                                                                              per_pixel_count,
+                                                                              len(converted_images) - per_pixel_count))
+
+    print("{0:>8} {1:>16} {2:>16} {3:>9}".format("alpha", "raw (blits/s)", "converted (blits/s)", "speed up"))
+
+    for alpha in ALPHAS:
+        raw_time = min(timeit.repeat(lambda: blit_images(surface, raw_images, alpha), number=1, repeat=5))
+        converted_time = min(timeit.repeat(lambda: blit_images(surface, converted_images, alpha), number=1, repeat=5))
+
+        print("{0:>8} {1:>16.0f} {2:>16.0f} {3:>8.1f}x".format(str(alpha),
+                                                               BLITS / raw_time,
+                                                               BLITS / converted_time,
+                                                               raw_time / converted_time))
+
+    return 0
+
+
+if __name__ == "__main__":
+    main()
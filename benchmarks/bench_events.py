@@ -0,0 +1,81 @@
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from darkworld.model.events import Event, EventBus
+
+# Simulated ticks to measure
+TICKS = 10000
+
+# Events raised each tick - a busy tick in a world full of enemies while the player has an effect running
+EVENTS_PER_TICK = 4
+
+
+class PlainEvent():
+    # What an Event looked like before it had slots, pooling and lazy descriptions
+    def __init__(self, name: str, description: str = None, type: str = Event.DEFAULT):
+        self.name = name
+        self.description = description
+        self.type = type
+
+
+def plain_tick(bus, tick: int):
+    bus.add_event(PlainEvent(type=Event.GAME, name=Event.BLOCKED, description="You are protected"))
+    bus.add_event(PlainEvent(type=Event.GAME, name=Event.KILL_ENEMY, description="You slay some foes"))
+    bus.add_event(PlainEvent(type=Event.EFFECT, name=Event.EFFECT_END,
+                             description="Effect {0} wears off!".format(Event.EFFECT_PROTECTION)))
+    bus.add_event(PlainEvent(type=Event.GAME, name=Event.SWITCH,
+                             description="You switch {0}".format("switch{0}".format(tick % 10))))
+
+
+def compact_tick(bus, tick: int):
+    bus.add_event(Event.get_pooled(type=Event.GAME, name=Event.BLOCKED, description="You are protected"))
+    bus.add_event(Event.get_pooled(type=Event.GAME, name=Event.KILL_ENEMY, description="You slay some foes"))
+    bus.add_event(Event(type=Event.EFFECT, name=Event.EFFECT_END,
+                        description="Effect {0} wears off!", description_args=(Event.EFFECT_PROTECTION,)))
+    bus.add_event(Event(type=Event.GAME, name=Event.SWITCH,
+                        description="You switch {0}", description_args=("switch{0}".format(tick % 10),)))
+
+
+def run(tick_function):
+    # Raise the events and let the queue build up as it does when the events are only consumed once per frame
+    bus = EventBus()
+    for tick in range(TICKS):
+        tick_function(bus, tick)
+    return bus
+
+
+def measure_memory(tick_function):
+
+    tracemalloc.start()
+    start_size = tracemalloc.get_traced_memory()[0]
+    bus = run(tick_function)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    # Keep the bus alive until we have measured it
+    assert bus.size() == TICKS * EVENTS_PER_TICK
+
+    return size - start_size
+
+
+def main():
+
+    print("{0:>10} {1:>16} {2:>16} {3:>12}".format("events", "bytes per tick", "bytes per event", "us per tick"))
+
+    for name, tick_function in (("plain", plain_tick), ("compact", compact_tick)):
+        size = measure_memory(tick_function)
+        duration = min(timeit.repeat(lambda: run(tick_function), number=1, repeat=5))
+        print("{0:>10} {1:>16.1f} {2:>16.1f} {3:>12.2f}".format(name,
+                                                               size / TICKS,
+                                                               size / (TICKS * EVENTS_PER_TICK),
+                                                               duration / TICKS * 1e6))
+
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import random
+import sys
+import timeit
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from darkworld.model.worlds import RPGObject3D, PlaneObjects
+
+# Plane sizes to compare - the shipped worlds have up to ~400 objects in their busiest planes
+PLANE_SIZES = (50, 400, 2000, 10000)
+
+# How many delete/add operations to time for each plane size
+OPERATIONS = 2000
+
+
+def build_objects(count: int):
+    objects = []
+    for i in range(count):
+        objects.append(RPGObject3D(name="tile", opos=((i % 100) * 32, (i // 100) * 32, 0), osize=(32, 32, 32)))
+    return objects
+
+
+def delete_and_add(plane, victims):
+    # Mirror what World3D.delete_object3D() followed by add_object3D() does to a plane
+    for obj in victims:
+        if obj in plane:
+            plane.remove(obj)
+        plane.append(obj)
+
+
+def main():
+
+    random.seed(0)
+
+    print("{0:>8} {1:>14} {2:>14} {3:>9}".format("objects", "list (ms)", "ordered (ms)", "speed up"))
+
+    for size in PLANE_SIZES:
+        objects = build_objects(size)
+        victims = [random.choice(objects) for i in range(OPERATIONS)]
+
+        list_plane = list(objects)
+        list_time = min(timeit.repeat(lambda: delete_and_add(list_plane, victims), number=1, repeat=5))
+
+        ordered_plane = PlaneObjects(objects)
+        ordered_time = min(timeit.repeat(lambda: delete_and_add(ordered_plane, victims), number=1, repeat=5))
+
+        # Both containers should have ended up with the same draw order
+        assert list(list_plane) == list(ordered_plane)
+
+        print("{0:>8} {1:>14.3f} {2:>14.3f} {3:>8.1f}x".format(size,
+                                                               list_time * 1000,
+                                                               ordered_time * 1000,
+                                                               list_time / ordered_time))
+
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+# Draw with the SDL dummy drivers so that the suite runs without a display or sound card
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+import pygame
+
+import darkworld.model as model
+import darkworld.view as view
+from darkworld.model.worlds import WorldBuilder
+
+# Format version of the results file so that tools comparing results can tell what they are reading
+RESULTS_VERSION = 1
+
+# Default number of times that each benchmark is repeated
+REPEATS = 5
+
+
+def quietly():
+    # The model prints a lot so throw it away while timing
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def new_model(world_id: int):
+    random.seed(0)
+    m = model.DWModel("Benchmark")
+    with quietly():
+        m.initialise()
+        m.current_world_id = world_id
+        m.start()
+    return m
+
+
+def bench_world_builder_initialise(use_cache: bool):
+
+    def run():
+        builder = WorldBuilder(model.DWModel.DATA_FILES_DIR)
+        with quietly():
+            builder.initialise(use_cache=use_cache, lazy=False)
+        return 1
+
+    return run
+
+
+def bench_move_object_collision():
+
+    m = new_model(9)
+    world = m.world
+    moves = [model.World3D.EAST * 4, model.World3D.WEST * 4, model.World3D.UP * 4, model.World3D.DOWN * 4]
+    moves_random = random.Random(0)
+    vectors = [moves_random.choice(moves) for i in range(2000)]
+
+    def run():
+        # Wander the player around bumping into walls
+        world.move_player_to_start()
+        for vector in vectors:
+            world.move_object(world.player, vector)
+        return len(vectors)
+
+    return run
+
+
+def bench_touching_objects():
+
+    m = new_model(120)
+    world = m.world
+    targets = [bot.target_object for bot in world.bots] + [world.player]
+
+    def run():
+        count = 0
+        for i in range(200):
+            for target in targets:
+                world.touching_objects(target, object_filter=model.World3D.ENEMIES)
+                world.touching_objects(target, property_filter={"is_interactable": True})
+                world.touching_objects(target, distance=0, object_filter=model.World3D.SLOW_TILES)
+                count += 3
+        return count
+
+    return run
+
+
+def bench_swap_objects_by_name():
+
+    m = new_model(1)
+    world = m.world
+
+    def run():
+        with quietly():
+            for i in range(50):
+                world.swap_objects_by_name(model.Objects.SWITCH_TILE1, model.Objects.TILE1)
+                world.swap_objects_by_name(model.Objects.TILE1, model.Objects.SWITCH_TILE1)
+        return 100
+
+    return run
+
+
+def bench_model_tick():
+
+    # World 120 has the most bots
+    m = new_model(120)
+
+    def run():
+        with quietly():
+            for i in range(500):
+                m.tick()
+                if m.state != model.DWModel.STATE_PLAYING:
+                    m.reset()
+                    m.state = model.DWModel.STATE_PLAYING
+        return 500
+
+    return run
+
+
+def bench_many_patrol_bots(batch_moves: bool):
+
+    m = new_model(998)
+    world = m.world
+    z = world.player.z
+    bots_random = random.Random(0)
+
+    # Fill the world with bots wandering about and following routes
+    for i in range(150):
+        new_monster = model.WorldObjectLoader.get_object_copy_by_name(model.Objects.ENEMY1)
+        new_monster.set_pos((bots_random.randint(0, world.width - 32), bots_random.randint(0, world.height - 32), z))
+        if i % 2 == 0:
+            ai = model.AIBotRandom(new_monster, world)
+            ai.set_instructions((model.World3D.UP, model.World3D.DOWN, model.World3D.WEST, model.World3D.EAST))
+        else:
+            ai = model.AIBotRouteFollowing(new_monster, world)
+            ai.set_instructions([(bots_random.randint(0, world.width), bots_random.randint(0, world.height), z)
+                                 for j in range(3)])
+        world.add_monster(new_monster, ai)
+
+    def run():
+        # Tick every bot every time so that we are just timing the moves
+        old_settings = (model.World3D.BATCH_MOVES, model.World3D.SCHEDULE_BOTS)
+        model.World3D.BATCH_MOVES = batch_moves
+        model.World3D.SCHEDULE_BOTS = False
+        for i in range(50):
+            world.move_monsters()
+        model.World3D.BATCH_MOVES, model.World3D.SCHEDULE_BOTS = old_settings
+        return 50
+
+    return run
+
+
+def bench_world_transition():
+
+    m = new_model(9)
+
+    def run():
+        with quietly():
+            for world_id in m.world_ids:
+                m.move_world(world_id, do_copy=True)
+        return len(m.world_ids)
+
+    return run
+
+
+def bench_world_view_draw():
+
+    m = new_model(120)
+    main_frame = view.DWMainFrame(m)
+    with quietly():
+        main_frame.initialise()
+
+    def run():
+        with quietly():
+            for i in range(50):
+                main_frame.world_view.draw()
+        return 50
+
+    return run
+
+
+# Name of each benchmark and how to set it up
+BENCHMARKS = (
+    ("world_builder_initialise_csv", lambda: bench_world_builder_initialise(use_cache=False)),
+    ("world_builder_initialise_cache", lambda: bench_world_builder_initialise(use_cache=True)),
+    ("move_object_collision", bench_move_object_collision),
+    ("touching_objects_filtered", bench_touching_objects),
+    ("swap_objects_by_name", bench_swap_objects_by_name),
+    ("model_tick_all_bots", bench_model_tick),
+    ("many_patrol_bots_single", lambda: bench_many_patrol_bots(batch_moves=False)),
+    ("many_patrol_bots_batched", lambda: bench_many_patrol_bots(batch_moves=True)),
+    ("world_transition_copy", bench_world_transition),
+    ("world_view_draw", bench_world_view_draw),
+)
+
+
+def run_benchmark(name: str, setup, repeats: int):
+
+    run = setup()
+
+    # Warm up caches before timing
+    run()
+
+    times = []
+    for i in range(repeats):
+        start = time.perf_counter()
+        operations = run()
+        times.append((time.perf_counter() - start) / operations)
+
+    return {"name": name,
+            "operations": operations,
+            "repeats": repeats,
+            "mean_us": statistics.mean(times) * 1e6,
+            "median_us": statistics.median(times) * 1e6,
+            "min_us": min(times) * 1e6,
+            "max_us": max(times) * 1e6}
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Time the Dark World model and renderer hot paths")
+    parser.add_argument("--output", default="bench_results.json", help="file to write the JSON results to")
+    parser.add_argument("--repeats", type=int, default=REPEATS, help="times to repeat each benchmark")
+    parser.add_argument("--only", nargs="*", default=None, help="names of the benchmarks to run")
+    args = parser.parse_args()
+
+    pygame.init()
+
+    # Keep background world loading from running while we are timing things
+    model.DWModel.PREFETCH_WORLDS = False
+
+    results = []
+
+    print("{0:<32} {1:>12} {2:>12} {3:>12}".format("benchmark", "mean (us)", "median (us)", "min (us)"))
+
+    for name, setup in BENCHMARKS:
+        if args.only is not None and name not in args.only:
+            continue
+        result = run_benchmark(name, setup, args.repeats)
+        results.append(result)
+        print("{0:<32} {1:>12.2f} {2:>12.2f} {3:>12.2f}".format(name,
+                                                              result["mean_us"],
+                                                              result["median_us"],
+                                                              result["min_us"]))
+
+    report = {"version": RESULTS_VERSION,
+              "timestamp": datetime.datetime.now().isoformat(),
+              "python": platform.python_version(),
+              "platform": platform.platform(),
+              "pygame": pygame.version.ver,
+              "numpy": np.__version__,
+              "results": results}
+
+    with open(args.output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+
+    print("Results written to {0}".format(args.output))
+
+    return 0
+
+
+if __name__ == "__main__":
+    main()
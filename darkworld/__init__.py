@@ -1,3 +1,2 @@
 from darkworld.controller import DWController
-
-
+from darkworld.controller import DWSimulator
@@ -7,8 +7,8 @@ import random
 class AudioManager:
     DEFAULT_THEME = "default"
 
-    RESOURCES_DIR = os.path.dirname(__file__) + "\\resources\\"
-    RESOURCES_DIR_MUSIC = os.path.dirname(__file__) + "\\resources\\music\\"
+    RESOURCES_DIR = os.path.join(os.path.dirname(__file__), "resources", "")
+    RESOURCES_DIR_MUSIC = os.path.join(os.path.dirname(__file__), "resources", "music", "")
 
     def __init__(self):
 
@@ -24,9 +24,22 @@ class AudioManager:
         self.sound_on = True
         self.music_volume = 1.0
         self.sound_volume = 1.0
+        self._debug = False
+
+    def debug(self, debug_on: bool = None):
+        if debug_on is None:
+            self._debug = not self._debug
+        else:
+            self._debug = debug_on
 
     def process_event(self, new_event: model.Event):
-        print("AudioManager event process:{0}".format(new_event))
+
+        if self._debug is True:
+            print("AudioManager event process:{0}".format(new_event))
+
+        if new_event.type == model.Event.DEBUG:
+            self.debug()
+
         self.get_theme_sound(new_event.name, sound_theme=self.current_sound_theme)
 
         if new_event.type == model.Event.STATE:
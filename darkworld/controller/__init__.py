@@ -1 +1,2 @@
 from .controller import *
+from .headless import DWSimulator
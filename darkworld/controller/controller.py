@@ -1,6 +1,7 @@
 import darkworld.model as model
 import darkworld.view as view
 import darkworld.audio as audio
+from darkworld.instrumentation import instrumentation
 
 import os
 import pygame
@@ -11,22 +12,72 @@ from pygame.locals import *
 
 class DWController:
 
+    # Fixed rates that the model and the view are ticked at and the target frame rate for drawing
+    MODEL_TICK_MS = 15
+    VIEW_TICK_MS = 300
+    MAX_CATCH_UP_TICKS = 5
+    FRAME_RATE = 60
+
+    # Time allowed for delivering game events each frame so that a storm of events can't hold up drawing
+    EVENT_BUDGET_MS = 5
+
+    # Where to export instrumentation timings to
+    INSTRUMENTATION_FILE_NAME = "darkworld_timings"
+
     def __init__(self):
         self.m = model.DWModel("Dark World")
         self.v = view.DWMainFrame(self.m)
         self.audio = audio.AudioManager()
         self._debug = False
+        self.quit_requested = False
 
     def initialise(self):
 
         pygame.init()
 
+        self.add_instrumentation()
+
         self.m.initialise()
         self.v.initialise()
         self.audio.initialise()
 
+        # Subscribe to the game events in the order that they should be delivered
+        self.m.events.subscribe(self.v.process_event)
+        self.m.events.subscribe(self.change_audio_theme, event_name=model.Event.NEW_WORLD)
+        self.m.events.subscribe(self.audio.process_event)
+        self.m.events.subscribe(self.request_quit, event_type=model.Event.QUIT)
+
+    def add_instrumentation(self):
+
+        # Hot paths that get timed when debug mode is switched on
+        instrumentation.add_target(model.DWModel, "tick")
+        instrumentation.add_target(model.World3D, "move_monsters")
+        instrumentation.add_target(model.BotScheduler, "tick")
+        instrumentation.add_target(model.BatchMovement, "complete_moves")
+        instrumentation.add_target(model.World3D, "move_object")
+        instrumentation.add_target(model.World3D, "touching_objects")
+        instrumentation.add_target(view.ModelToView3D, "get_object_list")
+        instrumentation.add_target(view.DWWorldView, "draw")
+        instrumentation.add_target(view.DWMainFrame, "update")
+        instrumentation.add_target(audio.AudioManager, "process_event")
+
+        # Time each type of AI bot separately including the bots whose moves get made in a batch
+        bot_classes = [model.AIBot]
+        for bot_class in bot_classes:
+            bot_classes.extend(bot_class.__subclasses__())
+            for method_name in ("tick", "plan_move", "complete_tick"):
+                if method_name in bot_class.__dict__.keys():
+                    instrumentation.add_target(bot_class, method_name)
+
     def debug(self):
         self._debug = not self._debug
+
+        # Only time the hot paths while in debug mode
+        if self._debug is True:
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
         self.m.events.add_event(model.Event(type=model.Event.DEBUG,
                                     name="Debug={0}".format(self._debug),
                                     description="Debug mode = {0}".format(self._debug)))
@@ -46,11 +97,11 @@ class DWController:
 
         FPSCLOCK = pygame.time.Clock()
 
-        # Model tick timer
-        pygame.time.set_timer(USEREVENT + 1, 15)
-
-        # View tick timer
-        pygame.time.set_timer(USEREVENT + 2, 300)
+        # Fixed timesteps for ticking the model and the view regardless of how long each frame takes to draw
+        self.model_clock = FixedTimestep(DWController.MODEL_TICK_MS, DWController.MAX_CATCH_UP_TICKS)
+        self.view_clock = FixedTimestep(DWController.VIEW_TICK_MS, 1)
+        self.frame_stats = FrameStats(DWController.FRAME_RATE)
+        frame_time = 0
 
         # Sound effects tick timer
         pygame.time.set_timer(USEREVENT + 3, 8000)
@@ -61,56 +112,24 @@ class DWController:
 
         while loop is True:
 
-            # Loop to process Dark World game events
-            event = self.m.get_next_event()
-            while event is not None:
-
-                try:
-                    self.m.process_event(event)
-                    self.v.process_event(event)
-
-                    if event.name == model.Event.NEW_WORLD:
-                        print("Changing world skin = {0}".format(self.m.world.skin))
-                        self.audio.current_music_theme = self.m.world.skin
-                        self.audio.current_sound_theme = self.m.world.skin
-                        self.audio.print()
-
-                    self.audio.process_event(event)
-
-                except Exception as err:
-                    print("Caught exception {0}".format(str(err)))
-
-                if event.type == model.Event.QUIT:
-                    loop = False
-                    break
+            # Deliver the Dark World game events to their subscribers
+            self.m.events.process_events(DWController.EVENT_BUDGET_MS / 1000)
+            if self.quit_requested is True:
+                loop = False
 
-                event = self.m.get_next_event()
+            # Run as many fixed model ticks as we need to catch up with the time that the last frame took
+            model_ticks = self.model_clock.advance(frame_time)
+            for i in range(model_ticks):
+                if self.m.state == model.DWModel.STATE_PLAYING:
+                    self.move_player()
+                    self.m.tick()
 
             # If we are playing the game then process all of the key controls
             if self.m.state == model.DWModel.STATE_PLAYING:
                 # Key pressed events - more time critical actions
                 keys = pygame.key.get_pressed()
 
-                # First key if the movement keys are pressed
-                move_vector = model.World3D.DUMMY
-
-                if keys[K_LEFT] or keys[K_a]:
-                    move_vector = np.add(move_vector, np.array(model.World3D.WEST))
-
-                elif keys[K_RIGHT] or keys[K_d]:
-                    move_vector = np.add(move_vector, np.array(model.World3D.EAST))
-
-                if keys[K_UP] or keys[K_w]:
-                    move_vector = np.add(move_vector, np.array(model.World3D.DOWN))
-
-                elif keys[K_DOWN] or keys[K_s]:
-                    move_vector = np.add(move_vector, np.array(model.World3D.UP))
-
-                # If the player chose to move then attempt to do so...
-                if np.array_equal(move_vector, model.World3D.DUMMY) is False:
-                    self.m.move_player(move_vector * self.move_speed)
-
-                # Now see if the player wants to change the camera zoom...
+                # See if the player wants to change the camera zoom...
                 if keys[K_PAGEUP]:
                     self.v.world_view.zoom_view(0.01)
                 elif keys[K_PAGEDOWN]:
@@ -123,17 +142,8 @@ class DWController:
 
                 if self.m.state == model.DWModel.STATE_PLAYING:
 
-                    # Timer events for the model to process
-                    if event.type == USEREVENT + 1:
-
-                        self.m.tick()
-
-                    # Timer for the view time based events
-                    elif event.type == USEREVENT + 2:
-                        self.v.tick()
-
                     # Timer events for audio time-based events
-                    elif event.type == USEREVENT + 3:
+                    if event.type == USEREVENT + 3:
                         self.audio.get_theme_sound(model.Event.RANDOM_ENVIRONMENT, self.m.world.skin)
 
                     # Key UP events - less time critical actions
@@ -149,6 +159,8 @@ class DWController:
                             self.v.print()
                             self.m.print()
                             self.audio.print()
+                            self.print()
+                            instrumentation.print()
                         elif event.key == K_F1:
                             self.m.help()
                         elif event.key == K_F2:
@@ -159,6 +171,9 @@ class DWController:
                             self.m.move_world()
                         elif event.key == K_F5 and self._debug is True:
                             self.m.reset()
+                        elif event.key == K_F9 and self._debug is True:
+                            instrumentation.export_json(DWController.INSTRUMENTATION_FILE_NAME + ".json")
+                            instrumentation.export_csv(DWController.INSTRUMENTATION_FILE_NAME + ".csv")
                         elif event.key == K_F11:
                             self.v.world_view.m2v.infinity += 10
                         elif event.key == K_F10:
@@ -190,9 +205,8 @@ class DWController:
                             self.v.print()
                             self.m.print()
                             self.audio.print()
-                    # Timer events
-                    elif event.type == USEREVENT + 2:
-                        self.v.tick()
+                            self.print()
+                            instrumentation.print()
 
                     # Timer for talking
                     elif event.type == USEREVENT + 3:
@@ -215,9 +229,8 @@ class DWController:
                             self.v.print()
                             self.m.print()
                             self.audio.print()
-                    # Timer events
-                    elif event.type == USEREVENT + 2:
-                        self.v.tick()
+                            self.print()
+                            instrumentation.print()
 
                     # Timer for talking
                     elif event.type == USEREVENT + 3:
@@ -240,15 +253,13 @@ class DWController:
                             self.v.print()
                             self.m.print()
                             self.audio.print()
+                            self.print()
+                            instrumentation.print()
                         elif event.key == K_F11:
                             self.debug()
                         elif event.key == K_q:
                             self.m.player_died()
 
-                    # Timer events
-                    elif event.type == USEREVENT + 2:
-                        self.v.tick()
-
                     # Timer for talking
                     elif event.type == USEREVENT + 3:
                         self.m.talk_to_npc(npc_object=None, npc_name="The Master", world_id=self.m.state)
@@ -262,10 +273,6 @@ class DWController:
                             self.m.move_world(do_copy = True)
                             self.m.state = model.DWModel.STATE_PLAYING
 
-                    # Timer events
-                    elif event.type == USEREVENT + 2:
-                        self.v.tick()
-
                 # Process events for when the game is in state GAME_OVER
                 elif self.m.state == model.DWModel.STATE_GAME_OVER:
 
@@ -279,10 +286,8 @@ class DWController:
                             self.v.print()
                             self.m.print()
                             self.audio.print()
-
-                    # Timer events
-                    elif event.type == USEREVENT + 2:
-                        self.v.tick()
+                            self.print()
+                            instrumentation.print()
 
                     # Timer for talking
                     elif event.type == USEREVENT + 3:
@@ -292,9 +297,117 @@ class DWController:
                 if event.type == QUIT:
                     loop = False
 
+                # Redraw all of the window if it has been uncovered
+                elif event.type in (VIDEOEXPOSE, WINDOWEXPOSED):
+                    self.v.redraw()
+
+            # Tick the view at its own fixed rate
+            for i in range(self.view_clock.advance(frame_time)):
+                self.v.tick()
+
             self.v.draw()
             self.v.update()
 
-            FPSCLOCK.tick(60)
+            frame_time = FPSCLOCK.tick(DWController.FRAME_RATE)
+            self.frame_stats.add_frame(frame_time)
 
         self.end()
+
+    def change_audio_theme(self, event: model.Event):
+
+        if self._debug is True:
+            print("Changing world skin = {0}".format(self.m.world.skin))
+
+        self.audio.current_music_theme = self.m.world.skin
+        self.audio.current_sound_theme = self.m.world.skin
+
+    def request_quit(self, event: model.Event):
+        self.quit_requested = True
+
+    def move_player(self):
+
+        # Key pressed events - more time critical actions
+        keys = pygame.key.get_pressed()
+
+        # First key if the movement keys are pressed
+        move_vector = model.World3D.DUMMY
+
+        if keys[K_LEFT] or keys[K_a]:
+            move_vector = np.add(move_vector, np.array(model.World3D.WEST))
+
+        elif keys[K_RIGHT] or keys[K_d]:
+            move_vector = np.add(move_vector, np.array(model.World3D.EAST))
+
+        if keys[K_UP] or keys[K_w]:
+            move_vector = np.add(move_vector, np.array(model.World3D.DOWN))
+
+        elif keys[K_DOWN] or keys[K_s]:
+            move_vector = np.add(move_vector, np.array(model.World3D.UP))
+
+        # If the player chose to move then attempt to do so...
+        if np.array_equal(move_vector, model.World3D.DUMMY) is False:
+            self.m.move_player(move_vector * self.move_speed)
+
+    def print(self):
+        print("Printing {0} controller...".format(__class__))
+        self.model_clock.print("Model")
+        self.view_clock.print("View")
+        self.frame_stats.print()
+
+
+class FixedTimestep:
+    """
+    Accumulates the real time that has passed and hands it out as a whole number of fixed length ticks.
+    If we fall too far behind then only a limited number of ticks are run to catch up and the rest are dropped
+    so that a slow frame doesn't cause a spiral of ever longer frames.
+    """
+
+    def __init__(self, tick_ms: int, max_catch_up_ticks: int):
+        self.tick_ms = tick_ms
+        self.max_catch_up_ticks = max_catch_up_ticks
+        self.lag = 0
+        self.max_lag = 0
+        self.ticks = 0
+        self.dropped_ticks = 0
+
+    def advance(self, elapsed_ms: int):
+
+        self.lag += elapsed_ms
+        self.max_lag = max(self.max_lag, self.lag)
+
+        ticks = self.lag // self.tick_ms
+        if ticks > self.max_catch_up_ticks:
+            self.dropped_ticks += ticks - self.max_catch_up_ticks
+            ticks = self.max_catch_up_ticks
+            self.lag = self.lag % self.tick_ms
+        else:
+            self.lag -= ticks * self.tick_ms
+
+        self.ticks += ticks
+
+        return ticks
+
+    def print(self, name: str):
+        print("{0} timestep {1}ms: {2} ticks, {3} dropped ticks, lag {4}ms (max {5}ms)".format(
+            name, self.tick_ms, self.ticks, self.dropped_ticks, self.lag, self.max_lag))
+
+
+class FrameStats:
+    """
+    Counts the frames that we draw and how many frames we missed because a frame took too long.
+    """
+
+    def __init__(self, frame_rate: int):
+        self.frame_ms = 1000 / frame_rate
+        self.frames = 0
+        self.dropped_frames = 0
+        self.max_frame_time = 0
+
+    def add_frame(self, frame_time: int):
+        self.frames += 1
+        self.max_frame_time = max(self.max_frame_time, frame_time)
+        self.dropped_frames += max(int(frame_time // self.frame_ms) - 1, 0)
+
+    def print(self):
+        print("Frames: {0} drawn, {1} dropped, longest frame {2}ms".format(
+            self.frames, self.dropped_frames, self.max_frame_time))
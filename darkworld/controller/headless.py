@@ -0,0 +1,213 @@
+import darkworld.model as model
+
+import argparse
+import contextlib
+import io
+import random
+import time
+import numpy as np
+
+
+class DWSimulator:
+    """
+    Drives a DWModel without a display, mixer or pygame timers.
+    Each tick takes the next set of actions from a scripted input stream, applies them to the model
+    in the same way that DWController does for key presses and then ticks the model as fast as possible.
+    """
+
+    # Actions that can be used in an input script
+    MOVE_LEFT = "left"
+    MOVE_RIGHT = "right"
+    MOVE_UP = "up"
+    MOVE_DOWN = "down"
+    INTERACT = "interact"
+    ATTACK = "attack"
+    WAIT = "wait"
+
+    ACTIONS = (MOVE_LEFT, MOVE_RIGHT, MOVE_UP, MOVE_DOWN, INTERACT, ATTACK, WAIT)
+
+    # Same mapping of movement to direction as the controller's arrow keys
+    MOVES = {MOVE_LEFT: model.World3D.WEST,
+             MOVE_RIGHT: model.World3D.EAST,
+             MOVE_UP: model.World3D.DOWN,
+             MOVE_DOWN: model.World3D.UP}
+
+    def __init__(self, m: model.DWModel = None, move_speed: int = 2, quiet: bool = True):
+
+        if m is None:
+            m = model.DWModel("Dark World")
+
+        self.m = m
+        self.move_speed = move_speed
+        self.quiet = quiet
+
+        # Stats
+        self.tick_count = 0
+        self.event_count = 0
+        self.elapsed = 0.0
+        self.worlds_visited = []
+
+    def initialise(self, start_world_id: int = None):
+
+        # We tick as fast as possible so a time budget for the bots would only make runs with the same seed differ
+        self.m.bot_time_budget = None
+
+        with self.output():
+            self.m.initialise()
+            if start_world_id is not None:
+                self.m.current_world_id = start_world_id
+            self.m.start()
+
+        self.worlds_visited.append(self.m.current_world_id)
+
+    def output(self):
+
+        # Throw away all of the printing that the model does when we want to run flat out
+        if self.quiet is True:
+            return contextlib.redirect_stdout(io.StringIO())
+        else:
+            return contextlib.nullcontext()
+
+    def tick(self, actions=()):
+
+        if isinstance(actions, str):
+            actions = (actions,)
+
+        m = self.m
+
+        if m.state == model.DWModel.STATE_PLAYING:
+
+            move_vector = model.World3D.DUMMY
+            for action in actions:
+                if action in DWSimulator.MOVES.keys():
+                    move_vector = np.add(move_vector, DWSimulator.MOVES[action])
+                elif action == DWSimulator.INTERACT:
+                    m.interact()
+                elif action == DWSimulator.ATTACK:
+                    m.do_melee_attack()
+                elif action != DWSimulator.WAIT:
+                    raise Exception("Unknown simulator action '{0}'".format(action))
+
+            if np.array_equal(move_vector, model.World3D.DUMMY) is False:
+                m.move_player(move_vector * self.move_speed)
+
+            m.tick()
+
+        # Deliver the game events like the controller does
+        self.event_count += m.events.process_events()
+
+        # Do what a player would do to keep the game going
+        if m.state == model.DWModel.STATE_WORLD_COMPLETE:
+            m.move_world(do_copy=True)
+            m.state = model.DWModel.STATE_PLAYING
+        elif m.state in (model.DWModel.STATE_READY, model.DWModel.STATE_PAUSED):
+            m.start()
+
+        if m.current_world_id != self.worlds_visited[-1]:
+            self.worlds_visited.append(m.current_world_id)
+
+        self.tick_count += 1
+
+    def run(self, script, max_ticks: int = None):
+
+        start_time = time.perf_counter()
+
+        with self.output():
+            for actions in script:
+                if max_ticks is not None and self.tick_count >= max_ticks:
+                    break
+                if self.m.state == model.DWModel.STATE_GAME_OVER:
+                    break
+                self.tick(actions)
+
+        self.elapsed += time.perf_counter() - start_time
+
+        return self.get_stats()
+
+    @property
+    def ticks_per_second(self):
+        if self.elapsed > 0:
+            return self.tick_count / self.elapsed
+        else:
+            return 0.0
+
+    def get_stats(self):
+        return {"ticks": self.tick_count,
+                "elapsed": self.elapsed,
+                "ticks_per_second": self.ticks_per_second,
+                "events": self.event_count,
+                "model_ticks": self.m.tick_count,
+                "state": self.m.state,
+                "worlds_visited": list(self.worlds_visited),
+                "bots": len(self.m.world.bots)}
+
+    def print(self):
+        print("Headless simulation: {0} ticks in {1:.3f}s = {2:.1f} ticks/sec, {3} events, worlds visited {4}".format(
+            self.tick_count, self.elapsed, self.ticks_per_second, self.event_count, self.worlds_visited))
+
+    @staticmethod
+    def random_script(ticks: int, seed: int = None, hold: int = 10):
+
+        # Generate an input stream that wanders around pressing buttons and holding each move for a while
+        script_random = random.Random(seed)
+        moves = list(DWSimulator.MOVES.keys()) + [DWSimulator.WAIT]
+
+        action = DWSimulator.WAIT
+        for i in range(ticks):
+            if i % hold == 0:
+                action = script_random.choice(moves)
+            if script_random.random() < 0.02:
+                yield (action, DWSimulator.INTERACT)
+            elif script_random.random() < 0.02:
+                yield (action, DWSimulator.ATTACK)
+            else:
+                yield (action,)
+
+    @staticmethod
+    def load_script(file_name: str):
+
+        # Each line of a script file is a list of actions for one tick with an optional repeat count e.g. 'left up x20'
+        with open(file_name, 'r') as script_file:
+            for line in script_file:
+                line = line.split("#")[0].split()
+                if len(line) == 0:
+                    continue
+                repeat = 1
+                if line[-1].startswith("x") and line[-1][1:].isdigit():
+                    repeat = int(line.pop()[1:])
+                for i in range(repeat):
+                    yield tuple(line)
+
+
+def main():
+
+    parser = argparse.ArgumentParser(description="Run Dark World without a display")
+    parser.add_argument("--ticks", type=int, default=10000, help="number of ticks to simulate")
+    parser.add_argument("--seed", type=int, default=None, help="random seed for the game and the generated input")
+    parser.add_argument("--world", type=int, default=None, help="world to start in")
+    parser.add_argument("--script", default=None, help="file of scripted actions to use instead of random input")
+    parser.add_argument("--verbose", action="store_true", help="show the game's own output")
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    simulator = DWSimulator(quiet=not args.verbose)
+    simulator.initialise(args.world)
+
+    if args.script is not None:
+        script = DWSimulator.load_script(args.script)
+    else:
+        script = DWSimulator.random_script(args.ticks, args.seed)
+
+    simulator.run(script, max_ticks=args.ticks)
+    simulator.print()
+
+    with simulator.output():
+        simulator.m.end()
+
+    return 0
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+import collections
+import csv
+import functools
+import json
+import time
+
+
+class Instrumentation:
+    """
+    Records rolling timings and call counts for a set of hot methods.
+    The methods are only wrapped with timers while instrumentation is enabled and the original methods
+    are put back when it is disabled so that it costs nothing when it is not being used.
+    """
+
+    # Number of recent calls that the rolling timings are calculated over
+    WINDOW = 120
+
+    def __init__(self, window: int = WINDOW):
+        self.window = window
+        self.enabled = False
+        self.targets = []
+        self.originals = []
+        self.calls = {}
+        self.total_time = {}
+        self.recent_times = {}
+
+    def add_target(self, owner, method_name: str, name: str = None):
+
+        if name is None:
+            name = "{0}.{1}".format(owner.__name__, method_name)
+
+        self.targets.append((owner, method_name, name))
+
+        # If we are already running then start timing the new target straight away
+        if self.enabled is True:
+            self.wrap(owner, method_name, name)
+
+    def enable(self):
+
+        if self.enabled is True:
+            return
+
+        for owner, method_name, name in self.targets:
+            self.wrap(owner, method_name, name)
+
+        self.enabled = True
+
+    def disable(self):
+
+        if self.enabled is False:
+            return
+
+        # Put back the original methods in reverse order in case a method was wrapped more than once
+        for owner, method_name, method in reversed(self.originals):
+            setattr(owner, method_name, method)
+
+        self.originals = []
+        self.enabled = False
+
+    def wrap(self, owner, method_name: str, name: str):
+
+        method = owner.__dict__.get(method_name)
+        if method is None:
+            print("Can't instrument {0} - {1} doesn't define {2}".format(name, owner.__name__, method_name))
+            return
+
+        record = self.record
+        timer = time.perf_counter
+
+        @functools.wraps(method)
+        def timed_method(*args, **kwargs):
+            start = timer()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                record(name, timer() - start)
+
+        self.originals.append((owner, method_name, method))
+        setattr(owner, method_name, timed_method)
+
+    def record(self, name: str, duration: float):
+
+        if name not in self.calls.keys():
+            self.calls[name] = 0
+            self.total_time[name] = 0.0
+            self.recent_times[name] = collections.deque(maxlen=self.window)
+
+        self.calls[name] += 1
+        self.total_time[name] += duration
+        self.recent_times[name].append(duration)
+
+    def reset(self):
+        self.calls = {}
+        self.total_time = {}
+        self.recent_times = {}
+
+    def get_stats(self):
+
+        stats = []
+
+        for name in self.calls.keys():
+            recent_times = self.recent_times[name]
+            stats.append({"name": name,
+                          "calls": self.calls[name],
+                          "total_ms": self.total_time[name] * 1000,
+                          "mean_ms": sum(recent_times) / len(recent_times) * 1000,
+                          "max_ms": max(recent_times) * 1000,
+                          "last_ms": recent_times[-1] * 1000})
+
+        return sorted(stats, key=lambda stat: stat["total_ms"], reverse=True)
+
+    def get_summary(self, count: int = None):
+
+        # One line of text per instrumented method for displaying in a debug overlay
+        lines = []
+        for stat in self.get_stats()[:count]:
+            lines.append("{0}: {1} calls, mean {2:.3f}ms, max {3:.3f}ms".format(stat["name"],
+                                                                               stat["calls"],
+                                                                               stat["mean_ms"],
+                                                                               stat["max_ms"]))
+        return lines
+
+    def export_json(self, file_name: str):
+
+        with open(file_name, 'w') as export_file:
+            json.dump({"window": self.window, "timings": self.get_stats()}, export_file, indent=2)
+
+    def export_csv(self, file_name: str):
+
+        fields = ("name", "calls", "total_ms", "mean_ms", "max_ms", "last_ms")
+
+        with open(file_name, 'w', newline='') as export_file:
+            writer = csv.DictWriter(export_file, fieldnames=fields)
+            writer.writeheader()
+            for stat in self.get_stats():
+                writer.writerow(stat)
+
+    def print(self):
+        print("Instrumentation enabled={0} (rolling window of {1} calls)".format(self.enabled, self.window))
+        for line in self.get_summary():
+            print(line)
+
+
+# Shared instance that the game registers its hot methods with
+instrumentation = Instrumentation()
@@ -1,6 +1,12 @@
 from .model import DWModel
 from .worlds import WorldObjectLoader
 from .model import Event
+from .events import EventBus
 from .worlds import World3D
 from .worlds import Navigator
-from .objects import Objects
\ No newline at end of file
+from .objects import Objects
+from .worlds import AIBot
+from .worlds import BotScheduler
+from .worlds import BatchMovement
+from .worlds import AIBotRandom
+from .worlds import AIBotRouteFollowing
@@ -1,3 +1,7 @@
+import collections
+import time
+
+
 class Event():
 
     # Event Types
@@ -69,10 +73,133 @@ class Event():
         EFFECT_MELEE_ATTACK : 20
     }
 
-    def __init__(self, name: str, description: str = None, type: str = DEFAULT):
+    # Events are created every tick so keep them small.  Events should not be changed once they have been created
+    # as the events from get_pooled() are shared.
+    __slots__ = ("name", "type", "_description", "_description_args")
+
+    # Shared events that always have the same name, description and type
+    _pool = {}
+
+    def __init__(self, name: str, description: str = None, type: str = DEFAULT, description_args: tuple = None):
         self.name = name
-        self.description = description
         self.type = type
 
+        # If there are description arguments then the description is a format string that only gets
+        # filled in if someone reads it
+        self._description = description
+        self._description_args = description_args
+
+    @property
+    def description(self):
+        if self._description_args is not None:
+            self._description = self._description.format(*self._description_args)
+            self._description_args = None
+        return self._description
+
+    @staticmethod
+    def get_pooled(name: str, description: str = None, type: str = DEFAULT):
+
+        # Reuse the same event for events that happen a lot and never change
+        key = (name, description, type)
+        if key not in Event._pool.keys():
+            Event._pool[key] = Event(name=name, description=description, type=type)
+
+        return Event._pool[key]
+
     def __str__(self):
-        return "{0}:{1} ({2})".format(self.name, self.description, self.type)
\ No newline at end of file
+        return "{0}:{1} ({2})".format(self.name, self.description, self.type)
+
+
+class EventBus():
+    """
+    Queue of game events that are delivered in the order that they were added to subscribers that have
+    registered for particular event types and/or names.
+    The subscribers for each type and name of event are looked up once and kept in a dispatch table.
+    """
+
+    def __init__(self):
+        self.events = collections.deque()
+        self.subscribers = []
+        self.dispatch_table = {}
+        self._debug = False
+
+        # Stats
+        self.published = 0
+        self.delivered = 0
+        self.deferred = 0
+        self.errors = 0
+
+    def debug(self, debug_on: bool = None):
+        if debug_on is None:
+            self._debug = not self._debug
+        else:
+            self._debug = debug_on
+
+    def subscribe(self, handler, event_type: str = None, event_name: str = None):
+
+        # Register a function to be called with each event of the specified type and name.
+        # Leave the type or the name as None to get events of any type or name.
+        self.subscribers.append((event_type, event_name, handler))
+        self.dispatch_table = {}
+
+    def unsubscribe(self, handler):
+        self.subscribers = [subscriber for subscriber in self.subscribers if subscriber[2] != handler]
+        self.dispatch_table = {}
+
+    def get_handlers(self, event_type: str, event_name: str):
+
+        key = (event_type, event_name)
+
+        if key not in self.dispatch_table.keys():
+            self.dispatch_table[key] = tuple(handler for subscribed_type, subscribed_name, handler in self.subscribers
+                                             if subscribed_type in (None, event_type) and
+                                             subscribed_name in (None, event_name))
+
+        return self.dispatch_table[key]
+
+    def add_event(self, new_event: Event):
+        self.events.append(new_event)
+        self.published += 1
+
+    def pop_event(self):
+        return self.events.popleft()
+
+    def size(self):
+        return len(self.events)
+
+    def dispatch(self, event: Event):
+
+        for handler in self.get_handlers(event.type, event.name):
+            try:
+                handler(event)
+            except Exception as err:
+                self.errors += 1
+                print("Caught exception {0} delivering {1}".format(str(err), event))
+
+        self.delivered += 1
+
+    def process_events(self, time_budget: float = None):
+
+        # Deliver the waiting events in order until they have all gone or we run out of time.
+        # Anything left over waits for the next time.
+        start_time = time.perf_counter()
+        count = 0
+
+        while len(self.events) > 0:
+
+            if time_budget is not None and count > 0 and time.perf_counter() - start_time > time_budget:
+                self.deferred += len(self.events)
+                if self._debug is True:
+                    print("Event bus out of time with {0} events waiting".format(len(self.events)))
+                break
+
+            self.dispatch(self.events.popleft())
+            count += 1
+
+        return count
+
+    def print(self):
+        print("Event bus: {0} subscribers, {1} waiting, {2} published, {3} delivered, {4} deferred, {5} errors".format(
+            len(self.subscribers), len(self.events), self.published, self.delivered, self.deferred, self.errors))
+        for event in self.events:
+            print(event)
@@ -1,4 +1,3 @@
-import collections
 import os
 from darkworld.model.RPGConversations import *
 
@@ -7,7 +6,7 @@ from darkworld.model.events import *
 
 
 class DWModel():
-    DATA_FILES_DIR = os.path.dirname(__file__) + "\\data\\"
+    DATA_FILES_DIR = os.path.join(os.path.dirname(__file__), "data", "")
 
     # Define states to synch up with corresponding event names
     STATE_LOADED = Event.STATE_LOADED
@@ -23,17 +22,29 @@ class DWModel():
     # Define Effects
     EFFECT_COUNTDOWN_RATE = 1
 
-    def __init__(self, name: str):
+    # Only load each world the first time that it is played
+    LAZY_WORLD_LOADING = True
+
+    # Get the worlds next to the current world ready in the background
+    PREFETCH_WORLDS = True
+
+    def __init__(self, name: str, bot_time_budget: float = None):
 
         # Properties
         self.name = name
+
+        # Time allowed for ticking the bots in each world every tick in seconds or None for no limit
+        self.bot_time_budget = bot_time_budget
+
         self.tick_count = 0
         self._state = None
         self._debug = False
 
         # Model Components
-        self.events = EventQueue()
+        self.events = EventBus()
+        self.events.subscribe(self.process_event, event_type=Event.DEBUG)
         self.world_factory = None
+        self.world_prefetcher = None
         self.world = None
         self.current_world_id = 0
 
@@ -56,13 +67,14 @@ class DWModel():
             self._state = new_state
             self.events.add_event(Event(type=Event.STATE,
                                         name=self.state,
-                                        description="Game state changed to {0}".format(self.state)))
+                                        description="Game state changed to {0}", description_args=(self.state,)))
 
     def initialise(self):
         print("Initialising {0}:{1}".format(self.name, __class__))
 
         self.world_factory = WorldBuilder(DWModel.DATA_FILES_DIR)
-        self.world_factory.initialise()
+        self.world_factory.initialise(lazy=DWModel.LAZY_WORLD_LOADING)
+        self.world_prefetcher = WorldPrefetcher(self.world_factory)
         self.world_ids = self.world_factory.get_world_names()
         self.current_world_id = self.world_ids[0]
         # self.world = self.world_factory.get_world(self.current_world_id)
@@ -118,6 +130,12 @@ class DWModel():
             self.difficulty += 1
         return self.world_ids[idx]
 
+    def peek_next_world_id(self):
+        # Same as get_next_world_id() but without changing the difficulty when we go back to the first world
+        idx = self.world_ids.index(self.current_world_id)
+        idx = (idx + 1) % len(self.world_ids)
+        return self.world_ids[idx]
+
     def get_previous_world_id(self):
         idx = self.world_ids.index(self.current_world_id)
         idx = max(idx - 1, 0)
@@ -149,9 +167,12 @@ class DWModel():
         for obj, count in self.inventory.items():
             print("Carrying {0} x {1}".format(obj, count))
         self.world.print()
+        self.events.print()
 
     def process_event(self, new_event):
-        print("Default Game event process:{0}".format(new_event))
+
+        if self._debug is True:
+            print("Default Game event process:{0}".format(new_event))
 
         if new_event.type == Event.DEBUG:
             self.debug()
@@ -164,6 +185,7 @@ class DWModel():
             self._debug = debug_on
 
         self.world.debug(self._debug)
+        self.events.debug(self._debug)
 
     def tick(self):
 
@@ -184,9 +206,9 @@ class DWModel():
                                                random.choices((Objects.EMPTY, Objects.TREASURE, Objects.COINS, Objects.KEY),
                                                               weights=[20 * (item_discovery is False), 5, 5, 1],
                                                               k=1)[0])
-                    self.events.add_event(Event(type=Event.GAME,
-                                                name=Event.KILL_ENEMY,
-                                                description="You slay some foes"))
+                    self.events.add_event(Event.get_pooled(type=Event.GAME,
+                                                           name=Event.KILL_ENEMY,
+                                                           description="You slay some foes"))
 
             # See if the player is colliding with any enemies
             # Be slightly generous on the overlap distance e.g. -2
@@ -197,9 +219,9 @@ class DWModel():
 
                 # If you are protected nothing happens
                 if Event.EFFECT_PROTECTION in self.effects.keys():
-                    self.events.add_event(Event(type=Event.GAME,
-                                                name=Event.BLOCKED,
-                                                description="You are protected"))
+                    self.events.add_event(Event.get_pooled(type=Event.GAME,
+                                                           name=Event.BLOCKED,
+                                                           description="You are protected"))
 
                 # If you can kill enemies then delete them with a chance to discover some random goodies
                 elif Event.EFFECT_KILL_ENEMIES in self.effects.keys():
@@ -208,9 +230,9 @@ class DWModel():
                         self.swap_world_object(enemy, random.choices((Objects.EMPTY, Objects.TREASURE, Objects.COINS, Objects.KEY),
                                                                      weights = [20 * (item_discovery is False),5,5,1],
                                                                      k=1)[0])
-                    self.events.add_event(Event(type=Event.GAME,
-                                                name=Event.KILL_ENEMY,
-                                                description="You slay some foes"))
+                    self.events.add_event(Event.get_pooled(type=Event.GAME,
+                                                           name=Event.KILL_ENEMY,
+                                                           description="You slay some foes"))
 
                 # else you die
                 else:
@@ -240,7 +262,7 @@ class DWModel():
                     self.world.remove_effect(effect)
                     self.events.add_event(Event(type=Event.EFFECT,
                                                 name=Event.EFFECT_END,
-                                                description="Effect {0} wears off!".format(effect)))
+                                                description="Effect {0} wears off!", description_args=(effect,)))
 
     def help(self):
         self.talk_to_npc(npc_object=None, npc_name="The Master", world_id="Help")
@@ -302,15 +324,17 @@ class DWModel():
                         gift_id = Objects.EMPTY
                     self.world.swap_object(npc_object, gift_id)
                 self.events.add_event(
-                    Event(type=Event.GAME, name=Event.TALK, description="{0}: '{1}'".format(npc_name, text)))
+                    Event(type=Event.GAME, name=Event.TALK,
+                          description="{0}: '{1}'", description_args=(npc_name, text)))
             else:
                 self.events.add_event(
                     Event(type=Event.GAME, name=Event.TALK,
-                          description="{0} has nothing to say to you.".format(npc_name)))
+                          description="{0} has nothing to say to you.", description_args=(npc_name,)))
 
         else:
             self.events.add_event(
-                Event(type=Event.GAME, name=Event.TALK, description="{0} has nothing to say to you.".format(npc_name)))
+                Event(type=Event.GAME, name=Event.TALK,
+                      description="{0} has nothing to say to you.", description_args=(npc_name,)))
 
     def read(self, chosen_object):
 
@@ -358,7 +382,7 @@ class DWModel():
                     else:
                         self.events.add_event(Event(type=Event.GAME,
                                                     name=Event.ACTION_FAILED,
-                                                    description="You don't have {0}".format(req_obj)))
+                                                    description="You don't have {0}", description_args=(req_obj,)))
 
             elif object.name == Objects.EXIT_PREVIOUS:
                 if self.world.player.is_inside(object):
@@ -458,13 +482,13 @@ class DWModel():
                 else:
                     self.events.add_event(Event(type=Event.GAME,
                                                 name=Event.ACTION_FAILED,
-                                                description="You don't have {0}".format(req_obj)))
+                                                description="You don't have {0}", description_args=(req_obj,)))
 
             elif object.is_switch is True:
                 self.world.set_switch_object(object)
                 self.events.add_event(Event(type=Event.GAME,
                                             name=Event.SWITCH,
-                                            description="You switch {0}".format(object.name)))
+                                            description="You switch {0}", description_args=(object.name,)))
 
             elif object.name in (Objects.NPC1, Objects.NPC2):
                 self.talk_to_npc(object)
@@ -486,7 +510,7 @@ class DWModel():
                 self.delete_world_object(object)
                 self.events.add_event(Event(type=Event.GAME,
                                             name=Event.ACTION_SUCCEEDED,
-                                            description="You found {0}".format(object.name)))
+                                            description="You found {0}", description_args=(object.name,)))
 
                 if object.name == Objects.EXTRA_LIFE:
                     self.player_lives += 1
@@ -551,7 +575,7 @@ class DWModel():
         # Log an event that a new effect has started
         self.events.add_event(Event(type=Event.EFFECT,
                                     name=Event.EFFECT_START,
-                                    description="Effect {0} activated".format(effect_type)))
+                                    description="Effect {0} activated", description_args=(effect_type,)))
 
     def get_effect(self, effect_type : str):
 
@@ -570,7 +594,7 @@ class DWModel():
 
         self.events.add_event(Event(type=Event.GAME,
                                     name=Event.DEAD,
-                                    description="{0} has died".format(self.player.name)))
+                                    description="{0} has died", description_args=(self.player.name,)))
 
         self.reset()
 
@@ -596,7 +620,7 @@ class DWModel():
         # if self.current_world_id == new_world_id:
         #     return
 
-        new_world = self.world_factory.get_world(new_world_id, do_copy)
+        new_world = self.world_prefetcher.get_world(new_world_id, do_copy)
 
         if new_world is not None:
 
@@ -607,6 +631,7 @@ class DWModel():
                 self.world.delete_player()
 
             self.world = new_world
+            self.world.bot_scheduler.time_budget = self.bot_time_budget
             self.world.add_player(self.player, start_pos=(self.current_world_id <= new_world_id))
             self.current_world_id = new_world_id
             moved = True
@@ -621,30 +646,35 @@ class DWModel():
         if moved is True:
             self.events.add_event(Event(type=Event.GAME,
                                         name=Event.NEW_WORLD,
-                                        description="You moved to {0}".format(self.world.name)))
+                                        description="You moved to {0}", description_args=(self.world.name,)))
+
+            # Anything prefetched for the old world is out of date so start getting ready for the new world
+            self.prefetch_worlds()
 
         return moved
 
-    def get_conversation(self, npc_name: str):
-        return self._conversations.get_conversation(npc_name)
+    def prefetch_worlds(self):
 
-    def end(self):
-        print("Ending {0}".format(__class__))
+        if DWModel.PREFETCH_WORLDS is False:
+            return
 
+        # Next world is played as a fresh copy and the previous world is played as it was left
+        requests = [(self.peek_next_world_id(), True),
+                    (self.get_previous_world_id(), False),
+                    (self.current_world_id, True)]
 
-class EventQueue():
-    def __init__(self):
-        self.events = collections.deque()
+        # We can't copy a world in the background if it is the one being played
+        playing_original = self.world is self.world_factory.world_layouts.get_world(self.current_world_id)
+        requests = [(world_id, do_copy) for world_id, do_copy in requests
+                    if do_copy is False or world_id != self.current_world_id or playing_original is False]
 
-    def add_event(self, new_event: Event):
-        self.events.append(new_event)
+        self.world_prefetcher.prefetch(requests)
 
-    def pop_event(self):
-        return self.events.pop()
+    def get_conversation(self, npc_name: str):
+        return self._conversations.get_conversation(npc_name)
 
-    def size(self):
-        return len(self.events)
+    def end(self):
+        print("Ending {0}".format(__class__))
+        if self.world_prefetcher is not None:
+            self.world_prefetcher.stop()
 
-    def print(self):
-        for event in self.events:
-            print(event)
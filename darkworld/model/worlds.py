@@ -1,6 +1,14 @@
 import csv
+import functools
+import hashlib
+import heapq
 import logging
+import os
+import queue
+import threading
+import time
 import copy
+import collections
 import pygame
 import numpy as np
 import random
@@ -9,6 +17,47 @@ import math
 from .events import Event
 
 
+class RPGObjectPrototype(object):
+    """
+    The properties of a type of object that are the same for every instance of it.
+    Prototypes are shared by all of the objects created from them so they must not be changed.
+    """
+
+    __slots__ = ("name", "type", "size", "value", "is_solid", "is_visible", "is_interactable", "is_collectable",
+                 "is_switchable", "is_switch")
+
+    def __init__(self, name: str,
+                 type: int = 0,
+                 osize=(1, 1, 1),
+                 value=0,
+                 solid: bool = True,
+                 visible: bool = True,
+                 interactable: bool = False,
+                 collectable: bool = False,
+                 switchable: bool = False,
+                 switch=False):
+
+        self.name = name
+        self.type = type
+        self.size = tuple(osize)
+        self.value = value
+        self.is_solid = solid
+        self.is_visible = visible
+        self.is_interactable = interactable
+        self.is_collectable = collectable
+        self.is_switchable = switchable
+        self.is_switch = switch
+
+    def __str__(self):
+        return "{0} type({1}) size({2})".format(self.name, self.type, self.size)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
 class RPGObject3D(object):
     TOUCH_FIELD_X = 4
     TOUCH_FIELD_Y = 4
@@ -16,6 +65,11 @@ class RPGObject3D(object):
     TYPE_PLAYER = "player"
     TYPE_MONSTER = "monster"
 
+    # Only the things that change per object are stored on each object.
+    # Everything else is looked up from the shared prototype.
+    __slots__ = ("prototype", "tick_count", "state", "_z", "_old_z", "_rect", "_old_rect", "dxyz",
+                 "is_switchable", "is_player")
+
     def __init__(self, name: str,
                  type: int = 0,
                  opos=(0, 0, 0),
@@ -29,30 +83,76 @@ class RPGObject3D(object):
                  switch=False,
                  state=False):
 
+        prototype = RPGObjectPrototype(name=name,
+                                       type=type,
+                                       osize=osize,
+                                       value=value,
+                                       solid=solid,
+                                       visible=visible,
+                                       interactable=interactable,
+                                       collectable=collectable,
+                                       switchable=switchable,
+                                       switch=switch)
+
+        self.set_prototype(prototype, opos, state)
+
+    @staticmethod
+    def from_prototype(prototype: RPGObjectPrototype, opos=(0, 0, 0), state=False):
+        new_object = RPGObject3D.__new__(RPGObject3D)
+        new_object.set_prototype(prototype, opos, state)
+        return new_object
+
+    def set_prototype(self, prototype: RPGObjectPrototype, opos=(0, 0, 0), state=False):
+
+        self.prototype = prototype
         self.tick_count = 0
-        self.name = name
-        self.type = type
         self.state = state
-        self.value = value
 
         # Position and size
         ox, oy, oz = opos
-        ow, oh, od = osize
+        ow, oh, od = prototype.size
         self._z = oz
         self._old_z = oz
         self._rect = pygame.Rect(ox, oy, ow, oh)
         self._old_rect = self._rect.copy()
         self.dxyz = (0,0,0)
 
-        # Properties
-        self.is_solid = solid
-        self.is_visible = visible
-        self.is_interactable = interactable
-        self.is_collectable = collectable
-        self.is_switch = switch
-        self.is_switchable = switchable
+        # Properties that can be changed for an individual object
+        self.is_switchable = prototype.is_switchable
         self.is_player = False
 
+    @property
+    def name(self):
+        return self.prototype.name
+
+    @property
+    def type(self):
+        return self.prototype.type
+
+    @property
+    def value(self):
+        return self.prototype.value
+
+    @property
+    def is_solid(self):
+        return self.prototype.is_solid
+
+    @property
+    def is_visible(self):
+        return self.prototype.is_visible
+
+    @property
+    def is_interactable(self):
+        return self.prototype.is_interactable
+
+    @property
+    def is_collectable(self):
+        return self.prototype.is_collectable
+
+    @property
+    def is_switch(self):
+        return self.prototype.is_switch
+
     def __str__(self):
         return "{0} type({1}) pos({2}) id({3})".format(self.name, self.type, self.xyz, id(self))
 
@@ -288,51 +388,78 @@ class WorldBuilder():
         self.world_layouts = None
         self.world_objects = None
 
-    def initialise(self, file_prefix: str = "default"):
+        # Worlds can be loaded and copied from a background thread so only let one thread at a time do it
+        self.lock = threading.RLock()
+
+        # The world whose original is being played rather than a copy of it
+        self.playing_world_id = None
+
+    def initialise(self, file_prefix: str = "default", use_cache: bool = True, lazy: bool = False):
 
         self.world_objects = WorldObjectLoader(
             self.data_file_directory + file_prefix + WorldBuilder.FLOOR_OBJECT_FILE_NAME)
-        self.world_objects.load()
-        self.world_objects.print()
 
         self.world_layouts = WorldLayoutLoader(
             self.data_file_directory + file_prefix + WorldBuilder.FLOOR_LAYOUT_FILE_NAME)
-        self.world_layouts.load()
-        self.world_layouts.print()
 
+        cache = WorldCache(WorldCache.get_file_name(self.data_file_directory, file_prefix),
+                           (self.world_objects.file_name, self.world_layouts.file_name))
+
+        # Load the objects and layouts from the compiled cache if it is up to date with the CSV files...
+        loaded_from_cache = False
+        if use_cache is True and cache.is_fresh() is True:
+            try:
+                cache.load(self.world_layouts, lazy)
+                loaded_from_cache = True
+                self.world_objects.print()
+                self.world_layouts.print()
+            except Exception as err:
+                print("Unable to load world cache {0}: {1}".format(cache.file_name, err))
+
+        # ...otherwise parse the CSV files and then compile them into a new cache
+        if loaded_from_cache is False:
+            self.world_objects.load()
+            self.world_objects.print()
+            self.world_layouts.load(lazy)
+            self.world_layouts.print()
+
+            if use_cache is True:
+                cache.save(self.world_layouts)
+
+        # The world properties, moving objects and NPCs are defined in code so always get added after loading
         self.load_world_properties()
         self.load_moving_objects()
         self.load_npcs()
 
     def load_npcs(self):
 
-        world = self.get_world(1)
+        world = self.world_layouts.get_world(1)
         world.add_npc(name="The Master", object_id=Objects.NPC1, xyz=(4 * 32, 9 * 32, 20), vanish=True,
                       gift_id=Objects.BOSS_KEY)
 
-        world = self.get_world(5)
+        world = self.world_layouts.get_world(5)
         world.add_npc(name="The Imprisoned One", object_id=Objects.NPC2, xyz=(2 * 32, 13 * 32, 50), vanish=True)
 
-        world = self.get_world(7)
+        world = self.world_layouts.get_world(7)
         world.add_npc(name="The Master", object_id=Objects.NPC1, xyz=(18 * 32, 6 * 32, 20), vanish=True,
                       gift_id=Objects.BOSS_KEY)
 
-        world = self.get_world(9)
+        world = self.world_layouts.get_world(9)
         world.add_npc(name="Rosie", object_id=Objects.NPC1, xyz=(1 * 32, 1 * 32, 50), vanish=True,
                       gift_id=Objects.BOSS_KEY)
         world.add_npc(name="Skids", object_id=Objects.NPC2, xyz=(18 * 32, 1 * 32, 50))
 
-        world = self.get_world(100)
+        world = self.world_layouts.get_world(100)
         world.add_npc(name="The Jailer", object_id=Objects.NPC1, xyz=(5 * 32, 12 * 32, 30))
 
-        world = self.get_world(110)
+        world = self.world_layouts.get_world(110)
         world.add_npc(name="Knight of Artorius", object_id=Objects.NPC2, xyz=(2 * 32, 7 * 32, 20))
 
     def load_moving_objects(self):
 
         # World 1
         # add random moving enemy
-        world = self.get_world(1)
+        world = self.world_layouts.get_world(1)
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY1)
         new_monster.set_pos((4 * 32, 13 * 32, 20))
         ai = AIBotRandom(new_monster, world)
@@ -351,7 +478,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 2
-        world = self.get_world(2)
+        world = self.world_layouts.get_world(2)
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY1)
         new_monster.set_pos((6 * 32, 10 * 32, 20))
         ai = AIBotRouteFollowing(new_monster, world, tick_slow_factor=1)
@@ -368,7 +495,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 3
-        world = self.get_world(3)
+        world = self.world_layouts.get_world(3)
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY1)
         new_monster.set_pos((15 * 32, 6 * 32, 20))
 
@@ -383,7 +510,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 4
-        world = self.get_world(4)
+        world = self.world_layouts.get_world(4)
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY1)
         new_monster.set_pos((15 * 32, 6 * 32, 20))
 
@@ -424,7 +551,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 5
-        world = self.get_world(5)
+        world = self.world_layouts.get_world(5)
 
         for i in range(0, 2):
             new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.MONSTER2)
@@ -454,7 +581,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 8
-        world = self.get_world(8)
+        world = self.world_layouts.get_world(8)
 
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY2)
         new_monster.set_pos((3 * 32, 17 * 32, 50))
@@ -536,7 +663,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 9
-        world = self.get_world(9)
+        world = self.world_layouts.get_world(9)
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY1)
         new_monster.set_pos((5 * 32, 11 * 32, 50))
 
@@ -564,7 +691,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 10
-        world = self.get_world(10)
+        world = self.world_layouts.get_world(10)
 
         # Enemy 1
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY1)
@@ -593,7 +720,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 20
-        world = self.get_world(20)
+        world = self.world_layouts.get_world(20)
 
         # Monster 1 - moving block
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.MONSTER1)
@@ -645,7 +772,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 100
-        world = self.get_world(100)
+        world = self.world_layouts.get_world(100)
 
         # Monster #1
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY1)
@@ -670,7 +797,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 100
-        world = self.get_world(110)
+        world = self.world_layouts.get_world(110)
 
         # Monster #1 - Moving Platform
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.TILE4)
@@ -706,7 +833,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 120
-        world = self.get_world(120)
+        world = self.world_layouts.get_world(120)
         # add hunter enemy #1
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.ENEMY1)
         new_monster.set_pos((2 * 32, 4 * 32, 20))
@@ -716,7 +843,8 @@ class WorldBuilder():
                                                     (4 * 32, 16 * 32, 20),
                                                     (15 * 32, 17 * 32, 20),
                                                     (4 * 32, 16 * 32, 20),
-                                                    ])
+                                                    ],
+                            use_path_finding=True)
 
         world.add_monster(new_monster, ai)
 
@@ -728,7 +856,8 @@ class WorldBuilder():
         ai.set_instructions(new_target=None, route=[(16 * 32, 4 * 32, 20),
                                                     (4 * 32, 3 * 32, 20),
                                                     (16 * 32, 3 * 32, 20),
-                                                    (17 * 32, 15 * 32, 20)])
+                                                    (17 * 32, 15 * 32, 20)],
+                            use_path_finding=True)
         world.add_monster(new_monster, ai)
 
         # add hunter enemy #3
@@ -739,7 +868,8 @@ class WorldBuilder():
         ai.set_instructions(new_target=None, route=[(17 * 32, 4 * 32, 20),
                                                     (16 * 32, 10 * 32, 20),
                                                     (17 * 32, 16 * 32, 20)
-                                                    ])
+                                                    ],
+                            use_path_finding=True)
 
         world.add_monster(new_monster, ai)
 
@@ -778,7 +908,7 @@ class WorldBuilder():
         world.add_monster(new_monster, ai)
 
         # World 998
-        world = self.get_world(998)
+        world = self.world_layouts.get_world(998)
         new_monster = WorldObjectLoader.get_object_copy_by_name(Objects.WALL2)
         new_monster.set_pos((12 * 32, 15 * 32, 99))
         ai = AIBotInstructions(new_monster, world)
@@ -947,24 +1077,336 @@ class WorldBuilder():
         new_world_properties = ("The Hub", "hub", (9 * 32, 16 * 32, 0), (32 * 5.5, 32 * 3.5, 0), switch_groups)
         self.world_properties[new_world_id] = new_world_properties
 
-        # Load up all of the properties that we have defined
+        # Load up all of the properties that we have defined for the worlds that have been loaded.
+        # Worlds that are still waiting to be loaded get their properties when they are loaded.
         for id in self.world_properties.keys():
             properties = self.world_properties[id]
-            world = self.get_world(id)
-            if world is not None:
+            world = self.world_layouts.get_world(id)
+            if world is not None and self.world_layouts.is_materialised(id) is True:
                 world.initialise(properties)
 
-    def get_world(self, world_name: str, do_copy: bool = False):
+    def get_world(self, world_name: str, do_copy: bool = False, background: bool = False):
 
-        if do_copy is True:
-            return copy.deepcopy(self.world_layouts.get_world(world_name))
-        else:
-            return self.world_layouts.get_world(world_name)
+        with self.lock:
+
+            # The original of the world that is being played can change at any time so don't copy it in the background
+            if background is True and do_copy is True and world_name == self.playing_world_id:
+                return None
+
+            world = self.world_layouts.get_world(world_name)
+
+            # If we haven't loaded this world yet then do it now
+            if world is not None and self.world_layouts.is_materialised(world_name) is False:
+                self.materialise_world(world_name)
+
+            # Give out a copy-on-write instance of the world so that the loaded world stays pristine...
+            if do_copy is True and world is not None:
+                world = world.instance()
+
+            # ...or if the original world is going to be played then make sure that it copies any plane that
+            # it shares with the copies that have already been made of it before it changes it
+            elif background is False and world is not None:
+                world.share_planes()
+
+            if background is False:
+                self.set_playing_world(world_name if do_copy is False else None)
+
+        return world
+
+    def set_playing_world(self, world_name):
+        with self.lock:
+            self.playing_world_id = world_name
+
+    def materialise_world(self, world_name: str):
+
+        world = self.world_layouts.get_world(world_name)
+
+        # Take out anything that was added before the world was loaded e.g. monsters and NPCs
+        # so that everything ends up in the same order as if the world had been loaded up front
+        early_objects = world.remove_all_objects()
+
+        self.world_layouts.materialise(world_name)
+
+        if world_name in self.world_properties.keys():
+            world.initialise(self.world_properties[world_name])
+
+        for early_object in early_objects:
+            world.add_object3D(early_object, do_copy=False)
 
     def get_world_names(self):
         return self.world_layouts.get_world_names()
 
 
+class WorldPrefetcher():
+    """
+    Gets the worlds that the player is likely to move to next ready on a background thread
+    so that moving to a new world only has to swap in a world that has already been loaded and copied.
+    """
+
+    # Limits on how many prepared copies of worlds we hold on to and how many objects they can contain
+    MAX_WORLDS = 3
+    MAX_OBJECTS = 30000
+
+    def __init__(self, world_factory: WorldBuilder, max_worlds: int = MAX_WORLDS, max_objects: int = MAX_OBJECTS):
+
+        self.world_factory = world_factory
+        self.max_worlds = max_worlds
+        self.max_objects = max_objects
+
+        self.lock = threading.Lock()
+        self.jobs = queue.Queue()
+        self.thread = None
+
+        # Prepared worlds by (world id, is a copy) and a generation number so that we can tell old jobs apart
+        self.prepared = {}
+        self.prepared_objects = 0
+        self.generation = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def start(self):
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.run, name="WorldPrefetcher", daemon=True)
+            self.thread.start()
+
+    def stop(self):
+
+        if self.thread is not None:
+            self.invalidate()
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def invalidate(self):
+
+        # Throw away everything that we have prepared and ignore any jobs that are still queued
+        with self.lock:
+            self.generation += 1
+            self.prepared = {}
+            self.prepared_objects = 0
+
+    def prefetch(self, requests: list):
+
+        # Replace anything that we prepared before with the worlds that we have been asked for now
+        self.invalidate()
+
+        with self.lock:
+            generation = self.generation
+
+        for world_id, do_copy in requests:
+            self.jobs.put((generation, world_id, do_copy))
+
+        self.start()
+
+    def get_world(self, world_id, do_copy: bool = False):
+
+        with self.lock:
+            world = self.prepared.pop((world_id, do_copy), None)
+            if world is not None:
+                self.prepared_objects -= World3D.count_objects(world)
+
+        # Only copies of worlds get prepared, the original worlds just get loaded in the world factory
+        if do_copy is True:
+            if world is not None:
+                self.world_factory.set_playing_world(None)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if world is None:
+            world = self.world_factory.get_world(world_id, do_copy)
+
+        return world
+
+    def run(self):
+
+        while True:
+
+            job = self.jobs.get()
+            if job is None:
+                break
+
+            generation, world_id, do_copy = job
+            with self.lock:
+                if generation != self.generation:
+                    continue
+
+            try:
+                world = self.world_factory.get_world(world_id, do_copy, background=True)
+            except Exception as err:
+                print("Unable to prefetch world {0}: {1}".format(world_id, err))
+                continue
+
+            if world is None or do_copy is False:
+                continue
+
+            # Hold on to the new copy of the world if it is still wanted and fits in the budget
+            object_count = World3D.count_objects(world)
+            with self.lock:
+                if generation == self.generation and \
+                        len(self.prepared) < self.max_worlds and \
+                        self.prepared_objects + object_count <= self.max_objects:
+                    self.prepared[(world_id, do_copy)] = world
+                    self.prepared_objects += object_count
+
+    def print(self):
+        print("World prefetcher: {0} worlds prepared ({1} objects), {2} hits, {3} misses".format(
+            len(self.prepared), self.prepared_objects, self.hits, self.misses))
+
+
+class WorldCache():
+    """
+    Compiled binary copy of the floor objects and floor layouts CSV files.
+    The object definitions and the position of every tile in every world are stored as NumPy arrays in a
+    single .npz file along with a hash of the CSV files that they were compiled from so that we can tell
+    when the cache is stale and the CSV files need to be parsed again.
+    The cache is kept in the user's cache directory rather than next to the CSV files as the package's
+    data directory is often read only.  Set CACHE_DIR to keep it somewhere else.
+    """
+
+    VERSION = 1
+    FILE_NAME = "_world_cache.npz"
+    CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                             "darkworld")
+
+    # Set when the cache can't be written so that we only say so once and then stop trying
+    save_failed = False
+
+    # Order of the object flag columns in the cache
+    FLAGS = ("is_solid", "is_visible", "is_interactable", "is_collectable", "is_switchable", "is_switch")
+
+    def __init__(self, file_name: str, source_file_names: tuple):
+        self.file_name = file_name
+        self.source_file_names = source_file_names
+
+    @staticmethod
+    def get_file_name(data_file_directory: str, file_prefix: str):
+
+        # Different copies of the data files each get their own cache
+        directory_hash = hashlib.sha256(os.path.abspath(data_file_directory).encode()).hexdigest()[:12]
+
+        return os.path.join(WorldCache.CACHE_DIR, "{0}_{1}{2}".format(file_prefix, directory_hash,
+                                                                       WorldCache.FILE_NAME))
+
+    def get_source_hash(self):
+
+        source_hash = hashlib.sha256("version {0}".format(WorldCache.VERSION).encode())
+
+        for source_file_name in self.source_file_names:
+            with open(source_file_name, 'rb') as source_file:
+                source_hash.update(source_file.read())
+
+        return source_hash.hexdigest()
+
+    def is_fresh(self):
+
+        if os.path.exists(self.file_name) is False:
+            return False
+
+        try:
+            with np.load(self.file_name, allow_pickle=False) as cache:
+                return int(cache["version"]) == WorldCache.VERSION and \
+                       str(cache["source_hash"]) == self.get_source_hash()
+        except Exception as err:
+            print("Unable to read world cache {0}: {1}".format(self.file_name, err))
+            return False
+
+    def save(self, world_layouts):
+
+        if WorldCache.save_failed is True:
+            return
+
+        # Compile the object definitions...
+        codes = list(WorldObjectLoader.world_objects.keys())
+        code_index = {code: i for i, code in enumerate(codes)}
+        prototypes = [WorldObjectLoader.world_objects[code] for code in codes]
+
+        # ...and then the position of every tile in every world in the order that they appear in the layouts
+        world_ids = list(world_layouts.world_rows.keys())
+        world_names = []
+        tiles = []
+        for i, world_id in enumerate(world_ids):
+            world_names.append(world_layouts.get_world(world_id).name)
+            for floor_layer, y, floor_layout in world_layouts.world_rows[world_id]:
+                x = 0
+                for object_code in floor_layout:
+                    if object_code != WorldLayoutLoader.EMPTY_OBJECT_CODE:
+                        tiles.append((i, code_index[object_code], x, y, floor_layer))
+                    x += WorldLayoutLoader.DEFAULT_OBJECT_WIDTH
+
+        # Write to a temporary file and then move it into place so that an interrupted save can't leave
+        # a truncated cache behind
+        temp_file_name = self.file_name + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.file_name), exist_ok=True)
+            with open(temp_file_name, 'wb') as cache_file:
+                np.savez(cache_file,
+                         version=np.array(WorldCache.VERSION),
+                         source_hash=np.array(self.get_source_hash()),
+                         object_codes=np.array(codes),
+                         object_names=np.array([prototype.name for prototype in prototypes]),
+                         object_sizes=np.array([prototype.size for prototype in prototypes], dtype=np.int32),
+                         object_values=np.array([prototype.value for prototype in prototypes], dtype=np.int32),
+                         object_flags=np.array([[getattr(prototype, flag) for flag in WorldCache.FLAGS]
+                                                for prototype in prototypes], dtype=bool),
+                         world_ids=np.array(world_ids, dtype=np.int32),
+                         world_names=np.array(world_names),
+                         tiles=np.array(tiles, dtype=np.int32).reshape(-1, 5))
+            os.replace(temp_file_name, self.file_name)
+        except OSError as err:
+            print("Unable to save world cache {0} so worlds will be loaded from the CSV files: {1}".format(
+                self.file_name, err))
+            WorldCache.save_failed = True
+            if os.path.exists(temp_file_name) is True:
+                os.remove(temp_file_name)
+
+    def load(self, world_layouts, lazy: bool = False):
+
+        with np.load(self.file_name, allow_pickle=False) as cache:
+
+            # Rebuild the object prototypes
+            prototypes = []
+            for code, name, size, value, flags in zip(cache["object_codes"].tolist(),
+                                                      cache["object_names"].tolist(),
+                                                      cache["object_sizes"].tolist(),
+                                                      cache["object_values"].tolist(),
+                                                      cache["object_flags"].tolist()):
+                solid, visible, interactable, collectable, switchable, switch = flags
+                new_prototype = RPGObjectPrototype(name=name,
+                                                   osize=size,
+                                                   value=value,
+                                                   solid=solid,
+                                                   visible=visible,
+                                                   interactable=interactable,
+                                                   collectable=collectable,
+                                                   switchable=switchable,
+                                                   switch=switch)
+                WorldObjectLoader.world_objects[code] = new_prototype
+                WorldObjectLoader.map_object_name_to_code[name] = code
+                prototypes.append(new_prototype)
+
+            # Create the worlds and queue up adding their tiles
+            tiles = cache["tiles"]
+            for i, (world_id, world_name) in enumerate(zip(cache["world_ids"].tolist(),
+                                                           cache["world_names"].tolist())):
+                new_world = World3D(name=world_name, w=1000, h=1000, d=1000)
+                world_tiles = tiles[tiles[:, 0] == i]
+                world_layouts.add_world(world_id, new_world,
+                                        functools.partial(WorldCache.add_tiles, new_world, prototypes, world_tiles))
+
+        if lazy is False:
+            world_layouts.materialise_all()
+
+    @staticmethod
+    def add_tiles(world, prototypes: list, tiles):
+
+        for world_index, object_index, x, y, z in tiles.tolist():
+            new_floor_object = RPGObject3D.from_prototype(prototypes[object_index], (x, y, z))
+            world.add_object3D(new_floor_object, do_copy=False)
+
+
 class WorldLayoutLoader():
     world_layouts = {}
 
@@ -976,7 +1418,11 @@ class WorldLayoutLoader():
     def __init__(self, file_name):
         self.file_name = file_name
 
-    def load(self):
+        # The layout rows of each world and how to add the tiles of each world that hasn't been loaded yet
+        self.world_rows = {}
+        self.pending_worlds = {}
+
+    def load(self, lazy: bool = False):
 
         # Attempt to open the file
         with open(self.file_name, 'r') as object_file:
@@ -990,35 +1436,64 @@ class WorldLayoutLoader():
             current_floor_id = None
             current_floor_layer = None
 
-            # For each row in the file....
+            # For each row in the file index the layout rows by world...
             for row in reader:
 
                 world_id = int(row.get("ID"))
                 world_name = row.get("Name")
 
                 if world_id != current_floor_id:
-                    WorldLayoutLoader.world_layouts[world_id] = World3D(name=world_name, w=1000, h=1000, d=1000)
+                    rows = []
+                    self.world_rows[world_id] = rows
+                    new_world = World3D(name=world_name, w=1000, h=1000, d=1000)
+                    self.add_world(world_id, new_world, functools.partial(WorldLayoutLoader.add_rows, new_world, rows))
                     current_floor_id = world_id
                     y = 0
 
-                new_world = WorldLayoutLoader.world_layouts[world_id]
-
                 floor_layer = int(row.get("Layer"))
                 if floor_layer != current_floor_layer:
                     current_floor_layer = floor_layer
                     y = 0
 
-                floor_layout = row.get("Layout")
-                x = 0
-                for object_code in floor_layout:
-                    if object_code != WorldLayoutLoader.EMPTY_OBJECT_CODE:
-                        new_floor_object = WorldObjectLoader.get_object_copy_by_code(object_code)
-                        new_floor_object.set_pos((x, y, floor_layer))
-                        new_world.add_object3D(new_floor_object, do_copy=False)
-                    x += WorldLayoutLoader.DEFAULT_OBJECT_WIDTH
+                rows.append((floor_layer, y, row.get("Layout")))
 
                 y += WorldLayoutLoader.DEFAULT_OBJECT_DEPTH
 
+        # ...and then unless we are loading lazily add all of the tiles to the worlds
+        if lazy is False:
+            self.materialise_all()
+
+    @staticmethod
+    def add_rows(world, rows: list):
+
+        for floor_layer, y, floor_layout in rows:
+            x = 0
+            for object_code in floor_layout:
+                if object_code != WorldLayoutLoader.EMPTY_OBJECT_CODE:
+                    new_floor_object = WorldObjectLoader.get_object_copy_by_code(object_code, (x, y, floor_layer))
+                    world.add_object3D(new_floor_object, do_copy=False)
+                x += WorldLayoutLoader.DEFAULT_OBJECT_WIDTH
+
+    def add_world(self, world_id, new_world, add_tiles):
+
+        WorldLayoutLoader.world_layouts[world_id] = new_world
+        self.pending_worlds[world_id] = add_tiles
+
+    def is_materialised(self, world_id):
+        return world_id not in self.pending_worlds.keys()
+
+    def materialise(self, world_id):
+
+        # Add the tiles to a world that hasn't been loaded yet
+        add_tiles = self.pending_worlds.pop(world_id, None)
+        if add_tiles is not None:
+            add_tiles()
+
+    def materialise_all(self):
+
+        for world_id in list(self.pending_worlds.keys()):
+            self.materialise(world_id)
+
     def get_world(self, world_name: str):
         if world_name in self.world_layouts.keys():
             return self.world_layouts[world_name]
@@ -1061,25 +1536,24 @@ class WorldObjectLoader():
 
                 object_code = row.get("Code")
 
-                new_object = RPGObject3D(name=row.get("Name"), \
-                                         opos=(0, 0, 0), \
-                                         osize=(int(row.get("width")), int(row.get("depth")), int(row.get("height"))), \
-                                         value=int(row.get("value")), \
-                                         solid=WorldObjectLoader.BOOL_MAP[row.get("solid").upper()], \
-                                         visible=WorldObjectLoader.BOOL_MAP[row.get("visible").upper()], \
-                                         interactable=WorldObjectLoader.BOOL_MAP[row.get("interactable").upper()],
-                                         collectable=WorldObjectLoader.BOOL_MAP[row.get("collectable").upper()],
-                                         switchable=WorldObjectLoader.BOOL_MAP[row.get("switchable").upper()],
-                                         switch=WorldObjectLoader.BOOL_MAP[row.get("switch").upper()]
-                                         )
-
-                # Store the floor object in the code cache
-                WorldObjectLoader.world_objects[object_code] = new_object
+                new_prototype = RPGObjectPrototype(name=row.get("Name"), \
+                                                   osize=(int(row.get("width")), int(row.get("depth")), int(row.get("height"))), \
+                                                   value=int(row.get("value")), \
+                                                   solid=WorldObjectLoader.BOOL_MAP[row.get("solid").upper()], \
+                                                   visible=WorldObjectLoader.BOOL_MAP[row.get("visible").upper()], \
+                                                   interactable=WorldObjectLoader.BOOL_MAP[row.get("interactable").upper()],
+                                                   collectable=WorldObjectLoader.BOOL_MAP[row.get("collectable").upper()],
+                                                   switchable=WorldObjectLoader.BOOL_MAP[row.get("switchable").upper()],
+                                                   switch=WorldObjectLoader.BOOL_MAP[row.get("switch").upper()]
+                                                   )
+
+                # Store the floor object prototype in the code cache
+                WorldObjectLoader.world_objects[object_code] = new_prototype
 
                 # Store mapping of object name to code
-                WorldObjectLoader.map_object_name_to_code[new_object.name] = object_code
+                WorldObjectLoader.map_object_name_to_code[new_prototype.name] = object_code
 
-                logging.info("{0}.load(): Loaded Floor Object {1}".format(__class__, new_object.name))
+                logging.info("{0}.load(): Loaded Floor Object {1}".format(__class__, new_prototype.name))
 
     def print(self):
         print("{0} world objects loaded".format(len(self.world_objects.keys())))
@@ -1087,12 +1561,13 @@ class WorldObjectLoader():
             print(str(obj))
 
     @staticmethod
-    def get_object_copy_by_code(object_code: str):
+    def get_object_copy_by_code(object_code: str, opos=(0, 0, 0)):
 
         if object_code not in WorldObjectLoader.world_objects.keys():
             raise Exception("Can't find object by code '{0}'".format(object_code))
 
-        return copy.deepcopy(WorldObjectLoader.world_objects[object_code])
+        # Create a new object that shares the prototype for this code
+        return RPGObject3D.from_prototype(WorldObjectLoader.world_objects[object_code], opos)
 
     @staticmethod
     def get_object_copy_by_name(object_name: str):
@@ -1108,120 +1583,666 @@ class WorldObjectLoader():
         return WorldObjectLoader.get_object_copy_by_code(object_code)
 
 
-class World3D:
-    # Define direction vectors
-    DUMMY = np.array([0, 0, 0])
-    INVERSE = np.array([-1, -1, -1])
-    NORTH = np.array([0, 0, 1])
-    SOUTH = np.multiply(NORTH, INVERSE)
-    EAST = np.array([1, 0, 0])
-    WEST = np.multiply(EAST, INVERSE)
-    UP = np.array([0, 1, 0])
-    DOWN = np.multiply(UP, INVERSE)
+class PlaneObjects:
+    """
+    Insertion ordered collection of the objects in a single plane of a world.
+    Adding, removing and checking membership are all O(1) and iteration order is the order that
+    objects were added so that the draw order of the plane stays stable.
+    """
 
-    HEADINGS = (NORTH, SOUTH, EAST, WEST, UP, DOWN)
+    def __init__(self, objects=None):
+        self._objects = {}
+        if objects is not None:
+            for obj in objects:
+                self._objects[obj] = None
 
-    # Define states
-    STATE_LOADED = "loaded"
-    STATE_READY = "ready"
-    STATE_PLAYING = "playing"
-    STATE_PAUSED = "paused"
-    STATE_GAME_OVER = "game over"
+    def __len__(self):
+        return len(self._objects)
 
-    PLAYER_MOVING = "moving"
-    PLAYER_FALLING = "falling"
+    def __iter__(self):
+        return iter(self._objects)
 
-    SLOW_TILES = (Objects.LIQUID1, Objects.LIQUID2)
-    ENEMIES = (Objects.ENEMY1, Objects.ENEMY2, Objects.TRAP)
+    def __reversed__(self):
+        return reversed(self._objects)
 
-    def __init__(self, name: str = "default", w: int = 100, h: int = 100, d: int = 100):
+    def __contains__(self, obj):
+        return obj in self._objects
 
-        # World propoerties
-        self.name = name
-        self.skin = "default"
-        self.player_start_pos = (0, 0, 0)
-        self.player_exit_pos = (0, 0, 0)
-        self.width = w
-        self.height = h
-        self.depth = d
-        self.state = World3D.STATE_LOADED
-        self.player_state = World3D.PLAYER_MOVING
-        self.tick_count = 0
-        self._debug = False
+    def __str__(self):
+        return "{0} objects".format(len(self._objects))
 
-        # World contents
-        self.planes = {}
-        self.monsters = {}
-        self.bots = []
-        self._npcs = {}
-        self.switch_groups = {}
-        self.effects = set()
-        self.player = None
+    def append(self, new_object):
+        self._objects[new_object] = None
 
-    def __str__(self):
-        return "World {0}: skin({1}), size({2},{3},{4})".format(self.name, self.skin, self.width, self.height,
-                                                                self.depth)
+    def add(self, new_object):
+        self._objects[new_object] = None
 
-    @property
-    def max_plane_depth(self):
-        return max(self.planes.keys())
+    def remove(self, old_object):
+        if old_object not in self._objects:
+            raise ValueError("Object {0} is not in this plane".format(str(old_object)))
+        del self._objects[old_object]
 
-    @property
-    def rect(self):
-        return pygame.Rect(0, 0, self.width, self.height)
+    def discard(self, old_object):
+        self._objects.pop(old_object, None)
 
-    def add_object3D(self, new_object, do_copy: bool = True):
+    def copy(self, substitutes: dict = None):
+        if substitutes is None:
+            return PlaneObjects(self._objects)
+        else:
+            return PlaneObjects(substitutes.get(obj, obj) for obj in self._objects)
 
-        x, y, z = new_object.xyz
 
-        if self.is_valid_xyz(x, y, z) is True:
+class SpatialHash:
+    """
+    Uniform grid that buckets the objects of a single plane by the tile cells that their rects overlap
+    so that collision and touch queries only need to look at the objects near the query rect
+    """
 
-            if do_copy is True:
-                new_object = copy.deepcopy(new_object)
+    CELL_SIZE = 32
 
-            # If this new object is a switch object...
-            if new_object.is_switch is True:
-                self.add_switch_object(new_object)
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.object_cells = {}
+        self.object_order = {}
+        self._next_order = 0
 
-            if z not in self.planes.keys():
-                self.planes[z] = []
+    def __len__(self):
+        return len(self.object_cells)
 
-            self.planes[z].append(new_object)
+    def __contains__(self, obj):
+        return obj in self.object_cells
 
-        else:
-            print("Can't add object {0} at ({1},{2},{3})".format(str(new_object), x, y, z))
+    def get_cells(self, rect):
 
-    def delete_object3D(self, selected_object, plane: int = None):
+        cell_size = self.cell_size
 
-        x, y, z = selected_object.xyz
+        # Rects are half open so the last cell is the one containing the right/bottom edge minus one
+        x1 = rect.left // cell_size
+        y1 = rect.top // cell_size
+        x2 = max(rect.right - 1, rect.left) // cell_size
+        y2 = max(rect.bottom - 1, rect.top) // cell_size
 
-        if plane is not None:
-            z = plane
+        return tuple((cx, cy) for cx in range(x1, x2 + 1) for cy in range(y1, y2 + 1))
 
-        if z in self.planes.keys():
-            selected_plane = self.planes[z]
-            if selected_object in selected_plane:
-                self.planes[z].remove(selected_object)
-        else:
-            print("Can't delete object {0} at ({1},{2},{3})".format(str(selected_object), x, y, z))
+    def add(self, obj):
 
-    def add_switch_group(self, new_switch_group: SwitchGroup):
+        if obj in self.object_cells:
+            self.move(obj)
+            return
 
-        if new_switch_group.name in self.switch_groups.keys():
-            print("Already got a switch group with id {0}".format(new_switch_group.name))
-            for switch in self.switch_groups[new_switch_group.name].switches:
-                new_switch_group.add_switch(switch)
+        # Remember the order that objects were added so that queries return them in plane order
+        self.object_order[obj] = self._next_order
+        self._next_order += 1
 
-        self.switch_groups[new_switch_group.name] = new_switch_group
+        cells = self.get_cells(obj.rect)
+        self.object_cells[obj] = cells
+        for cell in cells:
+            if cell not in self.cells:
+                self.cells[cell] = {}
+            self.cells[cell][obj] = None
 
-    def add_switch_object(self, new_object):
+    def remove(self, obj):
 
-        if new_object.name not in self.switch_groups.keys():
-            self.add_switch_group(SwitchGroup(name=new_object.name, from_object_name=new_object.name))
+        cells = self.object_cells.pop(obj, None)
+        if cells is None:
+            return
 
-        self.switch_groups[new_object.name].add_switch(new_object)
+        del self.object_order[obj]
 
-    def add_player(self, new_player, start_pos: bool):
+        for cell in cells:
+            bucket = self.cells[cell]
+            del bucket[obj]
+            if len(bucket) == 0:
+                del self.cells[cell]
+
+    def move(self, obj):
+
+        old_cells = self.object_cells.get(obj)
+        if old_cells is None:
+            return
+
+        new_cells = self.get_cells(obj.rect)
+        if new_cells == old_cells:
+            return
+
+        for cell in old_cells:
+            bucket = self.cells[cell]
+            del bucket[obj]
+            if len(bucket) == 0:
+                del self.cells[cell]
+
+        self.object_cells[obj] = new_cells
+        for cell in new_cells:
+            if cell not in self.cells:
+                self.cells[cell] = {}
+            self.cells[cell][obj] = None
+
+    def copy(self, substitutes: dict = None):
+
+        if substitutes is None:
+            substitutes = {}
+
+        new_hash = SpatialHash(self.cell_size)
+        new_hash._next_order = self._next_order
+        new_hash.object_order = {substitutes.get(obj, obj): order for obj, order in self.object_order.items()}
+        new_hash.object_cells = {substitutes.get(obj, obj): cells for obj, cells in self.object_cells.items()}
+        new_hash.cells = {cell: {substitutes.get(obj, obj): None for obj in bucket}
+                          for cell, bucket in self.cells.items()}
+
+        return new_hash
+
+    def query(self, rect, flag: str = None):
+
+        found = {}
+        cells = self.cells
+        for cell in self.get_cells(rect):
+            bucket = cells.get(cell)
+            if bucket is not None:
+                found.update(bucket)
+
+        if flag is not None:
+            found = {obj: None for obj in found if getattr(obj, flag) is True}
+
+        # Only need to sort if we collected objects from more than one cell
+        if len(found) > 1:
+            order = self.object_order
+            return sorted(found, key=order.__getitem__)
+        else:
+            return list(found)
+
+
+class PlaneArrays:
+    """
+    Struct-of-arrays store of the objects of a single plane that keeps the rect edges and flags of every
+    object in contiguous NumPy columns so that collision, touch and culling queries run as vectorised masks.
+    Has the same interface as SpatialHash so either can be used as the geometry backend of a World3D.
+    """
+
+    FLAG_COLUMNS = ("is_solid", "is_visible", "is_interactable", "is_switch")
+    INITIAL_CAPACITY = 64
+
+    def __init__(self, capacity: int = INITIAL_CAPACITY):
+        self.objects = []
+        self.object_rows = {}
+        self.x1 = np.zeros(capacity, dtype=np.int32)
+        self.y1 = np.zeros(capacity, dtype=np.int32)
+        self.x2 = np.zeros(capacity, dtype=np.int32)
+        self.y2 = np.zeros(capacity, dtype=np.int32)
+        self.active = np.zeros(capacity, dtype=bool)
+        self.flags = {flag: np.zeros(capacity, dtype=bool) for flag in PlaneArrays.FLAG_COLUMNS}
+
+    def __len__(self):
+        return len(self.object_rows)
+
+    def __contains__(self, obj):
+        return obj in self.object_rows
+
+    @property
+    def capacity(self):
+        return len(self.active)
+
+    def resize(self, capacity: int):
+
+        rows = len(self.objects)
+
+        def grow(column):
+            new_column = np.zeros(capacity, dtype=column.dtype)
+            new_column[:rows] = column[:rows]
+            return new_column
+
+        self.x1 = grow(self.x1)
+        self.y1 = grow(self.y1)
+        self.x2 = grow(self.x2)
+        self.y2 = grow(self.y2)
+        self.active = grow(self.active)
+        self.flags = {flag: grow(column) for flag, column in self.flags.items()}
+
+    def add(self, obj):
+
+        if obj in self.object_rows:
+            self.move(obj)
+            return
+
+        # Rows are only ever appended so row order is the order that objects were added to the plane
+        row = len(self.objects)
+        if row >= self.capacity:
+            self.resize(self.capacity * 2)
+
+        self.objects.append(obj)
+        self.object_rows[obj] = row
+        self.active[row] = True
+        for flag, column in self.flags.items():
+            column[row] = getattr(obj, flag)
+
+        self.set_row(row, obj.rect)
+
+    def remove(self, obj):
+
+        row = self.object_rows.pop(obj, None)
+        if row is None:
+            return
+
+        # Leave a gap where the object was and only close the gaps when there are lots of them
+        self.objects[row] = None
+        self.active[row] = False
+
+        gaps = len(self.objects) - len(self.object_rows)
+        if gaps > PlaneArrays.INITIAL_CAPACITY and gaps > len(self.object_rows):
+            self.compact()
+
+    def move(self, obj):
+
+        row = self.object_rows.get(obj)
+        if row is not None:
+            self.set_row(row, obj.rect)
+
+    def set_row(self, row: int, rect):
+        self.x1[row] = rect.left
+        self.y1[row] = rect.top
+        self.x2[row] = rect.right
+        self.y2[row] = rect.bottom
+
+    def compact(self):
+
+        rows = len(self.objects)
+        keep = np.flatnonzero(self.active[:rows])
+
+        self.objects = [self.objects[row] for row in keep]
+        self.object_rows = {obj: row for row, obj in enumerate(self.objects)}
+
+        capacity = max(PlaneArrays.INITIAL_CAPACITY, self.capacity)
+
+        def pack(column):
+            new_column = np.zeros(capacity, dtype=column.dtype)
+            new_column[:len(keep)] = column[keep]
+            return new_column
+
+        self.x1 = pack(self.x1)
+        self.y1 = pack(self.y1)
+        self.x2 = pack(self.x2)
+        self.y2 = pack(self.y2)
+        self.active = pack(self.active)
+        self.flags = {flag: pack(column) for flag, column in self.flags.items()}
+
+    def copy(self, substitutes: dict = None):
+
+        if substitutes is None:
+            substitutes = {}
+
+        new_arrays = PlaneArrays.__new__(PlaneArrays)
+        new_arrays.objects = [substitutes.get(obj, obj) if obj is not None else None for obj in self.objects]
+        new_arrays.object_rows = {substitutes.get(obj, obj): row for obj, row in self.object_rows.items()}
+        new_arrays.x1 = self.x1.copy()
+        new_arrays.y1 = self.y1.copy()
+        new_arrays.x2 = self.x2.copy()
+        new_arrays.y2 = self.y2.copy()
+        new_arrays.active = self.active.copy()
+        new_arrays.flags = {flag: column.copy() for flag, column in self.flags.items()}
+
+        return new_arrays
+
+    def query_mask(self, rect, flag: str = None):
+
+        # Edges are compared inclusively so objects that are just touching the rect are included
+        rows = len(self.objects)
+        mask = self.active[:rows] & \
+               (self.x1[:rows] <= rect.right) & (self.x2[:rows] >= rect.left) & \
+               (self.y1[:rows] <= rect.bottom) & (self.y2[:rows] >= rect.top)
+
+        if flag is not None:
+            mask &= self.flags[flag][:rows]
+
+        return mask
+
+    def query(self, rect, flag: str = None):
+
+        objects = self.objects
+        return [objects[row] for row in np.flatnonzero(self.query_mask(rect, flag))]
+
+    def query_range(self, x: int, y: int, range_x: float, range_y: float, flag: str = None):
+
+        # Get the objects whose top left corner is within range of a point e.g. to cull objects outside of a view
+        rows = len(self.objects)
+        mask = self.active[:rows] & \
+               (np.abs(self.x1[:rows] - x) <= range_x) & \
+               (np.abs(self.y1[:rows] - y) <= range_y)
+
+        if flag is not None:
+            mask &= self.flags[flag][:rows]
+
+        objects = self.objects
+        return [objects[row] for row in np.flatnonzero(mask)]
+
+
+class World3D:
+    # Define direction vectors
+    DUMMY = np.array([0, 0, 0])
+    INVERSE = np.array([-1, -1, -1])
+    NORTH = np.array([0, 0, 1])
+    SOUTH = np.multiply(NORTH, INVERSE)
+    EAST = np.array([1, 0, 0])
+    WEST = np.multiply(EAST, INVERSE)
+    UP = np.array([0, 1, 0])
+    DOWN = np.multiply(UP, INVERSE)
+
+    HEADINGS = (NORTH, SOUTH, EAST, WEST, UP, DOWN)
+
+    # Define states
+    STATE_LOADED = "loaded"
+    STATE_READY = "ready"
+    STATE_PLAYING = "playing"
+    STATE_PAUSED = "paused"
+    STATE_GAME_OVER = "game over"
+
+    PLAYER_MOVING = "moving"
+    PLAYER_FALLING = "falling"
+
+    SLOW_TILES = (Objects.LIQUID1, Objects.LIQUID2)
+    ENEMIES = (Objects.ENEMY1, Objects.ENEMY2, Objects.TRAP)
+
+    # Boolean object properties that we keep an index of objects for
+    INDEXED_PROPERTIES = ("is_interactable", "is_switch", "is_solid")
+
+    # Geometry backends that can be used to store the positions of the objects in each plane
+    GEOMETRY_GRID = "grid"
+    GEOMETRY_NUMPY = "numpy"
+    GEOMETRY_BACKENDS = {GEOMETRY_GRID: SpatialHash, GEOMETRY_NUMPY: PlaneArrays}
+    DEFAULT_GEOMETRY = GEOMETRY_GRID
+
+    # Use a bot scheduler to tick bots away from the player less often
+    SCHEDULE_BOTS = True
+
+    # Make the moves of bots that follow simple instructions together
+    BATCH_MOVES = True
+
+    def __init__(self, name: str = "default", w: int = 100, h: int = 100, d: int = 100, geometry: str = None):
+
+        # World propoerties
+        self.name = name
+        self.skin = "default"
+        self.player_start_pos = (0, 0, 0)
+        self.player_exit_pos = (0, 0, 0)
+        self.width = w
+        self.height = h
+        self.depth = d
+        self.state = World3D.STATE_LOADED
+        self.player_state = World3D.PLAYER_MOVING
+        self.tick_count = 0
+        self._debug = False
+
+        if geometry is None:
+            geometry = World3D.DEFAULT_GEOMETRY
+        if geometry not in World3D.GEOMETRY_BACKENDS.keys():
+            raise Exception("Unknown geometry backend '{0}'".format(geometry))
+        self.geometry = geometry
+
+        # World contents
+        self.planes = {}
+        self.plane_grids = {}
+        self.plane_names = {}
+        self.plane_properties = {}
+
+        # Count of changes to the solid and slowing objects in each plane so that anything derived from them
+        # knows when to rebuild
+        self.plane_versions = {}
+
+        # Count of changes to any of the objects in each plane so that views of a plane know when to redraw it
+        self.plane_content_versions = {}
+        self.path_finder = PathFinder(self)
+        self.bot_scheduler = BotScheduler(self)
+        self.batch_movement = BatchMovement(self)
+
+        # Planes whose contents are shared with another copy of this world and must be copied before they change
+        self._shared_planes = set()
+        self.monsters = {}
+        self.bots = []
+        self._npcs = {}
+        self.switch_groups = {}
+        self.effects = set()
+        self.player = None
+
+    def __str__(self):
+        return "World {0}: skin({1}), size({2},{3},{4})".format(self.name, self.skin, self.width, self.height,
+                                                                self.depth)
+
+    @property
+    def max_plane_depth(self):
+        return max(self.planes.keys())
+
+    @property
+    def rect(self):
+        return pygame.Rect(0, 0, self.width, self.height)
+
+    def add_object3D(self, new_object, do_copy: bool = True):
+
+        x, y, z = new_object.xyz
+
+        if self.is_valid_xyz(x, y, z) is True:
+
+            if do_copy is True:
+                new_object = copy.deepcopy(new_object)
+
+            # If this new object is a switch object...
+            if new_object.is_switch is True:
+                self.add_switch_object(new_object)
+
+            if z in self._shared_planes:
+                self.own_plane(z)
+
+            if z not in self.planes.keys():
+                self.planes[z] = PlaneObjects()
+                self.plane_grids[z] = World3D.GEOMETRY_BACKENDS[self.geometry]()
+                self.plane_names[z] = {}
+                self.plane_properties[z] = {property: {} for property in World3D.INDEXED_PROPERTIES}
+
+            self.planes[z].append(new_object)
+            self.plane_grids[z].add(new_object)
+            self.index_object(new_object, z)
+
+            if new_object.is_solid is True or new_object.name in World3D.SLOW_TILES:
+                self.plane_versions[z] = self.plane_versions.get(z, 0) + 1
+
+            # Views always draw the player on its own so the player moving between planes doesn't change them
+            if new_object.name != Objects.PLAYER:
+                self.plane_content_versions[z] = self.plane_content_versions.get(z, 0) + 1
+
+        else:
+            print("Can't add object {0} at ({1},{2},{3})".format(str(new_object), x, y, z))
+
+    def delete_object3D(self, selected_object, plane: int = None):
+
+        x, y, z = selected_object.xyz
+
+        if plane is not None:
+            z = plane
+
+        if z in self.planes.keys():
+            selected_plane = self.planes[z]
+            if selected_object in selected_plane:
+                if z in self._shared_planes:
+                    self.own_plane(z)
+                    selected_plane = self.planes[z]
+                selected_plane.remove(selected_object)
+                self.plane_grids[z].remove(selected_object)
+                self.unindex_object(selected_object, z)
+
+                if selected_object.is_solid is True or selected_object.name in World3D.SLOW_TILES:
+                    self.plane_versions[z] = self.plane_versions.get(z, 0) + 1
+                if selected_object.name != Objects.PLAYER:
+                    self.plane_content_versions[z] = self.plane_content_versions.get(z, 0) + 1
+        else:
+            print("Can't delete object {0} at ({1},{2},{3})".format(str(selected_object), x, y, z))
+
+    @staticmethod
+    def count_objects(world):
+        return sum(len(plane) for plane in world.planes.values())
+
+    def remove_all_objects(self):
+
+        # Empty all of the planes and give back the objects that were in them in the order that they were added
+        removed_objects = [obj for plane in self.planes.values() for obj in plane]
+
+        self.planes = {}
+        self.plane_grids = {}
+        self.plane_names = {}
+        self.plane_properties = {}
+        self._shared_planes = set()
+
+        # Keep counting on from the old versions so nothing mistakes the new contents for the old
+        for z in self.plane_versions.keys():
+            self.plane_versions[z] += 1
+        for z in self.plane_content_versions.keys():
+            self.plane_content_versions[z] += 1
+
+        return removed_objects
+
+    def instance(self):
+
+        # Create a new playable instance of this world without copying every object in it.
+        # All of the planes are shared with this world until the new world changes a plane
+        # and then it takes a private copy of the plane.  This world is left alone so that it can be copied
+        # on another thread and it only takes private copies of its planes once share_planes() is called.
+        new_world = copy.copy(self)
+        new_world.planes = dict(self.planes)
+        new_world.plane_grids = dict(self.plane_grids)
+        new_world.plane_names = dict(self.plane_names)
+        new_world.plane_properties = dict(self.plane_properties)
+        new_world.plane_versions = dict(self.plane_versions)
+        new_world.plane_content_versions = dict(self.plane_content_versions)
+        new_world.path_finder = PathFinder(new_world)
+        new_world.bot_scheduler = BotScheduler(new_world, time_budget=self.bot_scheduler.time_budget)
+        new_world.batch_movement = BatchMovement(new_world)
+        new_world.monsters = dict(self.monsters)
+        new_world._npcs = dict(self._npcs)
+        new_world.effects = set(self.effects)
+
+        new_world._shared_planes = set(self.planes.keys())
+
+        # The bots and switch groups change as the world is played so they and the objects that they
+        # control get their own copies.  Anything else that they refer to is left shared.
+        memo = {id(self): new_world}
+        if self.player is not None:
+            memo[id(self.player)] = self.player
+
+        new_world.bots, new_world.switch_groups = copy.deepcopy((self.bots, self.switch_groups), memo)
+
+        dynamic_objects = [bot.target_object for bot in self.bots]
+        for switch_group in self.switch_groups.values():
+            dynamic_objects.extend(switch_group.switches)
+
+        # Swap the new copies of the dynamic objects into the planes of the new world
+        substitutes_by_plane = {}
+        for old_object in dynamic_objects:
+            z = old_object.z
+            if z in self.planes.keys() and old_object in self.planes[z]:
+                if z not in substitutes_by_plane.keys():
+                    substitutes_by_plane[z] = {}
+                substitutes_by_plane[z][old_object] = memo[id(old_object)]
+
+        for z, substitutes in substitutes_by_plane.items():
+            new_world.own_plane(z, substitutes)
+
+        return new_world
+
+    def share_planes(self):
+
+        # Treat every plane as shared with another world so that they get copied before they are changed
+        self._shared_planes = set(self.planes.keys())
+
+    def own_plane(self, z: int, substitutes: dict = None):
+
+        # Take a private copy of a plane that is shared with another world,
+        # swapping in any substitute objects as we go
+        if z not in self._shared_planes and substitutes is None:
+            return
+
+        if substitutes is None:
+            substitutes = {}
+
+        self.planes[z] = self.planes[z].copy(substitutes)
+        self.plane_grids[z] = self.plane_grids[z].copy(substitutes)
+        self.plane_names[z] = {name: {substitutes.get(obj, obj): None for obj in objects}
+                               for name, objects in self.plane_names[z].items()}
+        self.plane_properties[z] = {property: {substitutes.get(obj, obj): None for obj in objects}
+                                    for property, objects in self.plane_properties[z].items()}
+
+        self._shared_planes.discard(z)
+
+    def index_object(self, new_object, z: int):
+
+        # Index the object by name...
+        names = self.plane_names[z]
+        if new_object.name not in names.keys():
+            names[new_object.name] = {}
+        names[new_object.name][new_object] = None
+
+        # ...and by each of the boolean properties that we are interested in
+        for property, objects in self.plane_properties[z].items():
+            if getattr(new_object, property) is True:
+                objects[new_object] = None
+
+    def unindex_object(self, old_object, z: int):
+
+        names = self.plane_names[z]
+        objects = names.get(old_object.name)
+        if objects is not None:
+            objects.pop(old_object, None)
+            if len(objects) == 0:
+                del names[old_object.name]
+
+        for objects in self.plane_properties[z].values():
+            objects.pop(old_object, None)
+
+    def get_objects_by_name(self, object_name: str, z: int = None):
+
+        if z is None:
+            plane_ids = self.plane_names.keys()
+        elif z in self.plane_names.keys():
+            plane_ids = (z,)
+        else:
+            plane_ids = ()
+
+        matching_objects = []
+        for plane_id in plane_ids:
+            objects = self.plane_names[plane_id].get(object_name)
+            if objects is not None:
+                matching_objects.extend(objects)
+
+        return matching_objects
+
+    def get_objects_by_property(self, property: str, z: int = None):
+
+        if z is None:
+            plane_ids = self.plane_properties.keys()
+        elif z in self.plane_properties.keys():
+            plane_ids = (z,)
+        else:
+            plane_ids = ()
+
+        matching_objects = []
+        for plane_id in plane_ids:
+            matching_objects.extend(self.plane_properties[plane_id][property])
+
+        return matching_objects
+
+    def add_switch_group(self, new_switch_group: SwitchGroup):
+
+        if new_switch_group.name in self.switch_groups.keys():
+            print("Already got a switch group with id {0}".format(new_switch_group.name))
+            for switch in self.switch_groups[new_switch_group.name].switches:
+                new_switch_group.add_switch(switch)
+
+        self.switch_groups[new_switch_group.name] = new_switch_group
+
+    def add_switch_object(self, new_object):
+
+        if new_object.name not in self.switch_groups.keys():
+            self.add_switch_group(SwitchGroup(name=new_object.name, from_object_name=new_object.name))
+
+        self.switch_groups[new_object.name].add_switch(new_object)
+
+    def add_player(self, new_player, start_pos: bool):
 
         self.player = new_player
         if start_pos is True:
@@ -1255,7 +2276,19 @@ class World3D:
 
     def move_monsters(self):
 
-        for bot in self.bots:
+        if World3D.SCHEDULE_BOTS is True:
+            self.bot_scheduler.tick()
+        else:
+            for bot in self.bots:
+                self.tick_bot(bot)
+
+        self.batch_movement.complete_moves()
+
+    def tick_bot(self, bot):
+
+        if World3D.BATCH_MOVES is True:
+            self.batch_movement.tick_bot(bot)
+        else:
             bot.tick()
 
     def delete_player(self):
@@ -1342,6 +2375,8 @@ class World3D:
         for bot in self.bots:
             bot.reset()
 
+        self.bot_scheduler.reset()
+
     def debug(self, debug_on: bool = None):
         if debug_on is None:
             self._debug = not self._debug
@@ -1369,10 +2404,6 @@ class World3D:
             dy = int(dy / 2)
 
         new_plane = selected_object.z + dz
-        if new_plane in self.planes.keys():
-            objects = self.planes[new_plane]
-        else:
-            objects = []
 
         # Are we attempting to change planes?
         if dz != 0:
@@ -1381,22 +2412,15 @@ class World3D:
             if self.is_valid_pos(selected_object.xyz) is False:
                 selected_object.back()
                 # print("DZ:Object {0} moving to {1} goes outside the world".format(selected_object, vector))
-            else:
-                for object in objects:
-                    if object.is_solid is True and object.is_colliding(selected_object):
-                        selected_object.back()
-                        # print("DZ:Object {0} collided with object {1}".format(selected_object, str(object)))
-                        break
+            elif self.is_colliding_with_solid(selected_object, new_plane) is True:
+                selected_object.back()
+                # print("DZ:Object {0} collided with object {1}".format(selected_object, str(object)))
 
         # If we succeeded in moving planes...
         if selected_object.has_changed_planes() is True:
 
             # Get the objects for the new plane
             new_plane = selected_object.z
-            if new_plane in self.planes.keys():
-                objects = self.planes[new_plane]
-            else:
-                objects = []
 
         # Are we attempting to change X position?
         if dx != 0:
@@ -1404,12 +2428,9 @@ class World3D:
 
             if self.is_valid_pos(selected_object.get_pos()) is False:
                 selected_object.back()
-            else:
-                for object in objects:
-                    if object.is_solid is True and object.is_colliding(selected_object):
-                        selected_object.back()
-                        # print("DX:Object {0} collided with object {1}".format(selected_object, str(object)))
-                        break
+            elif self.is_colliding_with_solid(selected_object, new_plane) is True:
+                selected_object.back()
+                # print("DX:Object {0} collided with object {1}".format(selected_object, str(object)))
 
         # Are we attempting to change Y position?
         if dy != 0:
@@ -1417,13 +2438,13 @@ class World3D:
 
             if self.is_valid_pos(selected_object.get_pos()) is False:
                 selected_object.back()
-            else:
-                for object in objects:
-                    if object.is_solid is True and object.is_colliding(selected_object):
-                        selected_object.back()
-                        # print("DY:Object {0} collided with object {1}".format(selected_object, str(object)))
-                        break
+            elif self.is_colliding_with_solid(selected_object, new_plane) is True:
+                selected_object.back()
+                # print("DY:Object {0} collided with object {1}".format(selected_object, str(object)))
 
+        self.finish_move(selected_object, start_xyz)
+
+    def finish_move(self, selected_object, start_xyz):
 
         end_xyz = selected_object.xyz
 
@@ -1442,11 +2463,27 @@ class World3D:
 
             # Otherwise tick the object to trigger animation.
             else:
+                if ez in self._shared_planes:
+                    self.own_plane(ez)
+                if ez in self.plane_grids.keys():
+                    self.plane_grids[ez].move(selected_object)
                 selected_object.tick()
 
             # if selected_object.name == Objects.PLAYER:
             #     print("{0}: dxyz={1}".format(selected_object.name, selected_object.dxyz))
 
+    def is_colliding_with_solid(self, selected_object, z: int):
+
+        # Only look at the objects in the grid cells that the selected object overlaps
+        if z not in self.plane_grids.keys():
+            return False
+
+        for object in self.plane_grids[z].query(selected_object.rect, "is_solid"):
+            if object.is_colliding(selected_object):
+                return True
+
+        return False
+
     def move_object_to_xyz(self, selected_object: RPGObject3D, xyz):
 
         x, y, z = xyz
@@ -1493,8 +2530,8 @@ class World3D:
 
         matching_objects = []
 
-        if z in self.planes.keys():
-            for obj in self.planes[z]:
+        if z in self.plane_grids.keys():
+            for obj in self.plane_grids[z].query(pygame.Rect(x, y, 1, 1)):
                 if obj.contains_point((x, y, z)) is True:
                     matching_objects.append(obj)
 
@@ -1502,31 +2539,50 @@ class World3D:
 
     def touching_objects(self, target : RPGObject3D, distance=None, object_filter: list = [], property_filter: dict = {}):
 
-        # Get the list of objects that are in the same plane as the target object
-        objects = self.planes[target.z]
+        # Get the grid of objects that are in the same plane as the target object
+        z = target.z
+        if z not in self.plane_grids.keys():
+            return []
+
+        # If you want to filter by object name then use the name index of the plane to find the objects that
+        # you are interested in and give up early if there aren't any in this plane
+        if len(object_filter) > 0:
+            names = self.plane_names[z]
+            named_objects = {}
+            for name in object_filter:
+                if name in names.keys():
+                    named_objects.update(names[name])
+
+            if len(named_objects) == 0:
+                return []
+        else:
+            named_objects = None
 
-        # Create an empty list to hold any objects that we find that are touching the target and
-        # satisfy the specified object and/or property filters
-        touching = []
-
-        # For each object in the plane..
-        for object in objects:
-
-            # If you didn't want to filter by object name or the object is in your list of desired objects...
-            # see if the object in the plane is touching the target object at the specified distance
-            if (object_filter == [] or object.name in object_filter) and \
-                    object.is_touching(target, distance):
-
-                # Now see if the object matches the property filters that you specified...
-                match = True
-                for property, value in property_filter.items():
-                    if getattr(object, property) != value:
-                        match = False
-                        break
+        # Work out how far around the target we need to look and then just get the objects near to the target
+        # Pad the search area a little so that we never miss an object because of rounding in Rect.inflate()
+        if distance is None:
+            search_distance = max(RPGObject3D.TOUCH_FIELD_X, RPGObject3D.TOUCH_FIELD_Y)
+        else:
+            search_distance = abs(int(distance))
+        search_rect = target.rect.inflate(search_distance + 2, search_distance + 2)
+        objects = self.plane_grids[z].query(search_rect)
+
+        if named_objects is not None:
+            objects = [object for object in objects if object in named_objects]
+
+        # Now use the property indexes of the plane to drop objects that don't match the property filters
+        plane_properties = self.plane_properties[z]
+        for property, value in property_filter.items():
+            if len(objects) == 0:
+                break
+            if property in plane_properties.keys():
+                indexed_objects = plane_properties[property]
+                objects = [object for object in objects if (object in indexed_objects) == value]
+            else:
+                objects = [object for object in objects if getattr(object, property) == value]
 
-                # If the property filters matched as well then add to the list of objects touching the target
-                if match is True:
-                    touching.append(object)
+        # Create a list to hold any of the remaining objects that are touching the target at the specified distance
+        touching = [object for object in objects if object.is_touching(target, distance)]
 
         return touching
 
@@ -1538,18 +2594,15 @@ class World3D:
             new_object = WorldObjectLoader.get_object_copy_by_name(new_object_name)
             new_object.is_switchable = True
             new_object.set_pos(xyz)
-            self.add_object3D(new_object)
+            self.add_object3D(new_object, do_copy=False)
 
         self.delete_object3D(old_object)
 
     def swap_objects_by_name(self, target_object_name: str, new_object_name: str, switch_all: bool = False):
 
-        # Collect the list of objects that need to be swapped
-        objects_to_swap = []
-        for plane in self.planes.values():
-            for obj in plane:
-                if obj.name == target_object_name and (obj.is_switchable is True or switch_all is True):
-                    objects_to_swap.append(obj)
+        # Collect the list of objects that need to be swapped using the index of objects by name
+        objects_to_swap = [obj for obj in self.get_objects_by_name(target_object_name)
+                           if obj.is_switchable is True or switch_all is True]
 
         # Swap each object that we found matching
         for obj in objects_to_swap:
@@ -1558,228 +2611,943 @@ class World3D:
         print("{0} world objects swapped from {1} to {2}".format(len(objects_to_swap), target_object_name,
                                                                  new_object_name))
 
-    def set_switch(self, switch_key, state=None):
+    def set_switch(self, switch_key, state=None):
+
+        output = None
+
+        if switch_key in self.switch_groups.keys():
+            if state is None:
+                output = self.switches[switch_key].switch()
+            else:
+                output = self.switches[switch_key] = state
+
+        return output
+
+    def set_switch_object(self, object, new_state=None):
+
+        if object.name in self.switch_groups.keys():
+            switch_group = self.switch_groups[object.name]
+            output = switch_group.switch(object, new_state)
+
+            if switch_group.has_changed_state() is True:
+                self.swap_objects_by_name(target_object_name=switch_group.outputs[not output],
+                                          new_object_name=switch_group.outputs[output])
+        else:
+            print("I don't have a switch group called {0} in this world".format(object.name))
+
+    def add_effect(self, effect_name, one_off=False):
+
+        if effect_name == Event.EFFECT_REVEAL_SECRETS:
+            self.swap_objects_by_name(Objects.FAKE_WALL, Objects.EMPTY, switch_all=True)
+        elif one_off is False:
+            self.effects.add(effect_name)
+
+    def remove_effect(self, effect_name):
+        if effect_name == "REMOVE_ALL":
+            self.effects = set()
+        elif effect_name in self.effects:
+            self.effects.remove(effect_name)
+
+    def print(self):
+
+        for monster, vector in self.monsters.items():
+            print("Monster {0} moving {1}".format(monster, vector))
+
+        for switch_group in self.switch_groups.values():
+            switch_group.print()
+
+        for bot in self.bots:
+            print(str(bot))
+
+        self.bot_scheduler.print()
+        self.batch_movement.print()
+
+        for obj in self.get_objects_by_property("is_switch"):
+            print("Switch: {0}".format(str(obj)))
+
+
+
+class CollisionDetection:
+    def __init__(self):
+        pass
+
+    @staticmethod
+    def line_line_intersection(a1, a2, b1, b2):
+
+        x1, y1 = a1
+        x2, y2 = a2
+
+        x3, y3 = b1
+        x4, y4 = b2
+
+        try:
+            uA = ((x4 - x3) * (y1 - y3) - (y4 - y3) * (x1 - x3)) / ((y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1))
+            uB = ((x2 - x1) * (y1 - y3) - (y2 - y1) * (x1 - x3)) / ((y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1))
+
+            if (uA >= 0 and uA <= 1 and uB >= 0 and uB <= 1):
+                return True
+
+        except Exception as e:
+            pass
+
+        return False
+
+    @staticmethod
+    def line_rectangle_intersection(a1, a2, rectangle_xywh):
+        x1, y1 = a1
+        x2, y2 = a2
+        rx, ry, rw, rh = rectangle_xywh
+
+        left = CollisionDetection.line_line_intersection((x1, y1), (x2, y2), (rx, ry), (rx, ry + rh))
+        right = CollisionDetection.line_line_intersection((x1, y1), (x2, y2), (rx + rw, ry), (rx + rw, ry + rh))
+        top = CollisionDetection.line_line_intersection((x1, y1), (x2, y2), (rx, ry), (rx + rw, ry))
+        bottom = CollisionDetection.line_line_intersection((x1, y1), (x2, y2), (rx, ry + rh), (rx + rw, ry + rh))
+
+        if left or right or top or bottom:
+            return True
+        else:
+            return False
+
+
+class PathFinder:
+    """
+    A* path finding, flow fields and line of sight checks over a walkability grid for each plane of a world.
+    The grid is built from the solid objects in the plane that don't move and is rebuilt when the plane's
+    version changes e.g. when tiles are swapped.  Paths and flow fields are cached until the grid that they
+    were found on changes.
+    """
+
+    CELL_SIZE = 32
+
+    # Maximum number of paths that we remember for each plane
+    MAX_CACHED_PATHS = 500
+
+    # Maximum number of flow fields that we remember for each plane
+    MAX_FLOW_FIELDS = 8
+
+    # Steps that can be taken from a cell.  No diagonals so that things following a path don't clip corners.
+    NEIGHBOURS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+
+    def __init__(self, world):
+        self.world = world
+        self.grids = {}
+        self.paths = {}
+        self.flow_fields = {}
+        self.blocked_cells = []
+
+    def __deepcopy__(self, memo):
+        # The grids and paths are just caches so a copy starts again with whatever the world is copied to
+        return PathFinder(copy.deepcopy(self.world, memo))
+
+    def get_cell(self, x: int, y: int):
+        return (int(x) // PathFinder.CELL_SIZE, int(y) // PathFinder.CELL_SIZE)
+
+    def get_cell_centre(self, cell: tuple, z: int):
+        cx, cy = cell
+        return (cx * PathFinder.CELL_SIZE + PathFinder.CELL_SIZE // 2,
+                cy * PathFinder.CELL_SIZE + PathFinder.CELL_SIZE // 2,
+                z)
+
+    def get_grid(self, z: int):
+
+        version = self.world.plane_versions.get(z, 0)
+
+        if z in self.grids.keys():
+            grid_version, grid, cell_objects = self.grids[z]
+            if grid_version == version:
+                return grid, cell_objects
+
+        grid, cell_objects = self.build_grid(z)
+        self.grids[z] = (version, grid, cell_objects)
+        self.paths[z] = {}
+        self.flow_fields[z] = {}
+
+        return grid, cell_objects
+
+    def build_grid(self, z: int):
+
+        cols = int(self.world.width) // PathFinder.CELL_SIZE + 1
+        rows = int(self.world.height) // PathFinder.CELL_SIZE + 1
+        grid = np.ones((rows, cols), dtype=bool)
+        cell_objects = {}
+
+        # Things that move around aren't part of the map
+        dynamic_objects = {bot.target_object for bot in self.world.bots}
+        if self.world.player is not None:
+            dynamic_objects.add(self.world.player)
+
+        for obj in self.world.get_objects_by_property("is_solid", z):
+
+            if obj in dynamic_objects:
+                continue
+
+            rect = obj.rect
+            left, top = self.get_cell(rect.left, rect.top)
+            right, bottom = self.get_cell(rect.right - 1, rect.bottom - 1)
+            left = max(left, 0)
+            top = max(top, 0)
+            right = min(right, cols - 1)
+            bottom = min(bottom, rows - 1)
+
+            grid[top:bottom + 1, left:right + 1] = False
+
+            for cy in range(top, bottom + 1):
+                for cx in range(left, right + 1):
+                    if (cx, cy) not in cell_objects.keys():
+                        cell_objects[(cx, cy)] = []
+                    cell_objects[(cx, cy)].append(obj)
+
+        # Lists are a lot quicker than numpy arrays to look up one cell at a time
+        return grid.tolist(), cell_objects
+
+    def is_walkable(self, x: int, y: int, z: int):
+
+        grid, cell_objects = self.get_grid(z)
+        cx, cy = self.get_cell(x, y)
+
+        return 0 <= cy < len(grid) and 0 <= cx < len(grid[0]) and grid[cy][cx] is True
+
+    def find_path(self, from_xyz: tuple, to_xyz: tuple):
+
+        # Find a list of cells to go through to get from one point to another on the same plane.
+        # Returns None if there isn't a way through.
+        fx, fy, fz = from_xyz
+        tx, ty, tz = to_xyz
+
+        self.blocked_cells = []
+
+        if fz != tz:
+            return None
+
+        grid, cell_objects = self.get_grid(fz)
+        start = self.get_cell(fx, fy)
+        goal = self.get_cell(tx, ty)
+
+        paths = self.paths[fz]
+        if (start, goal) in paths.keys():
+            return paths[(start, goal)]
+
+        path = self.a_star(grid, start, goal)
+
+        if len(paths) >= PathFinder.MAX_CACHED_PATHS:
+            paths.clear()
+        paths[(start, goal)] = path
+
+        return path
+
+    def a_star(self, grid: list, start: tuple, goal: tuple):
+
+        rows = len(grid)
+        cols = len(grid[0])
+
+        gx, gy = goal
+        if not (0 <= gx < cols and 0 <= gy < rows) or grid[gy][gx] is False:
+            self.blocked_cells = [goal]
+            return None
+
+        # We are allowed to start in a blocked cell so that we can find our way out of it
+        open_cells = [(0, 0, start)]
+        came_from = {start: None}
+        costs = {start: 0}
+        blocked_cells = {}
+        count = 0
+
+        while len(open_cells) > 0:
+
+            estimate, count_, cell = heapq.heappop(open_cells)
+
+            if cell == goal:
+                path = []
+                while cell is not None:
+                    path.append(cell)
+                    cell = came_from[cell]
+                path.reverse()
+                return path
+
+            cx, cy = cell
+            cost = costs[cell] + 1
+
+            for dx, dy in PathFinder.NEIGHBOURS:
+                nx = cx + dx
+                ny = cy + dy
+
+                if nx < 0 or ny < 0 or nx >= cols or ny >= rows:
+                    continue
+
+                if grid[ny][nx] is False:
+                    blocked_cells[(nx, ny)] = None
+                    continue
+
+                next_cell = (nx, ny)
+                if next_cell not in costs.keys() or cost < costs[next_cell]:
+                    costs[next_cell] = cost
+                    came_from[next_cell] = cell
+                    count += 1
+                    heapq.heappush(open_cells, (cost + abs(gx - nx) + abs(gy - ny), count, next_cell))
+
+        # Remember what stopped us getting there
+        self.blocked_cells = list(blocked_cells.keys())
+
+        return None
+
+    def get_flow_field(self, to_xyz: tuple):
+
+        # Get a grid of the next cell to go to from each cell to get to the cell that a point is in.
+        # Everything heading for the same cell on a plane shares the same flow field.
+        tx, ty, tz = to_xyz
+
+        grid, cell_objects = self.get_grid(tz)
+        goal = self.get_cell(tx, ty)
+
+        flow_fields = self.flow_fields[tz]
+        if goal in flow_fields.keys():
+            return flow_fields[goal]
+
+        flow_field = self.build_flow_field(grid, goal)
+
+        if len(flow_fields) >= PathFinder.MAX_FLOW_FIELDS:
+            flow_fields.clear()
+        flow_fields[goal] = flow_field
+
+        return flow_field
+
+    def build_flow_field(self, grid: list, goal: tuple):
+
+        rows = len(grid)
+        cols = len(grid[0])
+
+        next_cells = [[None] * cols for row in range(rows)]
+
+        gx, gy = goal
+        if not (0 <= gx < cols and 0 <= gy < rows):
+            return next_cells
+
+        # Breadth first search out from the goal with each cell pointing back at the cell that we reached it from
+        next_cells[gy][gx] = goal
+        open_cells = collections.deque([goal])
+
+        while len(open_cells) > 0:
+
+            cell = open_cells.popleft()
+            cx, cy = cell
+
+            for dx, dy in PathFinder.NEIGHBOURS:
+                nx = cx + dx
+                ny = cy + dy
+
+                if 0 <= nx < cols and 0 <= ny < rows and grid[ny][nx] is True and next_cells[ny][nx] is None:
+                    next_cells[ny][nx] = cell
+                    open_cells.append((nx, ny))
+
+        return next_cells
+
+    def get_flow_step(self, from_xyz: tuple, to_xyz: tuple):
+
+        # Which point should we head for next to get from one point to another?
+        # Returns None if there is no way there.
+        fx, fy, fz = from_xyz
+        tx, ty, tz = to_xyz
+
+        if fz != tz:
+            return None
+
+        next_cells = self.get_flow_field(to_xyz)
+        cx, cy = self.get_cell(fx, fy)
+
+        if not (0 <= cy < len(next_cells) and 0 <= cx < len(next_cells[0])):
+            return None
+
+        next_cell = next_cells[cy][cx]
+
+        if next_cell is None:
+            return None
+        elif next_cell == (cx, cy):
+            # We are in the same cell so head straight there
+            return to_xyz
+        else:
+            return self.get_cell_centre(next_cell, fz)
+
+    def raycast(self, from_xy: tuple, to_xy: tuple, z: int, ignore_objects=()):
+
+        # Walk the cells that the line from one point to another passes through (DDA) and
+        # return the first solid object that the line hits or None if nothing is in the way.
+        grid, cell_objects = self.get_grid(z)
+        rows = len(grid)
+        cols = len(grid[0])
+
+        x1, y1 = from_xy
+        x2, y2 = to_xy
+        dx = x2 - x1
+        dy = y2 - y1
+
+        cx, cy = self.get_cell(x1, y1)
+        end_cell = self.get_cell(x2, y2)
+
+        # How far along the line (0 to 1) we go to cross a cell and to get to the first cell boundary in x and y
+        if dx > 0:
+            step_x = 1
+            t_delta_x = PathFinder.CELL_SIZE / dx
+            t_max_x = ((cx + 1) * PathFinder.CELL_SIZE - x1) / dx
+        elif dx < 0:
+            step_x = -1
+            t_delta_x = PathFinder.CELL_SIZE / -dx
+            t_max_x = (x1 - cx * PathFinder.CELL_SIZE) / -dx
+        else:
+            step_x = 0
+            t_delta_x = t_max_x = math.inf
+
+        if dy > 0:
+            step_y = 1
+            t_delta_y = PathFinder.CELL_SIZE / dy
+            t_max_y = ((cy + 1) * PathFinder.CELL_SIZE - y1) / dy
+        elif dy < 0:
+            step_y = -1
+            t_delta_y = PathFinder.CELL_SIZE / -dy
+            t_max_y = (y1 - cy * PathFinder.CELL_SIZE) / -dy
+        else:
+            step_y = 0
+            t_delta_y = t_max_y = math.inf
+
+        while True:
+
+            # A line that goes through the corner of a cell also touches the cell beside it that we step past
+            cells = [(cx, cy)]
+            if math.isclose(t_max_x, t_max_y) is True and t_max_x <= 1:
+                cells.append((cx + step_x, cy))
+
+            # If the cell has something solid in it then check that the line really hits it
+            for cell_x, cell_y in cells:
+                if 0 <= cell_y < rows and 0 <= cell_x < cols and grid[cell_y][cell_x] is False:
+                    for obj in cell_objects[(cell_x, cell_y)]:
+                        if obj not in ignore_objects and len(obj.rect.clipline(from_xy, to_xy)) > 0:
+                            return obj
+
+            if (cx, cy) == end_cell or min(t_max_x, t_max_y) > 1:
+                break
+
+            if t_max_x < t_max_y:
+                t_max_x += t_delta_x
+                cx += step_x
+            else:
+                t_max_y += t_delta_y
+                cy += step_y
+
+        # Solid objects that move around aren't in the grid so check them separately
+        for bot in self.world.bots:
+            obj = bot.target_object
+            if obj.is_solid is True and obj.z == z and obj not in ignore_objects and \
+                    len(obj.rect.clipline(from_xy, to_xy)) > 0:
+                return obj
+
+        return None
+
+    def get_blockers(self, z: int):
+
+        # The solid objects in the cells that got in the way of the last path that couldn't be found
+        grid, cell_objects = self.get_grid(z)
+
+        blockers = {}
+        for cell in self.blocked_cells:
+            for obj in cell_objects.get(cell, ()):
+                blockers[obj] = None
+
+        return list(blockers.keys())
+
+    def print(self):
+        print("Path finder for world {0}: {1} grids".format(self.world.name, len(self.grids)))
+        for z, grid in self.grids.items():
+            version, grid, cell_objects = grid
+            print("Plane {0}: version {1}, {2} blocked cells, {3} cached paths, {4} flow fields".format(
+                z, version, len(cell_objects), len(self.paths.get(z, {})), len(self.flow_fields.get(z, {}))))
+
+
+class Navigator:
+
+    def __init__(self):
+        self.route = []
+        self.blockers = []
+
+    def __deepcopy__(self, memo):
+        # The route and blockers are just the results of the last navigation so don't copy them
+        return Navigator()
+
+    def navigate(self, world: World3D, from_object: RPGObject3D, to_object: RPGObject3D):
+
+        success = False
+        self.route = []
+        self.blockers = []
+
+        fz = from_object.z
+        tz = to_object.z
+
+        # Find a way around the solid objects in the plane from the centre of one object to the centre of the other
+        if fz == tz:
+
+            path_finder = world.path_finder
+
+            path = path_finder.find_path((from_object.rect.centerx, from_object.rect.centery, fz),
+                                         (to_object.rect.centerx, to_object.rect.centery, tz))
+
+            if path is not None:
+                self.route = [path_finder.get_cell_centre(cell, fz) for cell in path]
+                success = True
+            else:
+                self.blockers = path_finder.get_blockers(fz)
+
+        return success
+
+    def navigate2(self, world: World3D, from_object: RPGObject3D, to_object: RPGObject3D):
+
+        success = True
+        self.blockers = []
+        self.hits = []
+
+        fz = from_object.z
+        tz = to_object.z
+
+        # If the two objects are on the same plane...
+        if fz == tz:
+
+            # Which parts of the rectangle should be checked for line of sight?
+            #check_points = ("center", "topleft", "bottomleft", "topright", "bottomright")
+            check_points = ("center", "midtop", "midbottom", "midright", "midleft")
+
+            ignore_objects = (from_object, to_object)
+
+            # Use a list of different check points to see if we can see different parts of the target
+            for check_point in check_points:
+
+                from_a = getattr(from_object.rect, check_point)
+                to_a = getattr(to_object.rect, check_point)
+
+                # Cast a ray between the from and to objects to find the first solid object in the way
+                blocker = world.path_finder.raycast(from_a, to_a, fz, ignore_objects)
+
+                # if there is one then we can't see the target so record what the check point was and the blocker
+                if blocker is not None:
+                    self.hits.append((to_a))
+                    if blocker not in self.blockers:
+                        self.blockers.append(blocker)
+
+                    # if we got more than 50% fails then we failed to see the target so finish
+                    if len(self.hits)/len(check_points) > 0.5:
+                        success = False
+                        break
+
+            if success is True:
+                self.blockers = []
+        else:
+            success = False
+
+        return success
+
+class BatchMovement:
+    """
+    Makes the moves of batchable bots together instead of one at a time.
+    The moves are checked against the solid objects in each plane that aren't bots in one go using NumPy arrays.
+    Any moves that could get in the way of each other are made one at a time with World3D.move_object()
+    in the order that they were planned so that the result is the same as moving every bot in turn.
+    Bots that move one axis at a time have each axis moved in turn just like they do when they move themselves.
+    """
+
+    # Smallest number of moves that it's worth doing with NumPy rather than one at a time
+    MIN_BATCH_SIZE = 8
+
+    def __init__(self, world):
+        self.world = world
+        self.planned_moves = []
+        self.static_objects = {}
+
+        # Stats
+        self.batched_moves = 0
+        self.single_moves = 0
+
+    def __deepcopy__(self, memo):
+        # The static objects are just a cache so a copy starts again with whatever the world is copied to
+        return BatchMovement(copy.deepcopy(self.world, memo))
+
+    def tick_bot(self, bot):
+
+        # Bots that can't have their moves batched need to see every move that has already been planned
+        # and so do bots that have missed some ticks and have more than one turn to take
+        if bot.batchable is False or bot.tick_interval > 1:
+            self.complete_moves()
+            bot.tick()
+            return
+
+        vector = bot.plan_tick()
+        if vector is not None:
+            self.planned_moves.append((bot, vector))
+
+    def get_static_objects(self, z: int):
+
+        # Get arrays of the rects of the solid objects that aren't bots and the slowing objects in a plane
+        version = self.world.plane_versions.get(z, 0)
+
+        if z in self.static_objects.keys():
+            static_version, solid_rects, slow_rects = self.static_objects[z]
+            if static_version == version:
+                return solid_rects, slow_rects
 
-        output = None
+        bot_objects = {bot.target_object for bot in self.world.bots}
 
-        if switch_key in self.switch_groups.keys():
-            if state is None:
-                output = self.switches[switch_key].switch()
-            else:
-                output = self.switches[switch_key] = state
+        solid_rects = [tuple(obj.rect) for obj in self.world.get_objects_by_property("is_solid", z)
+                       if obj not in bot_objects]
+        slow_rects = [tuple(obj.rect) for obj in self.world.get_objects_by_name(World3D.SLOW_TILES[0], z) +
+                      self.world.get_objects_by_name(World3D.SLOW_TILES[1], z)
+                      if obj.is_visible is True and obj not in bot_objects]
 
-        return output
+        solid_rects = np.array(solid_rects, dtype=int).reshape(-1, 4)
+        slow_rects = np.array(slow_rects, dtype=int).reshape(-1, 4)
 
-    def set_switch_object(self, object, new_state=None):
+        self.static_objects[z] = (version, solid_rects, slow_rects)
 
-        if object.name in self.switch_groups.keys():
-            switch_group = self.switch_groups[object.name]
-            output = switch_group.switch(object, new_state)
+        return solid_rects, slow_rects
 
-            if switch_group.has_changed_state() is True:
-                self.swap_objects_by_name(target_object_name=switch_group.outputs[not output],
-                                          new_object_name=switch_group.outputs[output])
-        else:
-            print("I don't have a switch group called {0} in this world".format(object.name))
+    @staticmethod
+    def get_overlaps(x, y, w, h, rects):
 
-    def add_effect(self, effect_name, one_off=False):
+        # Which of the moving rects overlap any of the other rects?  The same test as Rect.colliderect()
+        if len(rects) == 0:
+            return np.zeros(len(x), dtype=bool)
 
-        if effect_name == Event.EFFECT_REVEAL_SECRETS:
-            self.swap_objects_by_name(Objects.FAKE_WALL, Objects.EMPTY, switch_all=True)
-        elif one_off is False:
-            self.effects.add(effect_name)
+        rx, ry, rw, rh = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
 
-    def remove_effect(self, effect_name):
-        if effect_name == "REMOVE_ALL":
-            self.effects = set()
-        elif effect_name in self.effects:
-            self.effects.remove(effect_name)
+        overlaps = (x[:, None] < (rx + rw)[None, :]) & \
+                   (rx[None, :] < (x + w)[:, None]) & \
+                   (y[:, None] < (ry + rh)[None, :]) & \
+                   (ry[None, :] < (y + h)[:, None]) & \
+                   (rw > 0)[None, :] & (rh > 0)[None, :]
 
-    def print(self):
+        return overlaps.any(axis=1) & (w > 0) & (h > 0)
 
-        for monster, vector in self.monsters.items():
-            print("Monster {0} moving {1}".format(monster, vector))
+    def complete_moves(self):
 
-        for switch_group in self.switch_groups.values():
-            switch_group.print()
+        if len(self.planned_moves) == 0:
+            return
 
-        for bot in self.bots:
-            print(str(bot))
+        planned_moves = self.planned_moves
+        self.planned_moves = []
 
-        for plane_objects in self.planes.values():
-            for obj in plane_objects:
-                if obj.is_switch is True:
-                    print("Switch: {0}".format(str(obj)))
+        moves = []
+        for bot, vector in planned_moves:
+            dx, dy, dz = vector
+            if dx != 0 or dy != 0 or dz != 0:
+                moves.append((bot.target_object, int(dx), int(dy), int(dz), bot.move_by_axis))
 
+        batch, singles = self.split_moves(moves)
 
+        if len(batch) < BatchMovement.MIN_BATCH_SIZE:
+            batch = []
+            singles = moves
 
-class CollisionDetection:
-    def __init__(self):
-        pass
+        for z, plane_moves in self.group_by_plane(batch).items():
+            self.move_plane_objects(z, plane_moves)
 
-    @staticmethod
-    def line_line_intersection(a1, a2, b1, b2):
+        # Make the moves that might get in each other's way one at a time in order
+        for obj, dx, dy, dz, move_by_axis in singles:
+            if move_by_axis is True and dz == 0:
+                if dx != 0:
+                    self.world.move_object(obj, (dx, 0, 0))
+                if dy != 0:
+                    self.world.move_object(obj, (0, dy, 0))
+            else:
+                self.world.move_object(obj, (dx, dy, dz))
 
-        x1, y1 = a1
-        x2, y2 = a2
+        self.batched_moves += len(batch)
+        self.single_moves += len(singles)
 
-        x3, y3 = b1
-        x4, y4 = b2
+        for bot, vector in planned_moves:
+            bot.complete_tick()
 
-        try:
-            uA = ((x4 - x3) * (y1 - y3) - (y4 - y3) * (x1 - x3)) / ((y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1))
-            uB = ((x2 - x1) * (y1 - y3) - (y2 - y1) * (x1 - x3)) / ((y4 - y3) * (x2 - x1) - (x4 - x3) * (y2 - y1))
+    def split_moves(self, moves: list):
 
-            if (uA >= 0 and uA <= 1 and uB >= 0 and uB <= 1):
-                return True
+        # Moves that change plane get made one at a time and so do any two moves that could meet each other
+        # if one of them is solid, as the one that is planned first has to be made first
+        sweeps = []
+        planes = []
+        single = []
+        for obj, dx, dy, dz, move_by_axis in moves:
+            rect = obj.rect
+            sweeps.append(rect.union(rect.move(dx, dy)))
+            planes.append((obj.z, obj.z + dz))
+            single.append(dz != 0 or obj.z not in self.world.plane_grids.keys())
 
-        except Exception as e:
-            pass
+        solid_sweeps = [(j, sweep) for j, sweep in enumerate(sweeps) if moves[j][0].is_solid is True]
 
-        return False
+        for j, solid_sweep in solid_sweeps:
+            for i in solid_sweep.collidelistall(sweeps):
+                if i != j and (planes[i][0] in planes[j] or planes[i][1] in planes[j]):
+                    single[i] = True
+                    single[j] = True
 
-    @staticmethod
-    def line_rectangle_intersection(a1, a2, rectangle_xywh):
-        x1, y1 = a1
-        x2, y2 = a2
-        rx, ry, rw, rh = rectangle_xywh
+        batch = []
+        singles = []
 
-        left = CollisionDetection.line_line_intersection((x1, y1), (x2, y2), (rx, ry), (rx, ry + rh))
-        right = CollisionDetection.line_line_intersection((x1, y1), (x2, y2), (rx + rw, ry), (rx + rw, ry + rh))
-        top = CollisionDetection.line_line_intersection((x1, y1), (x2, y2), (rx, ry), (rx + rw, ry))
-        bottom = CollisionDetection.line_line_intersection((x1, y1), (x2, y2), (rx, ry + rh), (rx + rw, ry + rh))
+        for i, move in enumerate(moves):
+            if single[i] is True:
+                singles.append(move)
+            else:
+                batch.append(move)
+
+        return batch, singles
+
+    def group_by_plane(self, moves: list):
+
+        moves_by_plane = {}
+        for move in moves:
+            z = move[0].z
+            if z not in moves_by_plane.keys():
+                moves_by_plane[z] = []
+            moves_by_plane[z].append(move)
+
+        return moves_by_plane
+
+    def move_plane_objects(self, z: int, moves: list):
+
+        solid_rects, slow_rects = self.get_static_objects(z)
+
+        # Solid bots that aren't moving in this batch are in the way wherever they are now
+        moving_objects = {move[0] for move in moves}
+        bot_rects = [tuple(bot.target_object.rect) for bot in self.world.bots
+                     if bot.target_object.is_solid is True and bot.target_object.z == z and
+                     bot.target_object not in moving_objects]
+        if len(bot_rects) > 0:
+            solid_rects = np.concatenate((solid_rects, np.array(bot_rects, dtype=int).reshape(-1, 4)))
+
+        rects = np.array([tuple(move[0].rect) for move in moves], dtype=int).reshape(-1, 4)
+        x, y, w, h = rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3]
+        dx = np.array([move[1] for move in moves], dtype=int)
+        dy = np.array([move[2] for move in moves], dtype=int)
+        move_by_axis = np.array([move[4] for move in moves], dtype=bool)
+
+        width = int(self.world.width)
+        height = int(self.world.height)
+        valid_z = 0 <= z <= int(self.world.depth)
+
+        # Slowing objects where a move starts halve the move in each direction.  Bots that move one axis
+        # at a time start their second move from wherever their first move left them.
+        slow = BatchMovement.get_overlaps(x, y, w, h, slow_rects)
+        dx = np.where(slow, (dx / 2).astype(int), dx)
+        new_x = x + dx
+        move_x = (dx != 0) & (new_x >= 0) & (new_x <= width) & (y >= 0) & (y <= height) & valid_z
+        move_x &= ~BatchMovement.get_overlaps(new_x, y, w, h, solid_rects)
+        x_after = np.where(move_x, new_x, x)
+
+        slow = np.where(move_by_axis, BatchMovement.get_overlaps(x_after, y, w, h, slow_rects), slow)
+        dy = np.where(slow, (dy / 2).astype(int), dy)
+        new_y = y + dy
+        move_y = (dy != 0) & (x_after >= 0) & (x_after <= width) & (new_y >= 0) & (new_y <= height) & valid_z
+        move_y &= ~BatchMovement.get_overlaps(x_after, new_y, w, h, solid_rects)
+
+        # Move the objects in the same steps as World3D.move_object() so they end up in the same state
+        for i, move in enumerate(moves):
+            obj = move[0]
+            start_xyz = obj.xyz
+
+            if dx[i] != 0:
+                obj.move(int(dx[i]), 0, 0)
+                if move_x[i] == False:
+                    obj.back()
+
+            # Each axis of a move made one axis at a time gets finished on its own
+            if move_by_axis[i] == True and dx[i] != 0:
+                self.world.finish_move(obj, start_xyz)
+                start_xyz = obj.xyz
+
+            if dy[i] != 0:
+                obj.move(0, int(dy[i]), 0)
+                if move_y[i] == False:
+                    obj.back()
+
+            self.world.finish_move(obj, start_xyz)
 
-        if left or right or top or bottom:
-            return True
-        else:
-            return False
+    def print(self):
+        print("Batch movement: {0} moves made in batches, {1} made one at a time".format(self.batched_moves,
+                                                                                       self.single_moves))
+
+
+class BotScheduler:
+    """
+    Decides which of a world's bots get ticked on each model tick.
+    Bots that are in view tick at their full rate, bots out of view tick less often but take all of the turns
+    that they missed when they do so that they keep moving at the same speed and bots a long way from the player
+    sleep until the player gets closer.
+    If a time budget is given and ticking the bots goes over it then the rest wait until the next tick
+    and go first taking the turns that they missed.  The budget is off unless asked for as it makes
+    the game play differently on slower machines.
+    """
+
+    # Levels of detail that a bot can be ticked at
+    LOD_FULL = "full"
+    LOD_REDUCED = "reduced"
+    LOD_SLEEPING = "sleeping"
+
+    # Distance from the player in pixels that bots that are out of view go to sleep at
+    SLEEP_DISTANCE = 960
+
+    # Area around the player that counts as being in view until a view tells us what it is showing.
+    # This is what DWWorldView shows at its widest zoom - 440 pixels in each direction and the planes
+    # from 20 in front of the player to 45 behind.
+    DEFAULT_VIEW_RANGE = 440
+    DEFAULT_VIEW_PLANES = (-20, 45)
+
+    # How often bots at the reduced level of detail get ticked
+    REDUCED_TICK_INTERVAL = 4
+
+    def __init__(self, world, time_budget: float = None):
+        self.world = world
 
+        # Time allowed for ticking the bots each tick in seconds or None for no limit
+        self.time_budget = time_budget
+        self.tick_count = 0
+        self.next_bot_index = 0
 
-class Navigator:
-    STEP_LENGTH = 10
-    HIT_BOX_SIZE = 24
+        # The tick that each bot was last ticked on
+        self.last_ticks = {}
 
-    def __init__(self):
-        self.route = []
-        self.blockers = []
+        # The area of the world that is being shown: x, y, z, range_x, range_y, depth
+        self.view_area = None
 
-    def navigate(self, world: World3D, from_object: RPGObject3D, to_object: RPGObject3D):
+        # Stats
+        self.last_stats = {}
+        self.total_stats = {}
+        self.reset_stats()
 
-        success = True
-        hit_box = pygame.Rect(0, 0, Navigator.HIT_BOX_SIZE, Navigator.HIT_BOX_SIZE)
-        self.route = []
-        self.blockers = []
+    def __deepcopy__(self, memo):
+        # Only the settings are worth copying.  A copy starts scheduling again with whatever the world is copied to.
+        return BotScheduler(copy.deepcopy(self.world, memo), time_budget=self.time_budget)
+
+    def reset(self):
+        self.tick_count = 0
+        self.next_bot_index = 0
+        self.last_ticks = {}
 
-        # print("Navigate from {0} at {1} to {2} at {3}".format(from_object.name, from_object.xyz, to_object.name, to_object.xyz))
+    def reset_stats(self):
+        self.last_stats = {"ticked": 0, "reduced": 0, "sleeping": 0, "deferred": 0}
+        self.total_stats = dict(self.last_stats)
 
-        fz = from_object.z
-        tz = to_object.z
+    def set_view_area(self, view_pos, range_x, range_y, depth):
+        vx, vy, vz = view_pos
+        self.view_area = (vx, vy, vz, range_x, range_y, depth)
 
-        if fz == tz:
+    def get_view_area(self):
 
-            fx = from_object.rect.centerx
-            fy = from_object.rect.centery
+        if self.view_area is not None:
+            return self.view_area
 
-            tx = to_object.rect.centerx
-            ty = to_object.rect.centery
+        # If nothing has told us what is being shown then assume it is the area around the player
+        player = self.world.player
+        front, back = BotScheduler.DEFAULT_VIEW_PLANES
+        return (player.rect.centerx, player.rect.centery, player.z + front,
+                BotScheduler.DEFAULT_VIEW_RANGE, BotScheduler.DEFAULT_VIEW_RANGE, back - front)
 
-            dx = (tx - fx)
-            dy = (ty - fy)
-            distance_to_object = math.sqrt(dx ** 2 + dy ** 2)
-            steps_to_target = distance_to_object / Navigator.STEP_LENGTH
-            dx = int(dx / steps_to_target)
-            dy = int(dy / steps_to_target)
+    def is_in_view(self, bot_object, view_area):
 
-            plane = world.planes[fz]
+        # The same test that ModelToView3D.get_object_list() uses to pick the objects that get drawn
+        vx, vy, vz, range_x, range_y, depth = view_area
+        ox, oy, oz = bot_object.xyz
 
-            loop = True
+        return vz <= oz < vz + depth and abs(ox - vx) <= range_x and abs(oy - vy) <= range_y
 
-            while loop:
+    def get_lod(self, bot, view_area=None):
 
-                self.route.append((fx, fy, fz))
+        # Bots that follow a timed set of instructions e.g. moving blocks need to keep in step with each other
+        if bot.schedulable is False or self.world.player is None:
+            return BotScheduler.LOD_FULL
 
-                hit_box.centerx = fx
-                hit_box.centery = fy
+        if view_area is None:
+            view_area = self.get_view_area()
 
-                # print("travelling at dx={0}, dy={1} to {2}".format(dx,dy,(tx,ty)))
-                for obj in plane:
-                    if obj.is_solid is True and \
-                            obj != from_object and \
-                            obj.rect.colliderect(hit_box):
-                        # print("Navigating {0} to {1} : Hit a {2}".format(from_object.name, to_object.name, obj.name))
-                        self.blockers.append(obj)
-                        loop = False
-                        success = False
-                        break
-                if success is False:
-                    break
+        bot_object = bot.target_object
 
-                fx += dx
-                fy += dy
+        # Bots that can be seen always move at their full rate
+        if self.is_in_view(bot_object, view_area) is True:
+            return BotScheduler.LOD_FULL
 
-                if to_object.contains_point((fx, fy, fz)) is True:
-                    success = True
-                    loop = False
-                    # print("Reached the target")
-                elif world.is_valid_xyz(fx, fy, fz) is False:
-                    success = False
-                    loop = False
-                    # print("missed target")
+        player = self.world.player
+        distance = math.sqrt((bot_object.rect.centerx - player.rect.centerx) ** 2 +
+                             (bot_object.rect.centery - player.rect.centery) ** 2)
 
+        if distance > BotScheduler.SLEEP_DISTANCE:
+            return BotScheduler.LOD_SLEEPING
         else:
-            success = False
+            return BotScheduler.LOD_REDUCED
 
-                # print("at {0}".format((fx,fy)))
+    def tick(self):
 
-        return success
+        self.tick_count += 1
 
-    def navigate2(self, world: World3D, from_object: RPGObject3D, to_object: RPGObject3D):
+        bots = self.world.bots
+        bot_count = len(bots)
+        stats = {"ticked": 0, "reduced": 0, "sleeping": 0, "deferred": 0}
 
-        success = True
-        self.blockers = []
-        self.hits = []
+        if self.next_bot_index >= bot_count:
+            self.next_bot_index = 0
 
-        fz = from_object.z
-        tz = to_object.z
+        view_area = self.get_view_area() if self.world.player is not None else None
 
-        # If the two objects are on the same plane...
-        if fz == tz:
+        start_time = time.perf_counter()
+        over_budget = False
 
-            # Which parts of the rectangle should be checked for line of sight?
-            #check_points = ("center", "topleft", "bottomleft", "topright", "bottomright")
-            check_points = ("center", "midtop", "midbottom", "midright", "midleft")
+        # Go round the bots starting with any that missed their turn last time
+        first_bot_index = self.next_bot_index
+        for i in range(bot_count):
 
-            # Loop through all of the objects in the same plane
-            plane = world.planes[fz]
+            bot_index = (first_bot_index + i) % bot_count
+            bot = bots[bot_index]
 
-            for obj in plane:
+            # Bots that we haven't seen before have had their turn up to now
+            if bot not in self.last_ticks.keys():
+                self.last_ticks[bot] = self.tick_count - 1
 
-                # Skip over the from and to objects
-                if obj not in (from_object, to_object):
+            lod = self.get_lod(bot, view_area)
 
-                    # Use a list of different check points to see if we can see different parts of the target
-                    for check_point in check_points:
+            # Sleeping bots don't catch up on the turns that they miss
+            if lod == BotScheduler.LOD_SLEEPING:
+                self.last_ticks[bot] = self.tick_count
+                stats["sleeping"] += 1
+                continue
 
-                        from_a = getattr(from_object.rect, check_point)
-                        to_a = getattr(to_object.rect, check_point)
+            # Spread the bots with a reduced level of detail over different ticks
+            if lod == BotScheduler.LOD_REDUCED and \
+                    (self.tick_count + bot_index) % BotScheduler.REDUCED_TICK_INTERVAL != 0:
+                stats["reduced"] += 1
+                continue
 
-                        # See if the line between from and to objects intersects the rectangle of the current object
-                        clip = CollisionDetection.line_rectangle_intersection(from_a, to_a, (obj.rect))
+            # Always tick at least one bot so that the bots keep going however short the budget is
+            if over_budget is False and self.time_budget is not None and stats["ticked"] > 0 and \
+                    time.perf_counter() - start_time > self.time_budget:
+                over_budget = True
+                self.next_bot_index = bot_index
 
-                        # if it does then we can't see the target so record what the check point was the blocker
-                        if clip is True:
-                            self.hits.append((to_a))
+            if over_budget is True:
+                stats["deferred"] += 1
+                continue
 
-                    # if we got more than 50% fails then we failed to see the target
-                    # So record what object was in the way and finish
-                    if len(self.hits)/len(check_points) > 0.5:
-                        success = False
-                        self.blockers.append(obj)
-                        break
-        else:
-            success = False
+            # Bots that weren't ticked every tick take the turns that they missed so that they don't slow down
+            bot.tick_interval = self.tick_count - self.last_ticks[bot]
+            self.world.tick_bot(bot)
+            bot.tick_interval = 1
+            self.last_ticks[bot] = self.tick_count
+            stats["ticked"] += 1
+
+        if over_budget is False:
+            self.next_bot_index = 0
+
+        self.last_stats = stats
+        for name, count in stats.items():
+            self.total_stats[name] += count
+
+    def get_stats(self):
+        return {"ticks": self.tick_count, "last": dict(self.last_stats), "total": dict(self.total_stats)}
+
+    def print(self):
+        print("Bot scheduler: {0} bots, tick {1}, last tick {2}, total {3}".format(len(self.world.bots),
+                                                                                self.tick_count,
+                                                                                self.last_stats,
+                                                                                self.total_stats))
 
-        return success
 
 class AIBot:
     INSTRUCTION_FAIL_NOP = "NOP"
@@ -1797,6 +3565,19 @@ class AIBot:
         self.tick_count = 1
         self._debug = False
 
+        # Can the bot scheduler tick this bot less often when it is away from the player?
+        self.schedulable = True
+
+        # Can the bot's moves be made in a batch with other bots' moves using plan_tick() and complete_tick()?
+        self.batchable = False
+
+        # Does the bot make its moves one axis at a time rather than all in one go?
+        self.move_by_axis = False
+
+        # How many model ticks have gone by since the bot was last ticked and how many of them were its turns
+        self.tick_interval = 1
+        self.turns = 0
+
     def debug(self, debug_on: bool = None):
         if debug_on is None:
             self._debug = not self._debug
@@ -1804,20 +3585,64 @@ class AIBot:
             self._debug = debug_on
 
     def tick(self):
-        self.tick_count += 1
 
-        if Event.EFFECT_FREEZE_ENEMIES in self.world.effects:
-            return False
-        else:
-            if Event.EFFECT_SLOW_ENEMIES in self.world.effects:
-                return self.tick_count % (self.tick_slow_factor * 2) == 0
-            else:
-                return self.tick_count % self.tick_slow_factor == 0
+        # A bot that wasn't ticked every tick gets all of the turns that it would have had since it was last ticked
+        self.turns = 0
+        for i in range(self.tick_interval):
+            self.tick_count += 1
+
+            if Event.EFFECT_FREEZE_ENEMIES in self.world.effects:
+                continue
+            elif Event.EFFECT_SLOW_ENEMIES in self.world.effects:
+                if self.tick_count % (self.tick_slow_factor * 2) == 0:
+                    self.turns += 1
+            elif self.tick_count % self.tick_slow_factor == 0:
+                self.turns += 1
+
+        return self.turns > 0
+
+    def plan_tick(self):
+
+        # Batchable bots work out the move that they want to make this tick and return its vector or
+        # None if they have nothing to do.  Once the move has been made complete_tick() gets called.
+        if AIBot.tick(self) is False:
+            return None
+
+        return self.plan_move()
+
+    def plan_move(self):
+
+        # Work out the move for one of the bot's turns
+        return None
+
+    def complete_tick(self):
+        pass
+
+    def take_turns(self):
+
+        # Make a move for each of the bot's turns one after the other just as if it had been ticked for each of them
+        for turn in range(self.turns):
+            vector = self.plan_move()
+            if vector is not None:
+                self.move(vector)
+                self.complete_tick()
 
     def reset(self):
         self.tick_count = 0
         self.world.move_object_to_xyz(self.target_object, self.initial_xyz)
 
+    def move(self, vector):
+
+        # Bots that move one axis at a time move in x and then in y
+        if self.move_by_axis is True:
+            dx, dy, dz = vector
+            if dx != 0:
+                self.world.move_object(self.target_object, (dx, 0, 0))
+            if dy != 0:
+                self.world.move_object(self.target_object, (0, dy, 0))
+        else:
+            self.world.move_object(self.target_object, vector)
+
     def distance_from_target(self, to_object: RPGObject3D):
 
         fz = self.target_object.z
@@ -1851,6 +3676,10 @@ class AIBotInstructions(AIBot):
 
         super(AIBotInstructions, self).__init__(str(__class__), target_object, world, tick_slow_factor)
 
+        # Instructions are timed so they have to be followed every tick
+        self.schedulable = False
+        self.batchable = True
+
         self.instructions = []
         self.current_instruction_id = 0
         self.current_instruction_ticks = 0
@@ -1873,8 +3702,26 @@ class AIBotInstructions(AIBot):
 
     def tick(self):
 
-        if super(AIBotInstructions, self).tick() is False:
-            return
+        if super(AIBotInstructions, self).tick() is True:
+            self.take_turns()
+
+    def plan_move(self):
+
+        if self.current_instruction_id < len(self.instructions) and self.current_instruction_id >= 0:
+
+            action, ticks, action_on_fail = self.instructions[self.current_instruction_id]
+
+            # If no action then we don't go anywhere
+            if action is None:
+                return World3D.DUMMY
+            else:
+                return action
+
+        else:
+            return None
+            # print("current instruction id {0} not in range".format(self.current_instruction_id))
+
+    def complete_tick(self):
 
         if self.current_instruction_id < len(self.instructions) and self.current_instruction_id >= 0:
 
@@ -1887,7 +3734,6 @@ class AIBotInstructions(AIBot):
                 if action_on_fail not in AIBot.INSTRUCTION_FAIL_VALID_OPTIONS:
                     action_on_fail = AIBot.INSTRUCTION_FAIL_TICK
 
-                self.world.move_object(self.target_object, action)
                 success = self.target_object.has_moved()
 
             # If no action then success is always true
@@ -1911,10 +3757,6 @@ class AIBotInstructions(AIBot):
                 elif action_on_fail == AIBot.INSTRUCTION_FAIL_SKIP:
                     self.next_instruction()
 
-        else:
-            pass
-            # print("current instruction id {0} not in range".format(self.current_instruction_id))
-
     def next_instruction(self):
 
         self.current_instruction_id += 1
@@ -1940,6 +3782,10 @@ class AIBotRouteFollowing(AIBot):
         self.current_instruction_id = 0
         self.failed_ticks = 0
         self.failed_ticks_limit = 10
+        self.use_path_finding = False
+        self.batchable = True
+        self.move_by_axis = True
+        self.planned_from_xyz = None
 
     def __str__(self):
 
@@ -1950,7 +3796,9 @@ class AIBotRouteFollowing(AIBot):
                                                                                         str(self.target_object.xyz))
         return text
 
-    def set_instructions(self, new_instructions: list, loop: bool = True):
+    def set_instructions(self, new_instructions: list, loop: bool = True, use_path_finding: bool = False):
+
+        self.use_path_finding = use_path_finding
 
         if new_instructions is None:
             return
@@ -1961,46 +3809,115 @@ class AIBotRouteFollowing(AIBot):
 
     def tick(self):
 
-        if super(AIBotRouteFollowing, self).tick() is False:
-            return
+        if super(AIBotRouteFollowing, self).tick() is True:
+            self.take_turns()
+
+    def plan_move(self):
 
         current_way_point = self.way_points[self.current_instruction_id]
         cx, cy, cz = current_way_point
-        x = self.target_object.rect.centerx
-        y = self.target_object.rect.centery
         z = self.target_object.z
 
         if self.target_object.contains_point(current_way_point) is True:
             self.next_instruction()
 
-        if cz == z:
-            if cx != x:
-                if cx < x:
-                    action = World3D.WEST
-                elif cx > x:
-                    action = World3D.EAST
-                self.world.move_object(self.target_object, action)
-                m1 = self.target_object.has_moved()
-            else:
-                m1 = False
-
-            if cy != y:
-                if cy < y:
-                    action = World3D.DOWN
-                elif cy > y:
-                    action = World3D.UP
-                self.world.move_object(self.target_object, action)
-                m2 = self.target_object.has_moved()
-            else:
-                m2 = False
+        if cz != z:
+            return None
 
-            if (m1 or m2) is True:
-                self.failed_ticks = 0
-            else:
-                self.failed_ticks += 1
-                if self.failed_ticks > self.failed_ticks_limit:
-                    #self.closest_waypoint()
-                    self.next_instruction()
+        if self.use_path_finding is True:
+            point = self.get_path_step(current_way_point)
+        else:
+            point = current_way_point
+
+        self.planned_from_xyz = self.target_object.xyz
+
+        return self.get_vector_towards(point)
+
+    def complete_tick(self):
+
+        if self.target_object.xyz != self.planned_from_xyz:
+            self.failed_ticks = 0
+        else:
+            self.failed_ticks += 1
+            if self.failed_ticks > self.failed_ticks_limit:
+                #self.closest_waypoint()
+                self.next_instruction()
+
+    def get_vector_towards(self, point: tuple):
+
+        # Which way do we need to go in x and y to get to the point?
+        cx, cy, cz = point
+        x = self.target_object.rect.centerx
+        y = self.target_object.rect.centery
+
+        dx = 0
+        if cx < x:
+            dx = -1
+        elif cx > x:
+            dx = 1
+
+        dy = 0
+        if cy < y:
+            dy = -1
+        elif cy > y:
+            dy = 1
+
+        return (dx, dy, 0)
+
+    def move_towards(self, point: tuple):
+
+        cx, cy, cz = point
+        x = self.target_object.rect.centerx
+        y = self.target_object.rect.centery
+
+        if cx != x:
+            if cx < x:
+                action = World3D.WEST
+            elif cx > x:
+                action = World3D.EAST
+            self.move(action)
+            m1 = self.target_object.has_moved()
+        else:
+            m1 = False
+
+        if cy != y:
+            if cy < y:
+                action = World3D.DOWN
+            elif cy > y:
+                action = World3D.UP
+            self.move(action)
+            m2 = self.target_object.has_moved()
+        else:
+            m2 = False
+
+        return (m1 or m2)
+
+    def follow_path(self, point: tuple, turns: int = 1):
+
+        # Work out the way to the point once and then take a step along it for each turn
+        step = self.get_path_step(point)
+
+        moved = False
+        for turn in range(turns):
+            moved = self.move_towards(step)
+            if moved is False:
+                break
+
+        return moved
+
+    def get_path_step(self, point: tuple):
+
+        # Ask the world's path finder for a way to the point and head for the centre of the next cell on it.
+        # If we are already in the last cell or there is no way there then just head straight for the point.
+        path_finder = self.world.path_finder
+        path = path_finder.find_path((self.target_object.rect.centerx,
+                                      self.target_object.rect.centery,
+                                      self.target_object.z), point)
+
+        if path is not None and len(path) > 1:
+            point = path_finder.get_cell_centre(path[1], self.target_object.z)
+
+        return point
 
     def next_instruction(self):
 
@@ -2041,6 +3958,7 @@ class AIBotTracker(AIBot):
         self.following_object = None
         self.failed_ticks = 0
         self.failed_ticks_limit = 10
+        self.use_flow_field = False
 
     def __str__(self):
 
@@ -2050,11 +3968,15 @@ class AIBotTracker(AIBot):
 
         return text
 
-    def set_instructions(self, new_target: RPGObject3D, loop: bool = True):
+    def set_instructions(self, new_target: RPGObject3D, loop: bool = True, use_flow_field: bool = None):
 
         self.following_object = new_target
         self.loop = loop
 
+        # Keep the current flow field setting if we are just being given a new target
+        if use_flow_field is not None:
+            self.use_flow_field = use_flow_field
+
     def tick(self):
 
         if super(AIBotTracker, self).tick() is False or \
@@ -2062,39 +3984,48 @@ class AIBotTracker(AIBot):
                 (self.following_object.name == Objects.PLAYER and Event.EFFECT_INVISIBLE in self.world.effects):
             return
 
-        cx = self.following_object.rect.centerx
-        cy = self.following_object.rect.centery
-        cz = self.following_object.z
+        for turn in range(self.turns):
 
-        x = self.target_object.rect.centerx
-        y = self.target_object.rect.centery
-        z = self.target_object.z
+            cx = self.following_object.rect.centerx
+            cy = self.following_object.rect.centery
+            cz = self.following_object.z
 
-        if cz == z:
-            if cx != x:
-                if cx < x:
-                    action = World3D.WEST
-                elif cx > x:
-                    action = World3D.EAST
-                self.world.move_object(self.target_object, action)
-                move_x = self.target_object.has_moved()
-            else:
-                move_x = False
-
-            if cy != y:
-                if cy < y:
-                    action = World3D.DOWN
-                elif cy > y:
-                    action = World3D.UP
-                self.world.move_object(self.target_object, action)
-                move_y = self.target_object.has_moved()
-            else:
-                move_y = False
+            x = self.target_object.rect.centerx
+            y = self.target_object.rect.centery
+            z = self.target_object.z
 
-            if (move_x or move_y) is True:
-                self.failed_ticks = 0
-            else:
-                self.failed_ticks += 1
+            if cz == z:
+
+                # Head for the next cell on the way to the target rather than straight at it
+                if self.use_flow_field is True:
+                    step = self.world.path_finder.get_flow_step((x, y, z), (cx, cy, cz))
+                    if step is not None:
+                        cx, cy, cz = step
+
+                if cx != x:
+                    if cx < x:
+                        action = World3D.WEST
+                    elif cx > x:
+                        action = World3D.EAST
+                    self.move(action)
+                    move_x = self.target_object.has_moved()
+                else:
+                    move_x = False
+
+                if cy != y:
+                    if cy < y:
+                        action = World3D.DOWN
+                    elif cy > y:
+                        action = World3D.UP
+                    self.move(action)
+                    move_y = self.target_object.has_moved()
+                else:
+                    move_y = False
+
+                if (move_x or move_y) is True:
+                    self.failed_ticks = 0
+                else:
+                    self.failed_ticks += 1
 
         return self.failed_ticks > self.failed_ticks_limit
 
@@ -2113,6 +4044,7 @@ class AIBotTracker2(AIBot):
         self.navigator = Navigator()
         self.failed_ticks = 0
         self.failed_ticks_limit = 10
+        self.use_flow_field = False
 
     def __str__(self):
 
@@ -2122,12 +4054,17 @@ class AIBotTracker2(AIBot):
 
         return text
 
-    def set_instructions(self, new_target: RPGObject3D, sight_range: int = 100, loop: bool = True):
+    def set_instructions(self, new_target: RPGObject3D, sight_range: int = 100, loop: bool = True,
+                         use_flow_field: bool = None):
 
         self.following_object = new_target
         self.sight_range = sight_range
         self.loop = loop
 
+        # Keep the current flow field setting if we are just being given a new target
+        if use_flow_field is not None:
+            self.use_flow_field = use_flow_field
+
     def tick(self):
 
         success = False
@@ -2157,36 +4094,45 @@ class AIBotTracker2(AIBot):
                               self.navigator.navigate2(world=self.world, from_object=self.target_object,
                                                       to_object=self.following_object) is True
 
-            # If we can see it....
+            # If we can see it....  Looking for the target is the slow part so a bot that has missed some
+            # ticks only looks once and then takes each of its turns heading for the target
             if target_in_sight is True:
 
-                cx = self.following_object.rect.centerx
-                cy = self.following_object.rect.centery
-
-                x = self.target_object.rect.centerx
-                y = self.target_object.rect.centery
-
-                # Try and track the target's X position
-                if cx != x:
-                    if cx < x:
-                        action = World3D.WEST
-                    elif cx > x:
-                        action = World3D.EAST
-                    self.world.move_object(self.target_object, action)
-                    move_x = self.target_object.has_moved()
-                else:
-                    move_x = False
-
-                # Try and track the target's Y position
-                if cy != y:
-                    if cy < y:
-                        action = World3D.DOWN
-                    elif cy > y:
-                        action = World3D.UP
-                    self.world.move_object(self.target_object, action)
-                    move_y = self.target_object.has_moved()
-                else:
-                    move_y = False
+                for turn in range(self.turns):
+
+                    cx = self.following_object.rect.centerx
+                    cy = self.following_object.rect.centery
+
+                    x = self.target_object.rect.centerx
+                    y = self.target_object.rect.centery
+
+                    # Head for the next cell on the way to the target rather than straight at it
+                    if self.use_flow_field is True:
+                        step = self.world.path_finder.get_flow_step((x, y, z), (cx, cy, cz))
+                        if step is not None:
+                            cx, cy, cz = step
+
+                    # Try and track the target's X position
+                    if cx != x:
+                        if cx < x:
+                            action = World3D.WEST
+                        elif cx > x:
+                            action = World3D.EAST
+                        self.move(action)
+                        move_x = self.target_object.has_moved()
+                    else:
+                        move_x = False
+
+                    # Try and track the target's Y position
+                    if cy != y:
+                        if cy < y:
+                            action = World3D.DOWN
+                        elif cy > y:
+                            action = World3D.UP
+                        self.move(action)
+                        move_y = self.target_object.has_moved()
+                    else:
+                        move_y = False
 
                 # If we moved and are still in sight of the target then all good
                 success = (move_x or move_y or target_in_sight)
@@ -2204,6 +4150,7 @@ class AIBotTracker2(AIBot):
 class AIBotHunter(AIBot):
     MODE_HUNTING = "hunting"
     MODE_TRACKING = "tracking"
+    MODE_CHASING = "chasing"
 
     def __init__(self, target_object: RPGObject3D, world: World3D, tick_slow_factor: int = 1):
 
@@ -2211,6 +4158,8 @@ class AIBotHunter(AIBot):
 
         self.following_object = None
         self.visibility_distance = None
+        self.use_path_finding = False
+        self.last_seen_xyz = None
 
         self.tracker = AIBotTracker2(target_object=target_object, world=world, tick_slow_factor=tick_slow_factor)
         self.router = AIBotRouteFollowing(target_object=target_object, world=world, tick_slow_factor=tick_slow_factor)
@@ -2224,6 +4173,8 @@ class AIBotHunter(AIBot):
 
         if self.mode == AIBotHunter.MODE_HUNTING:
             text += "\n" + str(self.tracker)
+        elif self.mode == AIBotHunter.MODE_CHASING:
+            text += "\nChasing to where the target was last seen at {0}".format(str(self.last_seen_xyz))
         else:
             text += "\n" + str(self.router)
 
@@ -2234,19 +4185,28 @@ class AIBotHunter(AIBot):
         self.router.debug(debug_on)
 
     def set_instructions(self, new_target: RPGObject3D = None, distance: float = 200, route: list = None,
-                         loop: bool = True):
+                         loop: bool = True, use_path_finding: bool = None):
+
+        # Keep the current path finding setting if we are just being given a new target
+        if use_path_finding is not None:
+            self.use_path_finding = use_path_finding
 
         self.visibility_distance = distance
         self.following_object = new_target
-        self.tracker.set_instructions(new_target=new_target, sight_range=distance)
+        self.tracker.set_instructions(new_target=new_target, sight_range=distance, use_flow_field=self.use_path_finding)
+        # The router only uses path finding to get to where the target was last seen and not on its patrol route
         self.router.set_instructions(new_instructions=route, loop=loop)
         self.mode = AIBotHunter.MODE_TRACKING
+        self.last_seen_xyz = None
 
     def tick(self):
 
         if super(AIBotHunter, self).tick() is False or self.following_object is None:
             return
 
+        # The tracker and the router get a tick for each of our turns
+        self.tracker.tick_interval = self.turns
+        self.router.tick_interval = self.turns
 
         cz = self.following_object.z
         z = self.target_object.z
@@ -2255,14 +4215,28 @@ class AIBotHunter(AIBot):
 
             if self.tracker.tick() is True:
                 self.mode = AIBotHunter.MODE_HUNTING
+                self.last_seen_xyz = (self.following_object.rect.centerx, self.following_object.rect.centery, cz)
             else:
-                if self.mode == AIBotHunter.MODE_HUNTING:
-                    self.router.closest_waypoint()
-                self.router.tick()
-                self.mode = AIBotHunter.MODE_TRACKING
+                # If we lost sight of the target then go to where we last saw it before going back to our route
+                if self.mode == AIBotHunter.MODE_HUNTING and self.use_path_finding is True:
+                    self.mode = AIBotHunter.MODE_CHASING
+
+                if self.mode == AIBotHunter.MODE_CHASING:
+                    if self.target_object.contains_point(self.last_seen_xyz) is True or \
+                            self.router.follow_path(self.last_seen_xyz, self.turns) is False:
+                        self.router.closest_waypoint()
+                        self.mode = AIBotHunter.MODE_TRACKING
+                else:
+                    if self.mode == AIBotHunter.MODE_HUNTING:
+                        self.router.closest_waypoint()
+                    self.router.tick()
+                    self.mode = AIBotHunter.MODE_TRACKING
 
     def reset(self):
         super(AIBotHunter, self).reset()
+        if self.mode == AIBotHunter.MODE_CHASING:
+            self.mode = AIBotHunter.MODE_TRACKING
+        self.last_seen_xyz = None
 
 
 class AIBotRandom(AIBot):
@@ -2278,6 +4252,7 @@ class AIBotRandom(AIBot):
         self.min_duration = 5
         self.max_duration = 10
         self.action_on_fail = AIBotRandom.INSTRUCTION_FAIL_SKIP
+        self.batchable = True
 
     def __str__(self):
 
@@ -2294,13 +4269,21 @@ class AIBotRandom(AIBot):
 
     def tick(self):
 
-        if super(AIBotRandom, self).tick() is False:
-            return
+        if super(AIBotRandom, self).tick() is True:
+            self.take_turns()
+
+    def plan_move(self):
+
+        # If no action then we don't go anywhere
+        if self.current_instruction is None:
+            return World3D.DUMMY
+        else:
+            return self.current_instruction
+
+    def complete_tick(self):
 
         # If the instruction requires an action...
         if self.current_instruction is not None:
-
-            self.world.move_object(self.target_object, self.current_instruction)
             success = self.target_object.has_moved()
 
         # If no action then success is always true
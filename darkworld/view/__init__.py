@@ -1 +1,3 @@
-from .view import DWMainFrame
\ No newline at end of file
+from .view import DWMainFrame
+from .view import DWWorldView
+from .view import ModelToView3D
\ No newline at end of file
@@ -6,18 +6,38 @@ import numpy as np
 import math
 import logging
 from darkworld.model.events import *
-from collections import deque
+from collections import deque, OrderedDict
+from darkworld.instrumentation import instrumentation
 
 
 class ImageManager:
     DEFAULT_SKIN = "default"
-    RESOURCES_DIR = os.path.dirname(__file__) + "\\resources\\"
+    RESOURCES_DIR = os.path.join(os.path.dirname(__file__), "resources", "")
+
+    # How many scaled images to keep
+    SCALED_CACHE_SIZE = 1500
 
     image_cache = {}
     skins = {}
     sprite_sheets = {}
     initialised = False
 
+    # Sprite sheets that have been loaded keyed by file name and images that could not be found
+    sheet_cache = {}
+    missing_images = set()
+
+    # Images that have been converted to the display's pixel format
+    converted_images = set()
+
+    # Tiles that are animated in each skin
+    animated_tiles = {}
+
+    # Least recently used scaled images are at the start of the cache
+    scaled_cache = OrderedDict()
+    scaled_hits = 0
+    scaled_misses = 0
+    scaled_evictions = 0
+
     def __init__(self):
         pass
 
@@ -37,14 +57,16 @@ class ImageManager:
                 filename = ImageManager.RESOURCES_DIR + file_name
                 logging.info("Loading image {0} from {1} at {2}...".format(image_file_name, filename, rect))
 
-                image_sheet = spritesheet(filename)
+                image_sheet = self.get_sheet(file_name)
                 original_image = image_sheet.image_at(rect)
             else:
                 filename = ImageManager.RESOURCES_DIR + image_file_name
                 logging.info("Loading image {0}...".format(filename))
-                image_sheet = spritesheet(filename)
+                image_sheet = self.get_sheet(image_file_name)
                 original_image = image_sheet.image_at()
 
+            original_image = self.convert_image(image_file_name, original_image)
+
             try:
 
                 image = pygame.transform.scale(original_image, (width, height))
@@ -64,6 +86,170 @@ class ImageManager:
 
         return self.image_cache[image_file_name]
 
+    def convert_image(self, image_file_name: str, image):
+
+        # We can't convert images to the display's pixel format until there is a display
+        if pygame.display.get_surface() is None:
+            return image
+
+        # Sprites with see through pixels blit fastest with per-pixel alpha.
+        # Solid tiles don't need their colour key so convert them and use surface alpha for fading them out.
+        width, height = image.get_size()
+        if image.get_colorkey() is not None and pygame.mask.from_surface(image).count() < width * height:
+            converted_image = image.convert_alpha()
+        else:
+            converted_image = image.convert()
+            converted_image.set_colorkey(None)
+
+        ImageManager.converted_images.add(image_file_name)
+
+        return converted_image
+
+    def convert_images(self):
+
+        # Convert any images that were loaded before the display was created
+        if pygame.display.get_surface() is None:
+            return 0
+
+        convert_count = 0
+        for image_file_name, image in ImageManager.image_cache.items():
+            if image_file_name not in ImageManager.converted_images:
+                ImageManager.image_cache[image_file_name] = self.convert_image(image_file_name, image)
+                convert_count += 1
+
+        # Throw away anything that was scaled from an image before it was converted
+        if convert_count > 0:
+            self.clear_scaled_cache()
+
+        return convert_count
+
+    def get_sheet(self, file_name: str):
+
+        # Only load each sheet from disk once however many images are cut out of it
+        if file_name not in ImageManager.sheet_cache.keys():
+            ImageManager.sheet_cache[file_name] = spritesheet(ImageManager.RESOURCES_DIR + file_name)
+
+        return ImageManager.sheet_cache[file_name]
+
+    def clear_sheet_cache(self):
+        ImageManager.sheet_cache.clear()
+
+    def build_atlas(self):
+
+        # Group the sprites by the sheet that they are on
+        sheets = {}
+        for image_file_name, (file_name, rect) in self.sprite_sheets.items():
+            if image_file_name not in ImageManager.image_cache.keys():
+                if file_name not in sheets.keys():
+                    sheets[file_name] = []
+                sheets[file_name].append((image_file_name, rect))
+
+        # Load each sheet once and cut out all of its sprites in one go
+        image_count = 0
+        for file_name, sprites in sheets.items():
+            try:
+                image_sheet = self.get_sheet(file_name)
+            except Exception as err:
+                print("Can't build atlas for sheet {0}: {1}".format(file_name, err))
+                ImageManager.missing_images.update([image_file_name for image_file_name, rect in sprites])
+                continue
+
+            for image_file_name, rect in sprites:
+                ImageManager.image_cache[image_file_name] = self.convert_image(image_file_name,
+                                                                               image_sheet.image_at(rect))
+                image_count += 1
+
+        logging.info("Built atlas of {0} images from {1} sheets".format(image_count, len(sheets)))
+
+        return image_count
+
+    def prewarm_skin(self, skin_name: str = DEFAULT_SKIN):
+
+        if skin_name not in ImageManager.skins.keys():
+            raise Exception("Can't find specified skin {0}".format(skin_name))
+
+        tile_map = self.get_tile_map(skin_name)
+
+        image_file_names = set()
+        for tile_file_names in tile_map.values():
+            if isinstance(tile_file_names, tuple):
+                image_file_names.update(tile_file_names)
+            elif tile_file_names is not None:
+                image_file_names.add(tile_file_names)
+
+        # Load every image that the skin uses so that nothing gets loaded mid game
+        loaded_count = 0
+        for image_file_name in sorted(image_file_names):
+            if image_file_name in ImageManager.image_cache.keys():
+                continue
+            if image_file_name in ImageManager.missing_images:
+                continue
+            try:
+                self.get_image(image_file_name)
+                loaded_count += 1
+            except Exception as err:
+                print("Can't prewarm image {0} for skin {1}: {2}".format(image_file_name, skin_name, err))
+                ImageManager.missing_images.add(image_file_name)
+
+        return loaded_count
+
+    def get_scaled_image(self, image_file_name: str, width: int, height: int, alpha: int = None):
+
+        # Scale to exactly the size asked for as that is the size that callers place the image with
+        width = int(width)
+        height = int(height)
+
+        key = (image_file_name, width, height)
+        scaled_cache = ImageManager.scaled_cache
+
+        image = scaled_cache.get(key)
+        if image is not None:
+            ImageManager.scaled_hits += 1
+            scaled_cache.move_to_end(key)
+        else:
+            ImageManager.scaled_misses += 1
+            image = pygame.transform.scale(self.get_image(image_file_name), (width, height))
+            scaled_cache[key] = image
+
+            # Sizes that are no longer being drawn e.g. from before the view was zoomed drop off the end
+            while len(scaled_cache) > ImageManager.SCALED_CACHE_SIZE:
+                scaled_cache.popitem(last=False)
+                ImageManager.scaled_evictions += 1
+
+        # Scaled images are shared so always set the alpha that the caller wants
+        image.set_alpha(alpha)
+
+        return image
+
+    def get_scaled_cache_stats(self):
+
+        lookups = ImageManager.scaled_hits + ImageManager.scaled_misses
+        if lookups > 0:
+            hit_rate = ImageManager.scaled_hits / lookups
+        else:
+            hit_rate = 0.0
+
+        return {"size": len(ImageManager.scaled_cache),
+                "max_size": ImageManager.SCALED_CACHE_SIZE,
+                "hits": ImageManager.scaled_hits,
+                "misses": ImageManager.scaled_misses,
+                "evictions": ImageManager.scaled_evictions,
+                "hit_rate": hit_rate}
+
+    def clear_scaled_cache(self):
+        ImageManager.scaled_cache.clear()
+        ImageManager.scaled_hits = 0
+        ImageManager.scaled_misses = 0
+        ImageManager.scaled_evictions = 0
+
+    def print(self):
+        stats = self.get_scaled_cache_stats()
+        print("Image Manager: {0} images, {1}/{2} scaled images, {3} hits, {4} misses, {5} evictions, "
+              "hit rate {6:.1%}".format(len(ImageManager.image_cache), stats["size"], stats["max_size"], stats["hits"],
+                                        stats["misses"], stats["evictions"], stats["hit_rate"]))
+        print("Image Manager: {0} sheets loaded, missing images {1}".format(len(ImageManager.sheet_cache),
+                                                                             sorted(ImageManager.missing_images)))
+
     def load_skins(self):
 
         new_skin_name = ImageManager.DEFAULT_SKIN
@@ -352,6 +538,46 @@ class ImageManager:
 
     def get_skin_image(self, tile_name: str, skin_name: str = DEFAULT_SKIN, tick=0, width: int = 32, height: int = 32):
 
+        tile_file_name = self.get_skin_file_name(tile_name, skin_name, tick)
+
+        if tile_file_name is None:
+            return None
+
+        return self.get_image(image_file_name=tile_file_name, width=width, height=height)
+
+    def get_scaled_skin_image(self, tile_name: str, width: int, height: int, skin_name: str = DEFAULT_SKIN, tick=0,
+                              alpha: int = None):
+
+        tile_file_name = self.get_skin_file_name(tile_name, skin_name, tick)
+
+        # Nothing to draw if the skin doesn't have an image or we already know that it can't be loaded
+        if tile_file_name is None or tile_file_name in ImageManager.missing_images:
+            return None
+
+        return self.get_scaled_image(tile_file_name, width, height, alpha)
+
+    def get_tile_map(self, skin_name: str = DEFAULT_SKIN):
+
+        # Skins fall back to the default skin for any tiles that they don't have
+        name, tile_map = ImageManager.skins[ImageManager.DEFAULT_SKIN]
+        tile_map = dict(tile_map)
+        name, skin_tile_map = ImageManager.skins[skin_name]
+        tile_map.update(skin_tile_map)
+
+        return tile_map
+
+    def get_animated_tiles(self, skin_name: str = DEFAULT_SKIN):
+
+        # Tiles that have more than one image to choose from
+        if skin_name not in ImageManager.animated_tiles.keys():
+            tile_map = self.get_tile_map(skin_name)
+            ImageManager.animated_tiles[skin_name] = set([tile_name for tile_name, tile_file_names in tile_map.items()
+                                                          if isinstance(tile_file_names, tuple)])
+
+        return ImageManager.animated_tiles[skin_name]
+
+    def get_skin_file_name(self, tile_name: str, skin_name: str = DEFAULT_SKIN, tick=0):
+
         if skin_name not in ImageManager.skins.keys():
             raise Exception("Can't find specified skin {0}".format(skin_name))
 
@@ -364,22 +590,16 @@ class ImageManager:
 
         tile_file_names = tile_map[tile_name]
 
-        image = None
-
-        if tile_file_names is None:
-            image = None
-        elif isinstance(tile_file_names, tuple):
+        # Pick the file for this frame of the tile's animation
+        if isinstance(tile_file_names, tuple):
             if tick == 0:
                 tile_file_name = tile_file_names[0]
             else:
                 tile_file_name = tile_file_names[tick % len(tile_file_names)]
-
-            image = self.get_image(image_file_name=tile_file_name, width=width, height=height)
-
         else:
-            image = self.get_image(tile_file_names, width=width, height=height)
+            tile_file_name = tile_file_names
 
-        return image
+        return tile_file_name
 
     def load_sprite_sheets(self):
 
@@ -494,7 +714,9 @@ class View():
             self._debug = debug_on
 
     def process_event(self, new_event: model.Event):
-        print("Default View Class event process:{0}".format(new_event))
+
+        if self._debug is True:
+            print("Default View Class event process:{0}".format(new_event))
 
         if new_event.type == Event.DEBUG:
             self.debug()
@@ -504,10 +726,14 @@ class View():
 
 
 class DWMainFrame(View):
-    RESOURCES_DIR = os.path.dirname(__file__) + "\\resources\\"
+    RESOURCES_DIR = os.path.join(os.path.dirname(__file__), "resources", "")
 
     TRANSPARENT = (0, 255, 0)
 
+    # Only push the parts of the display that have changed to the screen
+    DIRTY_RECTS = True
+    MAX_DIRTY_RECTS = 32
+
     def __init__(self, model: model.DWModel):
 
         super().__init__()
@@ -529,6 +755,14 @@ class DWMainFrame(View):
         self.world_complete_view = DWWorldCompleteView(self.model)
         self.game_loaded_view = DWWorldGameLoaded(self.model)
 
+        # The parts of the display that changed in the last frame
+        self.dirty_rects = []
+        self.frame_parts = {}
+        self.last_frame_parts = {}
+        self.full_update = True
+        self.update_count = 0
+        self.skipped_update_count = 0
+
     def initialise(self):
 
         super().initialise()
@@ -550,6 +784,11 @@ class DWMainFrame(View):
         except Exception as err:
             print(str(err))
 
+        # Load all of the images that we are going to need before we start playing in the display's pixel format
+        View.image_manager.convert_images()
+        View.image_manager.build_atlas()
+        View.image_manager.prewarm_skin(self.model.get_skin_name())
+
         self.world_view.initialise()
         self.inventory_view.initialise()
         self.text_box.initialise()
@@ -559,6 +798,9 @@ class DWMainFrame(View):
     def print(self):
 
         print("Printing Dark Work view...")
+        print("Display updates: {0} frames, {1} skipped, {2} dirty rects last frame".format(self.update_count,
+                                                                                           self.skipped_update_count,
+                                                                                           len(self.dirty_rects)))
         self.world_view.print()
         self.inventory_view.print()
         self.text_box.print()
@@ -575,12 +817,16 @@ class DWMainFrame(View):
 
         pane_rect = self.surface.get_rect()
 
+        # What each part of the frame looks like and where it was drawn
+        self.frame_parts = {}
+
         x = 0
         y = 0
 
         # Draw the main view of the world
         self.world_view.draw()
         self.surface.blit(self.world_view.surface, (x, y))
+        self.dirty_rects = [rect.move(x, y) for rect in self.world_view.dirty_rects]
 
         x = self.world_view.width - self.inventory_view.width - 4
         y = 4
@@ -588,16 +834,28 @@ class DWMainFrame(View):
         # If the Inventory view is active then draw it
         if self.model.state == model.DWModel.STATE_PLAYING and self.inventory_view.is_visible is True:
             self.inventory_view.draw()
-            self.surface.blit(self.inventory_view.surface, (x, y))
+            inventory_rect = self.surface.blit(self.inventory_view.surface, (x, y))
+            self.add_frame_part("inventory", inventory_rect,
+                                (tuple(self.model.inventory.items()), self.inventory_view.skin))
 
         # Draw the number of remaining lives
         img = View.image_manager.get_skin_image(tile_name=model.Objects.PLAYER, width=32, height=32)
-        img = pygame.transform.scale(img, (int(img.get_rect().width / 2), int(img.get_rect().height / 2)))
+        img = View.image_manager.get_scaled_skin_image(tile_name=model.Objects.PLAYER,
+                                                       width=int(img.get_rect().width / 2),
+                                                       height=int(img.get_rect().height / 2))
         for i in range(0, self.model.player_lives):
-            self.surface.blit(img, (i * 32 + 8, self.world_view.surface.get_rect().height - 32))
+            lives_rect = self.surface.blit(img, (i * 32 + 8, self.world_view.surface.get_rect().height - 32))
+            self.add_frame_part("lives", lives_rect, (self.model.player_lives, img))
 
         # Draw the game state if we are not playing
         if self.model.state != model.DWModel.STATE_PLAYING:
+
+            # The text can spill out of the boxes but it only changes when the state or world does
+            if self.model.world is not None:
+                self.add_frame_part("state", pane_rect, (self.model.state, self.model.world.name))
+            else:
+                self.add_frame_part("state", pane_rect, (self.model.state, None))
+
             msg_box_width = 200
             msg_box_height = 64
             msg_rect = pygame.Rect((self.world_view.width - msg_box_width) / 2,
@@ -654,12 +912,14 @@ class DWMainFrame(View):
                 view_rect = self.world_complete_view.surface.get_rect()
                 view_rect.center = pane_rect.center
                 self.surface.blit(self.world_complete_view.surface, view_rect)
+                self.add_frame_part("world complete", view_rect, self.world_complete_view.tick_count)
 
             elif self.model.state == model.DWModel.STATE_LOADED:
                 self.game_loaded_view.draw()
                 view_rect = self.game_loaded_view.surface.get_rect()
                 view_rect.center = pane_rect.center
                 self.surface.blit(self.game_loaded_view.surface, view_rect)
+                self.add_frame_part("game loaded", view_rect, self.game_loaded_view.tick_count)
 
         # If the text box is active then draw it
         if self.text_box.is_visible is True:
@@ -677,8 +937,61 @@ class DWMainFrame(View):
 
             self.surface.blit(self.text_box.surface, text_rect)
 
+            # Fading text changes every tick
+            if self.text_box.fade_out == DWTextBox.FADE_OFF:
+                self.add_frame_part("text", text_rect, (self.text_box.model, self.text_box.fade_out))
+            else:
+                self.add_frame_part("text", text_rect, (self.text_box.model, self.text_box.fade_out,
+                                                        self.text_box.tick_count, self.text_box.timer))
+
+        self.find_dirty_rects()
+
+    def add_frame_part(self, name: str, rect, contents):
+
+        # Parts that are drawn more than once e.g. the lives cover all of the places that they were drawn
+        if name in self.frame_parts.keys():
+            old_rect, old_contents = self.frame_parts[name]
+            rect = old_rect.union(rect)
+
+        self.frame_parts[name] = (pygame.Rect(rect), contents)
+
+    def find_dirty_rects(self):
+
+        # Any part that has appeared, disappeared, moved or changed needs redrawing where it was and where it is
+        for name in set(self.frame_parts.keys()) | set(self.last_frame_parts.keys()):
+            old_part = self.last_frame_parts.get(name)
+            new_part = self.frame_parts.get(name)
+            if old_part != new_part:
+                if old_part is not None:
+                    self.dirty_rects.append(old_part[0])
+                if new_part is not None:
+                    self.dirty_rects.append(new_part[0])
+
+        self.last_frame_parts = self.frame_parts
+
+    def redraw(self):
+        # Push the whole display next time e.g. when the window has been uncovered
+        self.full_update = True
+
     def update(self):
-        pygame.display.update()
+
+        self.update_count += 1
+
+        if DWMainFrame.DIRTY_RECTS is False or self.full_update is True:
+            pygame.display.update()
+            self.full_update = False
+
+        # Nothing has changed since the last update so there is nothing to do
+        elif len(self.dirty_rects) == 0:
+            self.skipped_update_count += 1
+
+        # Push one rectangle around everything if there are lots of small changes
+        elif len(self.dirty_rects) > DWMainFrame.MAX_DIRTY_RECTS:
+            pygame.display.update(self.dirty_rects[0].unionall(self.dirty_rects[1:]))
+
+        else:
+            pygame.display.update(self.dirty_rects)
+
 
     def end(self):
         pygame.quit()
@@ -700,6 +1013,10 @@ class DWMainFrame(View):
         self.world_view.process_event(new_event)
         self.text_box.process_event(new_event)
 
+        # Load the images for the new world's skin
+        if new_event.name == Event.NEW_WORLD:
+            View.image_manager.prewarm_skin(self.model.get_skin_name())
+
         if self.model.state == model.DWModel.STATE_LOADED:
             self.text_box.fade_out = DWTextBox.FADE_IN_OUT
         elif self.model.state == model.DWModel.STATE_PLAYING:
@@ -721,6 +1038,17 @@ class DWWorldView(View):
     MAX_ZOOM = 2.0
     MIN_ZOOM = 0.8
 
+    # How many instrumentation timings to show in debug mode
+    INSTRUMENTATION_LINES = 10
+
+    # Draw the objects in each plane that don't change from frame to frame into a cached layer
+    # and keep up to MAX_LAYER_PIXELS of layers.  Only build MAX_LAYER_BUILDS layers each frame and
+    # draw the planes whose layers aren't ready yet one object at a time.
+    CACHE_LAYERS = True
+    MAX_LAYER_PIXELS = 16 * 1024 * 1024
+    MAX_LAYER_BUILDS = 1
+    LAYER_SCALE_DIGITS = 6
+
     def __init__(self, model: model.DWModel, min_view_pos, max_view_pos, view_pos=None):
 
         super(DWWorldView, self).__init__()
@@ -760,6 +1088,23 @@ class DWWorldView(View):
         self.m2v = ModelToView3D(self.model)
         self.infinity = self.m2v.infinity
 
+        # Cache of the layers drawn for each plane with the least recently used layers at the start
+        self.layer_cache = OrderedDict()
+        self.layer_pixels = 0
+        self.plane_sizes = {}
+
+        # The keys of the layers whose objects overlap
+        self.faded_layers = set()
+        self.layer_world = None
+        self.layer_hits = 0
+        self.layer_misses = 0
+
+        # Parts of the view that changed in the last frame and what was drawn in the last frame to work them out
+        self.dirty_rects = []
+        self.frame_draws = []
+        self.last_draws = set()
+        self.last_layers = None
+
     def initialise(self):
 
         super(DWWorldView, self).initialise()
@@ -771,13 +1116,22 @@ class DWWorldView(View):
 
         print("Printing Dark Work Floor view...")
         print("View Pos = {0}\nPlayer pos = {1}".format(self.view_pos, self.model.world.player.xyz))
+        print("Layer cache: {0} layers, {1} pixels, {2} hits, {3} misses".format(len(self.layer_cache),
+                                                                                 self.layer_pixels,
+                                                                                 self.layer_hits,
+                                                                                 self.layer_misses))
+        View.image_manager.print()
 
     def draw(self):
 
         self.surface.fill(Colours.BLACK)
         #self.surface.fill((200,200,200))
 
+        self.frame_draws = []
+
         if self.model.world is None:
+            self.dirty_rects = [self.surface.get_rect()]
+            self.last_layers = None
             return
 
         # Get what skin we are using for the world that we are drawing
@@ -793,19 +1147,46 @@ class DWWorldView(View):
         # Set the view at the position and adjust vx,vy,vz accordingly
         vx,vy,vz = self.set_view((vx, vy, vz))
 
-        # Get the visible objects at this view point from the model
-        objs = self.m2v.get_object_list((vx, vy, vz),
-                                        self.width / self.object_zoom_ratio,
-                                        self.height / self.object_zoom_ratio,
-                                        self.depth)
+        # Let the bot scheduler know what is in view so that every bot that can be seen moves at its full rate
+        self.model.world.bot_scheduler.set_view_area((vx, vy, vz),
+                                                     (self.width / self.object_zoom_ratio + self.m2v.view_padding) / 2,
+                                                     (self.height / self.object_zoom_ratio + self.m2v.view_padding) / 2,
+                                                     self.depth)
+
+        if DWWorldView.CACHE_LAYERS is True:
+
+            # Get the layers that the objects that don't change in each plane have been drawn into...
+            layers, planes_without_layers = self.get_layers((vx, vy, vz), pz)
+
+            # ...and the visible objects that can change from frame to frame along with all of the objects
+            # in the planes whose layers aren't ready yet
+            objs = self.m2v.get_object_list((vx, vy, vz),
+                                            self.width / self.object_zoom_ratio,
+                                            self.height / self.object_zoom_ratio,
+                                            self.depth,
+                                            planes=self.get_dynamic_objects(vz, planes_without_layers))
+
+        else:
+
+            # Get the visible objects at this view point from the model
+            objs = self.m2v.get_object_list((vx, vy, vz),
+                                            self.width / self.object_zoom_ratio,
+                                            self.height / self.object_zoom_ratio,
+                                            self.depth)
+            layers = {}
 
         # Draw visible objects in reverse order by distance from the camera
-        distance = sorted(list(objs.keys()), reverse=True)
+        distance = sorted(set(objs.keys()) | set(layers.keys()), reverse=True)
 
         # For each plane away from the camera...
         for d in distance:
 
-            objs_at_d = objs[d]
+            # Draw the plane's layer first so that the objects that move are drawn on top of it
+            if d in layers.keys():
+                layer, layer_pos, faded = layers[d]
+                self.surface.blit(layer, layer_pos, special_flags=pygame.BLEND_PREMULTIPLIED if faded is True else 0)
+
+            objs_at_d = objs.get(d, ())
 
             # For each object found in that plane...
             for pos, obj in objs_at_d:
@@ -823,23 +1204,24 @@ class DWWorldView(View):
                 else:
                     tick_count = self.tick_count
 
-                # Get the image for the object based on the object's name
-                image = View.image_manager.get_skin_image(object_name,
-                                                          skin_name=self.skin,
-                                                          tick=tick_count)
+                # Scale the object based on the size of the object and how far away from the camera it is
+                # Size adjust = 1 on the plane that the player is currently on
+                size_adj = (1 - (d + self.camera_distance) / self.infinity) * self.object_zoom_ratio
+                size_w = int(obj.rect.width * size_adj)
+                size_h = int(obj.rect.height * size_adj)
+
+                # Get the scaled image for the object based on the object's name
+                image = View.image_manager.get_scaled_skin_image(object_name,
+                                                                 width=size_w,
+                                                                 height=size_h,
+                                                                 skin_name=self.skin,
+                                                                 tick=tick_count)
 
                 # If we got an image...
                 if image is not None:
                     # Get the object's position in the view
                     x, y, z = pos
 
-                    # Scale the object based on the size of the object and how far away from the camera it is
-                    # Size adjust = 1 on the plane that the player is currently on
-                    size_adj = (1 - (d + self.camera_distance) / self.infinity) * self.object_zoom_ratio
-                    size_w = int(obj.rect.width * size_adj)
-                    size_h = int(obj.rect.height * size_adj)
-                    image = pygame.transform.scale(image, (size_w, size_h))
-
                     # Change the image's transparency based on how far away from the player's plane it is
                     # Player's plane = opaque (alpha = 255)
                     # Between player and camera - increasing transparency the closer to the camera you get
@@ -867,7 +1249,7 @@ class DWWorldView(View):
                     # Blit the object image at the appropriate place and size
                     image_rect = pygame.Rect(int(x * self.object_zoom_ratio), int(y * self.object_zoom_ratio), size_w,
                                              size_h)
-                    self.surface.blit(image, image_rect)
+                    self.draw_image(image, image_rect)
 
                     # If we have drawn the player then check for special effects to draw these as well
                     if obj.name == model.Objects.PLAYER:
@@ -883,11 +1265,11 @@ class DWWorldView(View):
 
                         if effect_image_name is not None:
                             # Get the image for the object based on the object's name
-                            effect_image = View.image_manager.get_skin_image(effect_image_name,
-                                                                             skin_name=self.skin,
-                                                                             tick=tick_count)
-
-                            effect_image = pygame.transform.scale(effect_image, (size_w, size_h))
+                            effect_image = View.image_manager.get_scaled_skin_image(effect_image_name,
+                                                                                    width=size_w,
+                                                                                    height=size_h,
+                                                                                    skin_name=self.skin,
+                                                                                    tick=tick_count)
 
                             # Centre effect image vs. player image
                             effect_rect = effect_image.get_rect()
@@ -927,7 +1309,7 @@ class DWWorldView(View):
                                                          2)
 
                             # Centre effect image vs. player image
-                            self.surface.blit(effect_image, effect_rect)
+                            self.draw_image(effect_image, effect_rect)
 
         if self._debug is True:
 
@@ -944,6 +1326,17 @@ class DWWorldView(View):
                      font=pygame.font.SysFont(pygame.font.get_default_font(), 12),
                      bkg=Colours.DARK_GREY)
 
+            # Draw the timings of the hot paths if we are recording them
+            if instrumentation.enabled is True:
+                for i, msg in enumerate(instrumentation.get_summary(DWWorldView.INSTRUMENTATION_LINES)):
+                    text_rect = (0, 30 + i * 12, 300, 12)
+                    drawText(surface=self.surface,
+                             text=msg,
+                             color=Colours.GOLD,
+                             rect=text_rect,
+                             font=pygame.font.SysFont(pygame.font.get_default_font(), 12),
+                             bkg=Colours.DARK_GREY)
+
             n = model.Navigator()
             to_obj = self.model.player
             for bot in self.model.world.bots:
@@ -1001,6 +1394,272 @@ class DWWorldView(View):
         # draw_text(surface=self.surface, msg=msg, x=self.width / 2, y=20, size=32, fg_colour=Colours.WHITE,
         #           bg_colour=Colours.BLACK)
 
+        self.find_dirty_rects(layers)
+
+    def draw_image(self, image, rect):
+
+        # Draw an image of an object and remember what we drew where
+        drawn_rect = self.surface.blit(image, rect)
+        self.frame_draws.append((image, image.get_alpha(), tuple(drawn_rect)))
+
+    def find_dirty_rects(self, layers: dict):
+
+        # If the layers moved or changed then the whole view has changed...
+        layer_draws = tuple([(d, layer, layer_pos, layer.get_alpha())
+                             for d, (layer, layer_pos, faded) in sorted(layers.items())])
+        frame_draws = set(self.frame_draws)
+
+        if DWWorldView.CACHE_LAYERS is False or self._debug is True or layer_draws != self.last_layers:
+            self.dirty_rects = [self.surface.get_rect()]
+
+        # ...otherwise only the places where an object has been drawn differently to last time have changed
+        else:
+            self.dirty_rects = [pygame.Rect(drawn_rect) for image, alpha, drawn_rect in
+                                frame_draws.symmetric_difference(self.last_draws)]
+
+        self.last_layers = layer_draws
+        self.last_draws = frame_draws
+
+    def get_dynamic_names(self):
+
+        # Objects with these names change how they look from frame to frame
+        dynamic_names = set(View.image_manager.get_animated_tiles(self.skin))
+        dynamic_names.update(model.World3D.ENEMIES)
+        dynamic_names.add(model.Objects.PLAYER)
+
+        return dynamic_names
+
+    def get_dynamic_objects(self, vz, all_object_planes=()):
+
+        world = self.model.world
+        dynamic_names = self.get_dynamic_names()
+
+        # Collect the animated objects, enemies and switches in each visible plane using the world's indexes
+        # and every object in the planes that we were asked for
+        planes = {}
+        for z, names in world.plane_names.items():
+            if z < vz or z >= vz + self.depth:
+                continue
+            if z in all_object_planes:
+                planes[z] = dict.fromkeys(world.planes[z])
+                continue
+            objects = {}
+            for name, objects_with_name in names.items():
+                if name in dynamic_names:
+                    objects.update(objects_with_name)
+            objects.update(world.plane_properties[z]["is_switch"])
+            planes[z] = objects
+
+        # Add the objects that the bots are moving around
+        for bot in world.bots:
+            bot_object = bot.target_object
+            if bot_object.z in planes.keys():
+                planes[bot_object.z][bot_object] = None
+
+        # Make sure that the player gets drawn last in their plane
+        player = world.player
+        if player is not None and player.z in planes.keys():
+            planes[player.z].pop(player, None)
+            planes[player.z][player] = None
+
+        return planes
+
+    def get_layers(self, view_pos, pz):
+
+        world = self.model.world
+        vx, vy, vz = view_pos
+
+        # Layers from a different world are no use to us
+        if world is not self.layer_world:
+            self.clear_layers()
+            self.layer_world = world
+
+        layers = {}
+        planes_without_layers = []
+        builds = 0
+
+        for z in world.planes.keys():
+            if z < vz or z >= vz + self.depth:
+                continue
+
+            d = z - vz
+            position_adj, size_adj = self.get_layer_scales(d)
+
+            # Fade out the layer in the same way as the objects in it would be faded out
+            alpha = int(255 * (1 - min((abs(pz - d - vz) / self.depth, 1))))
+
+            # If we have already built enough layers this frame then leave this one until the next frame
+            key = self.get_layer_key(z, position_adj, size_adj)
+            key = (key, alpha if key in self.faded_layers else None)
+            if key not in self.layer_cache.keys():
+                if builds >= DWWorldView.MAX_LAYER_BUILDS:
+                    planes_without_layers.append(z)
+                    continue
+                builds += 1
+
+            layer = self.get_layer(key, z, position_adj, size_adj, alpha)
+            if layer is None:
+                continue
+
+            surface, (left, top), faded = layer
+
+            # Position the layer in the same way that the objects in it would be positioned
+            x = int(left + self.width / 2 - vx * position_adj)
+            y = int(top + self.height / 2 - vy * position_adj)
+
+            if faded is False:
+                surface.set_alpha(alpha, pygame.RLEACCEL)
+
+            layers[d] = (surface, (x, y), faded)
+
+        return layers, planes_without_layers
+
+    def get_layer_scales(self, d: int):
+
+        # Scale the positions and sizes of the objects in a plane in the same way as drawing them one at a time does
+        position_adj = (1 - d / self.m2v.infinity * (self.m2v.projection == ModelToView3D.PERSPECTIVE)) * \
+                       self.object_zoom_ratio
+        size_adj = (1 - (d + self.camera_distance) / self.infinity) * self.object_zoom_ratio
+
+        return position_adj, size_adj
+
+    def get_layer_key(self, z: int, position_adj: float, size_adj: float):
+
+        # A layer only depends on what is in the plane, where the objects go and what size their images are
+        # and not on how far away the plane is.  So when the player moves to another plane the layers that
+        # still look the same get used again e.g. with a parallel projection.  Rounding the position scale
+        # stops tiny differences in how it was worked out from giving different keys.
+        image_sizes = tuple([(int(width * size_adj), int(height * size_adj)) for width, height in
+                             self.get_plane_sizes(z)])
+
+        return z, self.model.world.plane_content_versions.get(z, 0), \
+               round(position_adj, DWWorldView.LAYER_SCALE_DIGITS), image_sizes, self.skin
+
+    def get_plane_sizes(self, z: int):
+
+        # The different sizes of the objects in a plane
+        version = self.model.world.plane_content_versions.get(z, 0)
+
+        if z in self.plane_sizes.keys():
+            sizes_version, sizes = self.plane_sizes[z]
+            if sizes_version == version:
+                return sizes
+
+        sizes = tuple(sorted(set([(obj.rect.width, obj.rect.height) for obj in self.model.world.planes[z]])))
+        self.plane_sizes[z] = (version, sizes)
+
+        return sizes
+
+    def get_layer(self, key, z: int, position_adj: float, size_adj: float, alpha: int):
+
+        if key in self.layer_cache.keys():
+            self.layer_hits += 1
+            self.layer_cache.move_to_end(key)
+            return self.layer_cache[key]
+
+        self.layer_misses += 1
+        layer = self.build_layer(z, position_adj, size_adj, alpha)
+
+        if layer is not None:
+            surface, pos, faded = layer
+            self.layer_pixels += surface.get_width() * surface.get_height()
+
+            # Layers with objects that overlap are faded as they are built so they are kept for each fade
+            layer_key, layer_alpha = key
+            if faded is True and layer_alpha is None:
+                self.faded_layers.add(layer_key)
+                key = (layer_key, alpha)
+
+        self.layer_cache[key] = layer
+
+        # Drop the layers that we have not drawn for the longest time until we are back within our limit
+        while self.layer_pixels > DWWorldView.MAX_LAYER_PIXELS and len(self.layer_cache) > 1:
+            old_key, old_layer = self.layer_cache.popitem(last=False)
+            if old_layer is not None:
+                surface, pos, faded = old_layer
+                self.layer_pixels -= surface.get_width() * surface.get_height()
+
+        return layer
+
+    def build_layer(self, z: int, position_adj: float, size_adj: float, alpha: int):
+
+        world = self.model.world
+        dynamic_names = self.get_dynamic_names()
+        bot_objects = set([bot.target_object for bot in world.bots])
+
+        # Go through the objects in the same order as drawing them one at a time does so that overlapping objects
+        # end up on top of each other in the same way
+        if world.geometry == model.World3D.GEOMETRY_NUMPY:
+            objects = world.plane_grids[z].query_range(0, 0, math.inf, math.inf, "is_visible")
+        else:
+            objects = world.planes[z]
+
+        tiles = []
+        for obj in objects:
+
+            if obj.is_visible is False or obj.name in dynamic_names or obj.is_switch is True or obj in bot_objects:
+                continue
+
+            image = View.image_manager.get_scaled_skin_image(obj.name,
+                                                             width=int(obj.rect.width * size_adj),
+                                                             height=int(obj.rect.height * size_adj),
+                                                             skin_name=self.skin)
+            if image is not None:
+                ox, oy, oz = obj.xyz
+                tiles.append((image, int(ox * position_adj), int(oy * position_adj)))
+
+        if len(tiles) == 0:
+            return None
+
+        left = min([x for image, x, y in tiles])
+        top = min([y for image, x, y in tiles])
+        right = max([x + image.get_width() for image, x, y in tiles])
+        bottom = max([y + image.get_height() for image, x, y in tiles])
+
+        # Fading objects that overlap one at a time looks different to fading them after they have been drawn
+        # together so if any of them overlap then fade them as they get drawn into the layer
+        coverage = np.zeros((right - left, bottom - top), dtype=np.uint8)
+        for image, x, y in tiles:
+            coverage[x - left:x - left + image.get_width(), y - top:y - top + image.get_height()] += 1
+        faded = bool(coverage.max() > 1)
+
+        # Draw the objects in the same order as they would have been drawn onto the view into a layer with
+        # per-pixel alpha so that the see through parts of the objects stay see through.
+        # Faded layers have their colours premultiplied by their alpha so that the objects build up in the same way
+        # as they would if they were drawn onto the view.
+        surface = pygame.Surface((right - left, bottom - top), pygame.SRCALPHA)
+        layer_images = {}
+        for image, x, y in tiles:
+            if image not in layer_images.keys():
+                layer_images[image] = DWWorldView.get_layer_image(image, alpha if faded is True else None)
+            surface.blit(layer_images[image], (x - left, y - top),
+                         special_flags=pygame.BLEND_PREMULTIPLIED if faded is True else 0)
+
+        return surface, (left, top), faded
+
+    @staticmethod
+    def get_layer_image(image, alpha: int = None):
+
+        # Copy an image with its per-pixel alpha whatever surface alpha it was last drawn with
+        layer_image = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        old_alpha = image.get_alpha()
+        image.set_alpha(None)
+        layer_image.blit(image, (0, 0))
+        image.set_alpha(old_alpha)
+
+        # Fade the copy and premultiply its colours by its alpha
+        if alpha is not None:
+            layer_image.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+            layer_image = layer_image.premul_alpha()
+
+        return layer_image
+
+    def clear_layers(self):
+        self.layer_cache.clear()
+        self.layer_pixels = 0
+        self.plane_sizes = {}
+        self.faded_layers = set()
+
     def set_view(self, new_view_pos):
 
         # self.min_view_pos = np.divide(self.min_view_pos, self.object_zoom_ratio)
@@ -1052,9 +1711,10 @@ class ModelToView3D():
         # self.projection = ModelToView3D.PARALLEL
         self.projection = ModelToView3D.PERSPECTIVE
 
-    def get_object_list(self, view_pos, view_width, view_height, view_depth):
+    def get_object_list(self, view_pos, view_width, view_height, view_depth, planes: dict = None):
 
         # List for holding the objects that will be visible and where they are positioned relative to the camera
+        # If we are given the objects to look at in each plane then only those objects are considered
         objects = {}
 
         vx, vy, vz = view_pos
@@ -1064,12 +1724,22 @@ class ModelToView3D():
         visible_planes = visible_planes[visible_planes >= vz]
         visible_planes = visible_planes[visible_planes < (vz + view_depth)]
 
+        # If the world keeps its geometry in arrays then we can cull the objects in each plane in one go
+        use_arrays = self.model.world.geometry == model.World3D.GEOMETRY_NUMPY
+        range_x = (view_width + self.view_padding) / 2
+        range_y = (view_height + self.view_padding) / 2
+
         # for each visible plane in the model world...
         for z in visible_planes:
 
             # Get the list of objects from the model that are at this plane...
             # objects_at_z = sorted(self.model.world.planes[z], key=lambda obj: obj.rect.y * 1000 + obj.rect.x)
-            objects_at_z = self.model.world.planes[z]
+            if planes is not None:
+                objects_at_z = planes.get(z, ())
+            elif use_arrays is True:
+                objects_at_z = self.model.world.plane_grids[z].query_range(vx, vy, range_x, range_y, "is_visible")
+            else:
+                objects_at_z = self.model.world.planes[z]
 
             # For each object in the list...
             for obj in objects_at_z:
@@ -1084,8 +1754,7 @@ class ModelToView3D():
                 oh = oy - vy
 
                 # filter out objects that don't fit into the current camera view size (h, w, d)
-                if abs(ow) > (view_width + self.view_padding) / 2 \
-                        or abs(oh) > (view_height + self.view_padding) / 2:
+                if abs(ow) > range_x or abs(oh) > range_y:
                     pass
                 # If the object fits into the current view...
                 else:
@@ -1194,7 +1863,7 @@ class DWTextBox(View):
 
     def print(self):
         print("Printing Dark Work Text Box view: txt={0}, fade option = {1}".format(self.model, self.fade_out))
-        print("Msg Q = {0}".format(str(self.msg_queue)))
+        print("Msg Q = {0}".format([str(event) for event in self.msg_queue]))
 
     def tick(self):
 
@@ -1202,23 +1871,22 @@ class DWTextBox(View):
 
         if len(self.msg_queue) > 0:
             if self.tick_count > (self.timer + self.life_time_ticks):
-                self.model = self.msg_queue.popleft()
+                self.model = self.msg_queue.popleft().description
                 self.timer = self.tick_count
 
     def process_event(self, new_event: model.Event):
 
         super().process_event(new_event)
 
+        # Queue the events rather than their descriptions so that we only format the messages that get shown
         if new_event.name in (Event.TALK, Event.READ):
-            self.msg_queue.appendleft(new_event.description)
-            self.model = self.msg_queue.popleft()
+            self.model = new_event.description
             self.timer = self.tick_count
         elif new_event.type == Event.STATE:
-            self.msg_queue.appendleft(new_event.description)
-            self.model = self.msg_queue.popleft()
+            self.model = new_event.description
             self.timer = self.tick_count
         else:
-            self.msg_queue.append(new_event.description)
+            self.msg_queue.append(new_event)
 
     def draw(self):
         self.set_size()
@@ -1340,8 +2008,8 @@ class DWInventoryView(View):
             if count > 0:
                 y += self.icon_size
 
-                img = View.image_manager.get_skin_image(tile_name=item, skin_name=self.skin)
-                img = pygame.transform.scale(img, (self.icon_size, self.icon_size))
+                img = View.image_manager.get_scaled_skin_image(tile_name=item, width=self.icon_size,
+                                                               height=self.icon_size, skin_name=self.skin)
                 self.surface.blit(img, (self.text_rect.x, y - int(self.icon_size / 2)))
 
                 text = "{0} x {1}".format(item.title(), count)
@@ -1420,11 +2088,9 @@ class DWWorldCompleteView(View):
         draw_text(surface=self.surface, msg=text, x=x, y=y, size=int(self.text_size * 1.5),
                   fg_colour=Colours.LIGHT_GREY, bg_colour=Colours.DARK_GREY, centre=True)
 
-        img = View.image_manager.get_skin_image(tile_name=model.Objects.PLAYER, skin_name=self.skin,
-                                                tick=self.tick_count)
-
         scale_factor = int((6 - 3* abs(1 - (self.tick_count % 50 / 25)))* self.icon_size)
-        img = pygame.transform.scale(img, (scale_factor, scale_factor))
+        img = View.image_manager.get_scaled_skin_image(tile_name=model.Objects.PLAYER, width=scale_factor, height=scale_factor,
+                                                       skin_name=self.skin, tick=self.tick_count)
 
         alpha = int(255 * (1 - abs(1 - (self.tick_count % 50 / 25))))
         img.set_alpha(alpha)
@@ -1450,8 +2116,8 @@ class DWWorldCompleteView(View):
 
                 y += (self.icon_size * (types_of_item % 2 == 1))
 
-                img = View.image_manager.get_skin_image(tile_name=item, skin_name=self.skin)
-                img = pygame.transform.scale(img, (self.icon_size, self.icon_size))
+                img = View.image_manager.get_scaled_skin_image(tile_name=item, width=self.icon_size,
+                                                               height=self.icon_size, skin_name=self.skin)
                 self.surface.blit(img, (self.text_rect.x + (((types_of_item % 2) == 0) * self.text_rect.width / 2),
                                         y - int(self.icon_size / 2)))
 
@@ -1547,11 +2213,9 @@ class DWWorldGameLoaded(View):
                   bg_colour=Colours.DARK_GREY,
                   centre=True)
 
-        img = View.image_manager.get_skin_image(tile_name=model.Objects.NPC1, skin_name=self.skin,
-                                                tick=self.tick_count)
-
         scale_factor = int((6 - 3* abs(1 - (self.tick_count % 100 / 50)))* self.icon_size)
-        img = pygame.transform.scale(img, (scale_factor, scale_factor))
+        img = View.image_manager.get_scaled_skin_image(tile_name=model.Objects.NPC1, width=scale_factor, height=scale_factor,
+                                                       skin_name=self.skin, tick=self.tick_count)
 
         img_alpha = int(255 * (1 - abs(1 - (self.tick_count % 100 / 50))))
         img.set_alpha(img_alpha)
@@ -0,0 +1,96 @@
+import contextlib
+import io
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import darkworld.model as model
+from darkworld.model.worlds import AIBotRandom, AIBotRouteFollowing, BatchMovement, WorldObjectLoader
+
+TICKS = 300
+
+
+def get_world_ids():
+    m = model.DWModel("Dark World")
+    with contextlib.redirect_stdout(io.StringIO()):
+        m.initialise()
+    return sorted(m.world_factory.world_properties.keys())
+
+
+def add_crowd(world):
+
+    # Lots of bots and slowing tiles in the player's plane so that moves get in each other's way
+    z = world.player.z
+    for i in range(40):
+        tile = WorldObjectLoader.get_object_copy_by_name(model.World3D.SLOW_TILES[i % 2])
+        tile.set_pos((random.randint(0, world.width - 32) // 8 * 8, random.randint(0, world.height - 32) // 8 * 8, z))
+        world.add_object3D(tile, do_copy=False)
+
+    for i in range(150):
+        monster = WorldObjectLoader.get_object_copy_by_name(model.Objects.BLOCK1 if i % 3 == 0 else model.Objects.ENEMY1)
+        monster.set_pos((random.randint(0, world.width - 32), random.randint(0, world.height - 32), z))
+        if i % 2 == 0:
+            bot = AIBotRouteFollowing(monster, world)
+            bot.set_instructions([(random.randint(0, world.width), random.randint(0, world.height), z)
+                                  for point in range(3)])
+        else:
+            bot = AIBotRandom(monster, world)
+            bot.set_instructions((np.array((2, 2, 0)), np.array((-3, 1, 0)), np.array((1, -4, 0)),
+                                  model.World3D.EAST * 3), 5, 15)
+        world.add_monster(monster, bot)
+
+
+def play_world(world_id: int, batch_moves: bool, crowd: bool = False):
+
+    random.seed(1)
+
+    old_settings = (model.World3D.BATCH_MOVES, BatchMovement.MIN_BATCH_SIZE)
+    model.World3D.BATCH_MOVES = batch_moves
+
+    # Batch every move so that the batched moves get checked even in worlds with only a few bots
+    BatchMovement.MIN_BATCH_SIZE = 1
+
+    positions = []
+    try:
+        m = model.DWModel("Dark World")
+        with contextlib.redirect_stdout(io.StringIO()):
+            m.initialise()
+            m.current_world_id = world_id
+            m.start()
+
+            world = m.world
+            if crowd is True:
+                add_crowd(world)
+
+            for i in range(TICKS):
+                world.tick()
+                positions.append([bot.target_object.xyz for bot in world.bots])
+    finally:
+        model.World3D.BATCH_MOVES, BatchMovement.MIN_BATCH_SIZE = old_settings
+
+    return world, positions
+
+
+@pytest.mark.parametrize("world_id", get_world_ids())
+def test_batched_moves_match_single_moves(world_id):
+
+    single_world, single_positions = play_world(world_id, batch_moves=False)
+    batch_world, batch_positions = play_world(world_id, batch_moves=True)
+
+    assert batch_positions == single_positions
+    if any(bot.batchable is True for bot in batch_world.bots):
+        assert batch_world.batch_movement.batched_moves > 0
+
+
+def test_crowded_batched_moves_match_single_moves():
+
+    single_world, single_positions = play_world(998, batch_moves=False, crowd=True)
+    batch_world, batch_positions = play_world(998, batch_moves=True, crowd=True)
+
+    assert batch_positions == single_positions
+    assert batch_world.batch_movement.batched_moves > 0
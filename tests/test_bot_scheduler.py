@@ -0,0 +1,118 @@
+import contextlib
+import io
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import darkworld.model as model
+from darkworld.controller.headless import DWSimulator
+
+# Worlds with random, route following, hunter and instruction following bots
+WORLD_IDS = (1, 2, 5, 9, 120)
+
+TICKS = 400
+
+
+def play_world(world_id: int, reduced: bool, time_budget: float = None):
+
+    random.seed(1)
+
+    m = model.DWModel("Dark World")
+    with contextlib.redirect_stdout(io.StringIO()):
+        m.initialise()
+        m.current_world_id = world_id
+        m.start()
+
+    world = m.world
+    if time_budget is not None:
+        world.bot_scheduler.time_budget = time_budget
+
+    # Show everything so that every bot is ticked at its full rate or
+    # show nothing so that every bot that can be is ticked at the reduced level of detail
+    if reduced is False:
+        world.bot_scheduler.set_view_area((0, 0, 0), world.width, world.height, world.depth + 1)
+    else:
+        world.bot_scheduler.set_view_area((0, 0, 0), -1, -1, 0)
+
+    positions = []
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(TICKS):
+            world.tick()
+            positions.append([bot.target_object.xyz for bot in world.bots])
+
+    return world, positions
+
+
+@pytest.mark.parametrize("world_id", WORLD_IDS)
+def test_reduced_bots_end_where_full_rate_bots_do(world_id):
+
+    full_world, full_positions = play_world(world_id, reduced=False)
+    reduced_world, reduced_positions = play_world(world_id, reduced=True)
+
+    assert full_world.bot_scheduler.get_stats()["total"]["ticked"] == TICKS * len(full_world.bots)
+
+    stats = reduced_world.bot_scheduler.get_stats()["total"]
+    assert stats["sleeping"] == 0
+    if any(bot.schedulable is True for bot in reduced_world.bots):
+        assert stats["reduced"] > 0
+
+    # Each reduced bot catches up on the ticks that it was given its turns
+    for tick in range(TICKS):
+        for bot_index, bot in enumerate(reduced_world.bots):
+            lod = reduced_world.bot_scheduler.get_lod(bot)
+            if lod == model.BotScheduler.LOD_FULL or \
+                    (tick + 1 + bot_index) % model.BotScheduler.REDUCED_TICK_INTERVAL == 0:
+                assert reduced_positions[tick][bot_index] == full_positions[tick][bot_index]
+
+
+def test_time_budget_is_off_by_default():
+
+    world, positions = play_world(2, reduced=False)
+
+    assert model.BotScheduler(world).time_budget is None
+    assert world.bot_scheduler.get_stats()["total"]["deferred"] == 0
+
+
+@pytest.mark.parametrize("world_id", WORLD_IDS)
+def test_deferred_bots_catch_up(world_id):
+
+    full_world, full_positions = play_world(world_id, reduced=False)
+
+    # A budget that is always used up by the first bot so that the rest are always deferred
+    budget_world, budget_positions = play_world(world_id, reduced=False, time_budget=1e-9)
+
+    stats = budget_world.bot_scheduler.get_stats()["total"]
+    if len(budget_world.bots) > 1:
+        assert stats["deferred"] > 0
+
+    # Once there is no budget every bot has had all of its turns
+    budget_world.bot_scheduler.time_budget = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        budget_world.tick()
+        full_world.tick()
+
+    assert [bot.tick_count for bot in budget_world.bots] == [bot.tick_count for bot in full_world.bots]
+
+
+def test_time_budget_is_per_model():
+
+    budget_model = model.DWModel("Dark World", bot_time_budget=0.005)
+    with contextlib.redirect_stdout(io.StringIO()):
+        budget_model.initialise()
+        budget_model.start()
+
+    simulator = DWSimulator()
+    simulator.initialise()
+
+    other_model = model.DWModel("Dark World")
+    with contextlib.redirect_stdout(io.StringIO()):
+        other_model.initialise()
+        other_model.start()
+
+    assert budget_model.world.bot_scheduler.time_budget == 0.005
+    assert simulator.m.world.bot_scheduler.time_budget is None
+    assert other_model.world.bot_scheduler.time_budget is None
@@ -0,0 +1,143 @@
+import contextlib
+import io
+import os
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import darkworld.model as model
+from darkworld.model.worlds import WorldBuilder
+from darkworld.view.view import ModelToView3D
+
+# Worlds with moving blocks, trackers and hunters
+WORLD_IDS = (5, 9, 120)
+
+BACKENDS = (model.World3D.GEOMETRY_GRID, model.World3D.GEOMETRY_NUMPY)
+
+# Moves to make with every bot's object
+MOVES = (model.World3D.EAST, model.World3D.UP, model.World3D.WEST, model.World3D.DOWN,
+         (3, 0, 0), (0, -3, 0), (2, 2, 0), (-5, 1, 0), model.World3D.NORTH, model.World3D.SOUTH)
+
+
+def describe(obj):
+    return obj.name, obj.xyz, tuple(obj.rect)
+
+
+def describe_all(objects):
+    return sorted(describe(obj) for obj in objects)
+
+
+@pytest.fixture(scope="module")
+def templates():
+
+    # The loaded worlds are held by the layout loader so build every backend's worlds before the next one replaces them
+    templates = {}
+    old_geometry = model.World3D.DEFAULT_GEOMETRY
+    try:
+        for geometry in BACKENDS:
+            model.World3D.DEFAULT_GEOMETRY = geometry
+            with contextlib.redirect_stdout(io.StringIO()):
+                builder = WorldBuilder(model.DWModel.DATA_FILES_DIR)
+                builder.initialise(use_cache=False)
+                templates[geometry] = {world_id: builder.get_world(world_id) for world_id in WORLD_IDS}
+    finally:
+        model.World3D.DEFAULT_GEOMETRY = old_geometry
+
+    return templates
+
+
+@pytest.fixture(params=WORLD_IDS)
+def worlds(request, templates):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return [templates[geometry][request.param].instance() for geometry in BACKENDS]
+
+
+def get_check_points(size):
+    return [edge + offset for edge in range(0, int(size) + 1, 32) for offset in (-1, 0, 16)]
+
+
+def check_same_results(grid_world, numpy_world):
+
+    assert grid_world.geometry == model.World3D.GEOMETRY_GRID
+    assert numpy_world.geometry == model.World3D.GEOMETRY_NUMPY
+    assert sorted(grid_world.planes.keys()) == sorted(numpy_world.planes.keys())
+
+    for z in grid_world.planes.keys():
+
+        grid_objects = list(grid_world.planes[z])
+        numpy_objects = list(numpy_world.planes[z])
+        assert [describe(obj) for obj in grid_objects] == [describe(obj) for obj in numpy_objects]
+
+        # What each object is touching
+        for grid_object, numpy_object in zip(grid_objects, numpy_objects):
+            for distance in (None, 0, 10):
+                assert describe_all(grid_world.touching_objects(grid_object, distance=distance)) == \
+                       describe_all(numpy_world.touching_objects(numpy_object, distance=distance))
+            assert describe_all(grid_world.touching_objects(grid_object, property_filter={"is_solid": True})) == \
+                   describe_all(numpy_world.touching_objects(numpy_object, property_filter={"is_solid": True}))
+
+        # What is at points across the plane including either side of the edges of the tiles
+        for x in get_check_points(grid_world.width):
+            for y in get_check_points(grid_world.height):
+                assert describe_all(grid_world.get_objects_at(x, y, z)) == \
+                       describe_all(numpy_world.get_objects_at(x, y, z))
+
+
+def check_same_view(grid_world, numpy_world):
+
+    grid_m2v = ModelToView3D(types.SimpleNamespace(world=grid_world))
+    numpy_m2v = ModelToView3D(types.SimpleNamespace(world=numpy_world))
+
+    # Include views whose edges line up with the tiles
+    for view_pos in ((200, 200, 0), (256, 256, 0), (320, 320, 20), (500, 500, 40), (0, 0, 70)):
+        for width, height in ((600, 600), (256, 384), (300, 750)):
+            grid_objects = grid_m2v.get_object_list(view_pos, width, height, 65)
+            numpy_objects = numpy_m2v.get_object_list(view_pos, width, height, 65)
+
+            assert sorted(grid_objects.keys()) == sorted(numpy_objects.keys())
+            for d in grid_objects.keys():
+                assert sorted((pos, describe(obj)) for pos, obj in grid_objects[d]) == \
+                       sorted((pos, describe(obj)) for pos, obj in numpy_objects[d])
+
+
+def test_loaded_worlds_match(worlds):
+    check_same_results(*worlds)
+    check_same_view(*worlds)
+
+
+def test_moves_match(worlds):
+
+    grid_world, numpy_world = worlds
+
+    for move in MOVES:
+        for grid_bot, numpy_bot in zip(grid_world.bots, numpy_world.bots):
+            grid_world.move_object(grid_bot.target_object, move)
+            numpy_world.move_object(numpy_bot.target_object, move)
+            assert grid_bot.target_object.xyz == numpy_bot.target_object.xyz
+
+    check_same_results(grid_world, numpy_world)
+    check_same_view(grid_world, numpy_world)
+
+
+def test_swaps_and_deletes_match(worlds):
+
+    grid_world, numpy_world = worlds
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for z in sorted(grid_world.planes.keys()):
+
+            # Swap a solid object for an empty tile and delete the first object in each plane
+            grid_solids = grid_world.get_objects_by_property("is_solid", z)
+            numpy_solids = numpy_world.get_objects_by_property("is_solid", z)
+            if len(grid_solids) > 0:
+                grid_world.swap_object(grid_solids[-1], "tile1")
+                numpy_world.swap_object(numpy_solids[-1], "tile1")
+
+            grid_world.delete_object3D(list(grid_world.planes[z])[0])
+            numpy_world.delete_object3D(list(numpy_world.planes[z])[0])
+
+    check_same_results(grid_world, numpy_world)
+    check_same_view(grid_world, numpy_world)
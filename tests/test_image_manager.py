@@ -0,0 +1,30 @@
+import contextlib
+import io
+import os
+import sys
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import darkworld.model as model
+import darkworld.view.view as view
+
+
+def test_scaled_images_are_the_size_asked_for():
+
+    image_manager = view.ImageManager()
+    with contextlib.redirect_stdout(io.StringIO()):
+        image_manager.initialise()
+
+        # Callers place and blit images with the size that they asked for so odd sizes can't be rounded
+        for width, height in ((29, 29), (30, 31), (31, 30), (1, 33)):
+            image = image_manager.get_scaled_skin_image(model.Objects.PLAYER, width=width, height=height)
+            assert image.get_size() == (width, height)
+
+        # Asking for the same size again gets the same image
+        image = image_manager.get_scaled_skin_image(model.Objects.PLAYER, width=29, height=29)
+        hits = view.ImageManager.scaled_hits
+        assert image is image_manager.get_scaled_skin_image(model.Objects.PLAYER, width=29, height=29)
+        assert view.ImageManager.scaled_hits == hits + 1
@@ -0,0 +1,157 @@
+import contextlib
+import io
+import os
+import sys
+
+import pytest
+
+os.environ["SDL_VIDEODRIVER"] = "dummy"
+os.environ["SDL_AUDIODRIVER"] = "dummy"
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pygame
+
+import darkworld.model as model
+import darkworld.view.view as view
+
+
+@pytest.fixture
+def world_view():
+
+    m = model.DWModel("Dark World")
+    main_frame = view.DWMainFrame(m)
+    with contextlib.redirect_stdout(io.StringIO()):
+        m.initialise()
+        m.current_world_id = 120
+        m.start()
+        main_frame.initialise()
+
+    yield main_frame.world_view
+
+    view.DWWorldView.CACHE_LAYERS = True
+
+
+def draw(world_view, cache_layers: bool = True):
+
+    view.DWWorldView.CACHE_LAYERS = cache_layers
+    with contextlib.redirect_stdout(io.StringIO()):
+        world_view.draw()
+
+    return pygame.surfarray.array3d(world_view.surface)
+
+
+def move_player(world_view, z: int):
+    world = world_view.model.world
+    x, y, old_z = world.player.xyz
+    world.move_object_to_xyz(world.player, (x, y, z))
+
+
+def test_layers_are_built_a_few_at_a_time(world_view):
+
+    draw(world_view)
+    misses = world_view.layer_misses
+    assert misses == view.DWWorldView.MAX_LAYER_BUILDS
+
+    # Keep drawing until every layer has been built
+    for i in range(20):
+        draw(world_view)
+    assert world_view.layer_misses > misses
+    assert world_view.layer_misses - misses <= 20 * view.DWWorldView.MAX_LAYER_BUILDS
+
+
+def test_player_changing_plane_keeps_layers(world_view):
+
+    for i in range(20):
+        draw(world_view)
+
+    x, y, z = world_view.model.world.player.xyz
+    planes = sorted(world_view.model.world.planes.keys())
+    other_z = planes[planes.index(z) + 1]
+
+    move_player(world_view, other_z)
+    for i in range(20):
+        draw(world_view)
+
+    # Going back to where we were uses the layers that we have already built
+    misses = world_view.layer_misses
+    move_player(world_view, z)
+    draw(world_view)
+    assert world_view.layer_misses == misses
+
+
+def test_parallel_projection_shares_layers_between_distances(world_view):
+
+    world_view.m2v.projection = view.ModelToView3D.PARALLEL
+    draw(world_view)
+    z = world_view.model.world.player.z
+
+    # Planes a little way apart draw their objects at the same size and in the same places
+    keys = set()
+    for d in range(30, 35):
+        position_adj, size_adj = world_view.get_layer_scales(d)
+        keys.add(world_view.get_layer_key(z, position_adj, size_adj))
+
+    assert len(keys) == 1
+
+
+def test_parallel_projection_layers_look_like_objects(world_view):
+
+    world_view.m2v.projection = view.ModelToView3D.PARALLEL
+
+    # Draw until every layer has been built and then draw the same frame one object at a time
+    for i in range(20):
+        cached = draw(world_view)
+    uncached = draw(world_view, cache_layers=False)
+
+    assert abs(cached.astype(int) - uncached.astype(int)).max() <= 2
+
+
+def test_layers_look_like_their_objects(world_view):
+
+    for i in range(20):
+        draw(world_view)
+
+    world = world_view.model.world
+    vx, vy, vz = world_view.view_pos
+    pz = world.player.z
+    dynamic_names = world_view.get_dynamic_names()
+    bot_objects = set([bot.target_object for bot in world.bots])
+
+    # With a perspective projection the objects in every plane overlap a little
+    layers, planes_without_layers = world_view.get_layers((vx, vy, vz), pz)
+    assert len(planes_without_layers) == 0
+    assert len(world_view.faded_layers) > 0
+
+    for d, (layer, (layer_x, layer_y), faded) in layers.items():
+
+        position_adj, size_adj = world_view.get_layer_scales(d)
+        alpha = int(255 * (1 - min((abs(pz - d - vz) / world_view.depth, 1))))
+
+        tiles = []
+        for obj in world.planes[d + vz]:
+            if obj.is_visible is False or obj.name in dynamic_names or obj.is_switch is True or obj in bot_objects:
+                continue
+            image = view.View.image_manager.get_scaled_skin_image(obj.name,
+                                                                  width=int(obj.rect.width * size_adj),
+                                                                  height=int(obj.rect.height * size_adj),
+                                                                  skin_name=world_view.skin)
+            if image is not None:
+                ox, oy, oz = obj.xyz
+                tiles.append((image, int(ox * position_adj), int(oy * position_adj)))
+
+        left = min([x for image, x, y in tiles])
+        top = min([y for image, x, y in tiles])
+
+        # Draw the layer and then its objects one at a time in the same places
+        layer_surface = pygame.Surface(world_view.surface.get_size())
+        layer_surface.blit(layer, (layer_x, layer_y), special_flags=pygame.BLEND_PREMULTIPLIED if faded else 0)
+
+        objects_surface = pygame.Surface(world_view.surface.get_size())
+        for image, x, y in tiles:
+            image.set_alpha(alpha)
+            objects_surface.blit(image, (x - left + layer_x, y - top + layer_y))
+
+        difference = abs(pygame.surfarray.array3d(layer_surface).astype(int) -
+                         pygame.surfarray.array3d(objects_surface).astype(int))
+        assert difference.max() <= 2
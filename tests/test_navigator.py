@@ -0,0 +1,100 @@
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import darkworld.model as model
+from darkworld.model.worlds import AIBotHunter, AIBotTracker2, CollisionDetection, Navigator, PathFinder
+
+CHECK_POINTS = ("center", "midtop", "midbottom", "midright", "midleft")
+
+
+def old_navigate2(world, from_object, to_object, changed: bool = False):
+
+    # The line of sight check that navigate2 did before it used a raycast.  It counts a hit for every check point
+    # whose line crosses the edge of any other object in the plane and fails once more than half of the
+    # check points have been hit.  With changed=True it makes the changes that the raycast makes:
+    # only solid objects get in the way, each check point is only counted once however many objects are
+    # in the way and lines that only touch the right or bottom edge of an object's rect don't hit it.
+    hits = []
+    for obj in world.planes[from_object.z]:
+        if obj in (from_object, to_object) or (changed is True and obj.is_solid is False):
+            continue
+
+        for check_point in CHECK_POINTS:
+            from_a = getattr(from_object.rect, check_point)
+            to_a = getattr(to_object.rect, check_point)
+            if changed is True:
+                hit = len(obj.rect.clipline(from_a, to_a)) > 0 and check_point not in hits
+            else:
+                hit = CollisionDetection.line_rectangle_intersection(from_a, to_a, obj.rect)
+            if hit is True:
+                hits.append(check_point)
+
+        if len(hits) / len(CHECK_POINTS) > 0.5:
+            return False
+
+    return True
+
+
+def get_world_ids():
+    m = model.DWModel("Dark World")
+    with contextlib.redirect_stdout(io.StringIO()):
+        m.initialise()
+    return sorted(m.world_factory.world_properties.keys())
+
+
+def test_navigate2_matches_old_line_of_sight():
+
+    results = []
+
+    for world_id in get_world_ids():
+
+        m = model.DWModel("Dark World")
+        with contextlib.redirect_stdout(io.StringIO()):
+            m.initialise()
+            m.current_world_id = world_id
+            m.start()
+
+        world = m.world
+        player = world.player
+
+        # Put the player in every free cell in sight range of each bot that looks for it
+        for bot in world.bots:
+            if isinstance(bot, AIBotHunter) is True:
+                sight_range = bot.visibility_distance
+            elif isinstance(bot, AIBotTracker2) is True:
+                sight_range = bot.sight_range
+            else:
+                continue
+
+            hunter = bot.target_object
+            z = hunter.z
+            grid, cell_objects = world.path_finder.get_grid(z)
+            for cy, row in enumerate(grid):
+                for cx, walkable in enumerate(row):
+
+                    if walkable is False:
+                        continue
+
+                    xyz = (cx * PathFinder.CELL_SIZE, cy * PathFinder.CELL_SIZE, z)
+                    world.move_object_to_xyz(player, xyz)
+                    if player.xyz != xyz:
+                        continue
+                    if bot.distance_from_target(player) >= sight_range:
+                        continue
+
+                    new = Navigator().navigate2(world, hunter, player)
+                    old = old_navigate2(world, hunter, player)
+                    results.append((old, new))
+
+                    # Any difference comes from the changes in how the line of sight is worked out
+                    assert new == old_navigate2(world, hunter, player, changed=True)
+
+    # Bots only ever see more than they did and that is rare
+    differences = [(old, new) for old, new in results if old != new]
+    assert len(results) > 100
+    assert all(old is False and new is True for old, new in differences)
+    assert len(differences) / len(results) < 0.05
@@ -0,0 +1,53 @@
+import contextlib
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import darkworld.model as model
+from darkworld.model.worlds import WorldBuilder, WorldCache
+
+
+def initialise_builder(cache_dir: str):
+
+    old_cache_dir = WorldCache.CACHE_DIR
+    WorldCache.CACHE_DIR = cache_dir
+    WorldCache.save_failed = False
+
+    output = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(output):
+            builder = WorldBuilder(model.DWModel.DATA_FILES_DIR)
+            builder.initialise()
+            builder.initialise()
+    finally:
+        WorldCache.CACHE_DIR = old_cache_dir
+        WorldCache.save_failed = False
+
+    return builder, output.getvalue()
+
+
+def test_cache_is_kept_in_the_cache_directory(tmp_path):
+
+    data_files = sorted(os.listdir(model.DWModel.DATA_FILES_DIR))
+    cache_dir = str(tmp_path / "darkworld")
+
+    builder, output = initialise_builder(cache_dir)
+
+    assert os.listdir(cache_dir) == [os.path.basename(WorldCache.get_file_name(model.DWModel.DATA_FILES_DIR,
+                                                                               "default"))]
+    assert sorted(os.listdir(model.DWModel.DATA_FILES_DIR)) == data_files
+    assert "Unable" not in output
+
+
+def test_cache_that_cannot_be_written_falls_back_to_the_csv_files(tmp_path):
+
+    # A cache directory that can't be made because there is a file in the way
+    (tmp_path / "file").write_text("")
+    cache_dir = str(tmp_path / "file" / "darkworld")
+
+    builder, output = initialise_builder(cache_dir)
+
+    assert output.count("Unable to save world cache") == 1
+    assert builder.get_world(1) is not None